@@ -17,7 +17,15 @@ class AppConfig(AppConfig):
     Métodos:
     --------
     ready():
-        Método opcional que se puede sobrescribir para ejecutar el código de inicialización cuando la aplicación está lista.
+        Registra las tareas de segundo plano (`app.tasks`) en la cola de trabajos,
+        conecta las señales de auditoría (`app.audit`) e instala el registro de
+        consultas lentas (`app.slow_queries`).
     """
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        from . import audit, slow_queries, tasks  # noqa: F401
+
+        audit.connect_signals()
+        slow_queries.install()
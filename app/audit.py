@@ -0,0 +1,219 @@
+"""
+Registro de auditoría de los cambios en clientes, mascotas y productos.
+
+Las altas, bajas y cambios de relaciones muchos a muchos se capturan con
+señales; las modificaciones, en `VersionedModel.update_if_current`, que conoce
+los valores anteriores.
+
+Un cambio hecho dentro de una transacción solo se registra cuando esta se
+confirma (`transaction.on_commit`): si se revierte, no queda ninguna entrada.
+Durante una solicitud (`AuditMiddleware`) las entradas se acumulan en memoria y
+se guardan en forma sincrónica con un único `bulk_create` al terminar la vista,
+antes de devolver la respuesta; fuera de una solicitud se guardan en el momento.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+M2M = "m2m"
+
+# Campos que no se registran: la clave primaria, el contador de versión y el
+# nombre normalizado para búsquedas (se deriva del nombre).
+IGNORED_FIELDS = ("id", "version", "name_search")
+
+_buffer = ContextVar("audit_buffer", default=None)
+
+# Tabla intermedia -> (modelo dueño de la relación, nombre del campo).
+_m2m_fields = {}
+
+
+def is_audited(model):
+    """
+    Indica si los cambios de un modelo se auditan.
+
+    Args:
+        model: Clase o instancia de un modelo.
+
+    Returns:
+        bool: True si el modelo está en `AuditEntry.MODELS`.
+    """
+    from .models import AuditEntry
+
+    return model._meta.model_name in AuditEntry.MODELS
+
+
+def snapshot(instance):
+    """
+    Valores de los campos de una instancia, por nombre de columna.
+
+    Args:
+        instance: Instancia de un modelo auditado.
+
+    Returns:
+        dict: Valor de cada campo concreto (las FK por su id).
+    """
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+        if field.name not in IGNORED_FIELDS
+    }
+
+
+def _add(entry):
+    entries = _buffer.get()
+    if entries is None:
+        entry.save()
+    else:
+        entries.append(entry)
+
+
+def record(model_name, object_id, action, changes):
+    """
+    Registra un cambio en el buffer de la solicitud o directamente en la base.
+
+    Dentro de una transacción la entrada se agrega recién cuando se confirma;
+    si la transacción (o el savepoint) se revierte, se descarta.
+
+    Args:
+        model_name (str): Nombre del modelo (`_meta.model_name`).
+        object_id (int): Id del registro modificado.
+        action (str): "create", "update", "delete" o "m2m".
+        changes (dict): Cambios por campo como [valor anterior, valor nuevo].
+    """
+    from .models import AuditEntry
+
+    entry = AuditEntry(
+        model=model_name,
+        object_id=object_id,
+        action=action,
+        changes=changes,
+        created_at=timezone.now(),
+    )
+    if connection.in_atomic_block:
+        transaction.on_commit(partial(_add, entry))
+    else:
+        _add(entry)
+
+
+@contextmanager
+def buffered(actor=""):
+    """
+    Acumula las entradas de auditoría y las guarda juntas al salir del bloque.
+
+    Dentro de otro bloque `buffered` (por ejemplo, durante una solicitud) usa el
+    buffer existente, que se guarda al terminar el bloque exterior. Si el bloque
+    termina con una excepción no se guarda nada. Las transacciones deben
+    abrirse dentro del bloque: las entradas que se confirman después de salir
+    de él se guardan una por una.
+
+    Args:
+        actor (str | callable): Usuario responsable, o una función que lo
+            devuelve (solo se llama si hubo cambios).
+
+    Yields:
+        list: Entradas acumuladas hasta el momento.
+    """
+    from .models import AuditEntry
+
+    if _buffer.get() is not None:
+        yield _buffer.get()
+        return
+
+    entries = []
+    token = _buffer.set(entries)
+    try:
+        yield entries
+    finally:
+        _buffer.reset(token)
+
+    if entries:
+        name = actor() if callable(actor) else actor
+        for entry in entries:
+            entry.actor = name
+        AuditEntry.objects.bulk_create(entries)
+
+
+def _on_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        changes = {name: [None, value] for name, value in snapshot(instance).items()}
+        record(sender._meta.model_name, instance.pk, CREATE, changes)
+
+
+def _on_delete(sender, instance, **kwargs):
+    changes = {name: [value, None] for name, value in snapshot(instance).items()}
+    record(sender._meta.model_name, instance.pk, DELETE, changes)
+
+
+def _related_ids(sender, instance, reverse):
+    """
+    Ids del otro extremo de la relación de una instancia, según la tabla intermedia.
+
+    Args:
+        sender: Tabla intermedia de la relación.
+        instance: Instancia cuya relación se consulta.
+        reverse (bool): True si `instance` está del lado inverso de la relación.
+
+    Returns:
+        list: Ids relacionados, ordenados.
+    """
+    owner, field = _m2m_fields[sender]
+    field = owner._meta.get_field(field)
+    source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+    if reverse:
+        source, target = target, source
+    return sorted(
+        sender.objects.filter(**{f"{source}_id": instance.pk}).values_list(f"{target}_id", flat=True),
+    )
+
+
+def _on_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        # `clear()` no informa qué se quitó: se lee antes de borrar.
+        instance._audit_cleared = _related_ids(sender, instance, reverse)
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_audit_cleared", None)
+    elif action not in ("post_add", "post_remove"):
+        return
+    if not pk_set:
+        return
+
+    owner, field = _m2m_fields[sender]
+
+    def change(ids):
+        return [None, ids] if action == "post_add" else [ids, None]
+
+    if reverse:
+        # `product.client_set.add(client)`: el cambio es de cada cliente.
+        for pk in sorted(pk_set):
+            record(owner._meta.model_name, pk, M2M, {field: change([instance.pk])})
+    else:
+        record(owner._meta.model_name, instance.pk, M2M, {field: change(sorted(pk_set))})
+
+
+def connect_signals():
+    """
+    Conecta las señales de los modelos auditados.
+
+    Las señales se conectan por modelo (nunca para todos los emisores) para no
+    desactivar los borrados rápidos de Django en los demás modelos.
+    """
+    from .models import AuditEntry
+
+    for model_name in AuditEntry.MODELS:
+        model = apps.get_model("app", model_name)
+        post_save.connect(_on_save, sender=model, dispatch_uid=f"audit_save_{model_name}")
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f"audit_delete_{model_name}")
+
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            _m2m_fields[through] = (model, field.name)
+            m2m_changed.connect(_on_m2m_changed, sender=through, dispatch_uid=f"audit_m2m_{through.__name__}")
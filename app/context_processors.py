@@ -1,10 +1,89 @@
+from functools import lru_cache
+
 from django.urls import reverse
 
-links = [
-    {"label": "Home", "href": reverse("home"), "icon": "bi bi-house-door"},
-    {"label": "Clientes", "href": reverse("clients_repo"), "icon": "bi bi-people"},
-    {"label": "Productos", "href": reverse("products_repo"), "icon": "bi bi-basket3"},
-]
+# Tabla de enlaces del navbar: (label, nombre de url en app/urls.py, icono).
+NAVBAR_LINKS = (
+    ("Home", "home", "bi bi-house-door"),
+    ("Clientes", "clients_repo", "bi bi-people"),
+    ("Proveedores", "providers_repo", "bi bi-people"),
+    ("Productos", "products_repo", "bi bi-basket3"),
+    ("Vets", "vets_repo", "bi bi-person"),
+    ("Mascotas", "pets_repo", "bi bi-gitlab"),
+    ("Medicinas", "medicine_repo", "bi bi-capsule"),
+)
+
+_REQUEST_CACHE_ATTR = "_navbar_context"
+
+
+def _split_path(path):
+    """
+    Divide una ruta URL en sus segmentos no vacíos.
+
+    Args:
+        path (str): Ruta URL, por ejemplo "/clientes/editar/1/".
+
+    Returns:
+        list: Segmentos de la ruta, por ejemplo ["clientes", "editar", "1"].
+    """
+    return [segment for segment in path.split("/") if segment]
+
+
+@lru_cache(maxsize=None)
+def get_link_table():
+    """
+    Construye una única vez la tabla de enlaces y el trie de prefijos.
+
+    Las URLs se resuelven con `reverse()` en el primer uso (no al importar el
+    módulo) y se cachean para el resto de la vida del proceso.
+
+    Returns:
+        tuple: (links, trie) donde `links` es una tupla de diccionarios con
+        label, href e icon, y `trie` es un árbol de segmentos de ruta cuyos
+        nodos guardan en la clave None el índice del enlace correspondiente.
+    """
+    links = tuple(
+        {"label": label, "href": reverse(url_name), "icon": icon}
+        for label, url_name, icon in NAVBAR_LINKS
+    )
+
+    trie = {}
+    for index, link in enumerate(links):
+        node = trie
+        for segment in _split_path(link["href"]):
+            node = node.setdefault(segment, {})
+        node[None] = index
+
+    return links, trie
+
+
+def resolve_active_link(path):
+    """
+    Busca el enlace activo para una ruta con un único recorrido del trie.
+
+    El enlace activo es el de prefijo más largo que coincide con la ruta; el
+    enlace raíz ("/") solo se activa cuando la ruta es exactamente "/".
+
+    Args:
+        path (str): Ruta de la solicitud.
+
+    Returns:
+        int | None: Índice del enlace activo en la tabla o None si no hay ninguno.
+    """
+    _, node = get_link_table()
+    segments = _split_path(path)
+
+    if not segments:
+        return node.get(None)
+
+    active = None
+    for segment in segments:
+        node = node.get(segment)
+        if node is None:
+            break
+        active = node.get(None, active)
+
+    return active
 
 
 def navbar(request):
@@ -12,20 +91,26 @@ def navbar(request):
         Genera un diccionario de contexto que contiene una lista de enlaces de navegación,
         marcando el enlace activo actual basado en la ruta de la solicitud.
 
+        El resultado se memoriza en la solicitud, por lo que los renders anidados
+        reutilizan la misma lista sin recalcularla.
+
         Args:
             request: El objeto HttpRequest.
 
         Returns:
             dict: Un diccionario con los enlaces de navegación y su estado activo.
     """
-    def add_active(link):
-        copy = link.copy()
-
-        if copy["href"] == "/":
-            copy["active"] = request.path == "/"
-        else:
-            copy["active"] = request.path.startswith(copy.get("href", ""))
+    context = getattr(request, _REQUEST_CACHE_ATTR, None)
+    if context is not None:
+        return context
 
-        return copy
+    links, _ = get_link_table()
+    active = resolve_active_link(request.path)
+    context = {
+        "links": tuple(
+            {**link, "active": index == active} for index, link in enumerate(links)
+        ),
+    }
+    setattr(request, _REQUEST_CACHE_ATTR, context)
 
-    return {"links": map(add_active, links)}
+    return context
@@ -0,0 +1,218 @@
+from datetime import date
+from urllib.parse import urlencode
+
+from django.core.paginator import Paginator
+
+from .models import Specialty
+
+PAGE_SIZE = 50
+
+# Mayor entero que acepta la base de datos (entero de 64 bits con signo).
+MAX_ID = 2**63 - 1
+
+
+class RepositoryQuery:
+    """
+    Capa declarativa de filtrado, ordenamiento y paginación para los listados.
+
+    Solo los parámetros declarados se traducen a llamadas `filter()` y
+    `order_by()` sobre campos indexados; cualquier otro parámetro de la URL se
+    ignora, de modo que no es posible filtrar ni ordenar por campos arbitrarios.
+
+    Atributos:
+    ----------
+    filters : dict
+        Mapea el nombre del parámetro GET a una tupla (lookup del ORM, conversor).
+        El conversor recibe el texto del parámetro y lanza ValueError si es inválido.
+    ordering : dict
+        Mapea el nombre de la columna ordenable al campo del modelo. Solo se
+        declaran columnas con índice (ver `Meta.indexes` en los modelos).
+    default_ordering : tuple
+        Ordenamiento aplicado cuando no se indica `sort` (siempre termina en "pk"
+        para que la paginación sea estable).
+
+    Métodos:
+    --------
+    apply(queryset, params):
+        Devuelve el queryset filtrado y ordenado junto con los parámetros válidos.
+    paginate(request, queryset):
+        Aplica la consulta y devuelve el contexto de la plantilla con la página pedida.
+    """
+    def __init__(self, filters=None, ordering=None, default_ordering=("pk",)):
+        self.filters = filters or {}
+        self.ordering = ordering or {}
+        self.default_ordering = default_ordering
+
+    def clean_filters(self, params):
+        """
+        Convierte los parámetros de filtrado permitidos.
+
+        Args:
+            params (QueryDict): Parámetros GET de la solicitud.
+
+        Returns:
+            dict: Parámetros válidos, con el valor original en texto.
+        """
+        cleaned = {}
+
+        for name, (lookup, convert) in self.filters.items():
+            raw = params.get(name, "").strip()
+            if raw == "":
+                continue
+            try:
+                convert(raw)
+            except ValueError:
+                continue
+            cleaned[name] = raw
+
+        return cleaned
+
+    def clean_sort(self, params):
+        """
+        Valida el parámetro `sort` (por ejemplo "name" o "-birthday").
+
+        Args:
+            params (QueryDict): Parámetros GET de la solicitud.
+
+        Returns:
+            str: Valor de `sort` válido o cadena vacía.
+        """
+        sort = params.get("sort", "")
+        if sort.lstrip("-") in self.ordering:
+            return sort
+        return ""
+
+    def apply(self, queryset, params):
+        """
+        Filtra y ordena el queryset según los parámetros permitidos.
+
+        Args:
+            queryset (QuerySet): Queryset base del listado.
+            params (QueryDict): Parámetros GET de la solicitud.
+
+        Returns:
+            tuple: (queryset, filtros válidos, sort válido).
+        """
+        cleaned = self.clean_filters(params)
+        sort = self.clean_sort(params)
+
+        lookups = {
+            self.filters[name][0]: self.filters[name][1](raw)
+            for name, raw in cleaned.items()
+        }
+        if lookups:
+            queryset = queryset.filter(**lookups)
+
+        if sort:
+            prefix = "-" if sort.startswith("-") else ""
+            queryset = queryset.order_by(prefix + self.ordering[sort.lstrip("-")], prefix + "pk")
+        else:
+            queryset = queryset.order_by(*self.default_ordering)
+
+        return queryset, cleaned, sort
+
+    def paginate(self, request, queryset):
+        """
+        Aplica filtros, orden y paginación a un listado.
+
+        Args:
+            request: El objeto de solicitud HTTP.
+            queryset (QuerySet): Queryset base del listado.
+
+        Returns:
+            dict: Contexto con `page_obj` (la página pedida) y `query` (filtros
+            activos, orden y querystrings para ordenamiento y paginación).
+        """
+        queryset, cleaned, sort = self.apply(queryset, request.GET)
+        page_obj = Paginator(queryset, PAGE_SIZE).get_page(request.GET.get("page"))
+
+        base = dict(cleaned, **({"sort": sort} if sort else {}))
+        sort_urls = {}
+        for column in self.ordering:
+            toggled = "-" + column if sort == column else column
+            sort_urls[column] = "?" + urlencode(dict(cleaned, sort=toggled))
+
+        query = {
+            "filters": cleaned,
+            "sort": sort,
+            "sort_urls": sort_urls,
+            "querystring": urlencode(base),
+        }
+
+        return {"page_obj": page_obj, "query": query}
+
+
+def _id(value):
+    number = int(value)
+    if not 0 < number <= MAX_ID:
+        raise ValueError(value)
+    return number
+
+
+def _specialty(value):
+    if value not in [key.value for key in Specialty]:
+        raise ValueError(value)
+    return value
+
+
+PETS_QUERY = RepositoryQuery(
+    filters={
+        "client": ("client_id", _id),
+        "breed": ("breed", str),
+        "birthday_from": ("birthday__gte", date.fromisoformat),
+        "birthday_to": ("birthday__lte", date.fromisoformat),
+    },
+    ordering={
+        "name": "name",
+        "breed": "breed",
+        "birthday": "birthday",
+        "weight": "weight",
+    },
+)
+
+PRODUCTS_QUERY = RepositoryQuery(
+    filters={
+        "provider": ("provider_id", _id),
+        "type": ("type", str),
+        "price_min": ("price__gte", float),
+        "price_max": ("price__lte", float),
+    },
+    ordering={
+        "name": "name",
+        "type": "type",
+        "price": "price",
+    },
+)
+
+VETS_QUERY = RepositoryQuery(
+    filters={
+        "specialty": ("specialty", _specialty),
+    },
+    ordering={
+        "name": "name",
+        "specialty": "specialty",
+    },
+)
+
+CLIENTS_QUERY = RepositoryQuery(
+    filters={
+        "city": ("city", str),
+    },
+    ordering={
+        "name": "name",
+        "city": "city",
+    },
+)
+
+PROVIDERS_QUERY = RepositoryQuery(
+    ordering={
+        "name": "name",
+    },
+)
+
+MEDICINES_QUERY = RepositoryQuery(
+    ordering={
+        "name": "name",
+        "dose": "dose",
+    },
+)
@@ -0,0 +1,121 @@
+"""
+Endpoints de salud para el balanceador y el orquestador.
+
+`/healthz` (liveness) responde sin tocar la base: solo indica que el proceso
+atiende. `/readyz` (readiness) responde 200 cuando el worker está precalentado
+(`app.warmup.warm`), la base responde, no hay migraciones pendientes y las
+caches funcionan; si no, 503 con el detalle de cada verificación.
+
+`app.middleware.HealthCheckMiddleware` los atiende antes que el resto de los middlewares, sin
+validar el dominio (las sondas usan la IP del contenedor), sin sesión ni
+clínica.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse, JsonResponse
+
+from . import warmup
+
+logger = logging.getLogger(__name__)
+
+# Una vez aplicadas, las migraciones no se vuelven a verificar en el proceso.
+_migrations_applied = False
+
+
+def check_database():
+    """
+    Ejecuta una consulta mínima en la base principal y en las réplicas.
+
+    Returns:
+        bool: True si todas responden.
+    """
+    for alias in [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+    return True
+
+
+def check_migrations():
+    """
+    Verifica que no haya migraciones sin aplicar en la base principal.
+
+    Returns:
+        bool: True si el plan de migraciones está vacío.
+    """
+    global _migrations_applied
+    if not _migrations_applied:
+        executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+        targets = executor.loader.graph.leaf_nodes()
+        _migrations_applied = not executor.migration_plan(targets)
+    return _migrations_applied
+
+
+def check_caches():
+    """
+    Escribe y lee una clave en cada cache configurada.
+
+    Returns:
+        bool: True si todas devuelven el valor escrito.
+    """
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        cache.set("readyz", "ok", 10)
+        if cache.get("readyz") != "ok":
+            return False
+    return True
+
+
+CHECKS = {
+    "database": check_database,
+    "migrations": check_migrations,
+    "caches": check_caches,
+}
+
+
+def healthz(request):
+    """
+    Liveness: el proceso atiende solicitudes.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+
+    Returns:
+        HttpResponse: "ok" con estado 200.
+    """
+    return HttpResponse("ok", content_type="text/plain")
+
+
+def readyz(request):
+    """
+    Readiness: el worker puede recibir tráfico.
+
+    Precalienta el worker si todavía no lo está (fuera de gunicorn, o si el
+    precalentamiento del arranque falló) antes de responder.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+
+    Returns:
+        JsonResponse: Resultado de cada verificación, con estado 200 si todas
+        pasaron o 503 si alguna falló.
+    """
+    results = {}
+    for name, check in CHECKS.items():
+        try:
+            results[name] = bool(check())
+        except Exception:
+            logger.exception("Falló la verificación %s", name)
+            results[name] = False
+
+    results["warmup"] = all(results.values()) and warmup.warm()
+
+    ready = all(results.values())
+    return JsonResponse(
+        {"status": "ok" if ready else "unavailable", "checks": results},
+        status=200 if ready else 503,
+    )
+
@@ -0,0 +1,76 @@
+import django
+from django.apps import apps
+from django.template.loader import render_to_string
+
+
+def init_worker():
+    """
+    Prepara Django en un proceso de trabajo del pool de facturación.
+
+    `render_invoices` inicia el pool con "spawn": el proceso no hereda la
+    configuración y hay que cargar las aplicaciones antes de usar las plantillas.
+    """
+    if not apps.ready:
+        django.setup()
+
+
+def serialize_invoice(invoice):
+    """
+    Convierte una factura con sus líneas en datos simples para enviar a otro proceso.
+
+    Args:
+        invoice (Invoice): Factura con `client` y `lines` precargados.
+
+    Returns:
+        dict: Datos de la factura listos para `render_invoice`.
+    """
+    return {
+        "number": invoice.number,
+        "month": invoice.month,
+        "issued_at": invoice.issued_at,
+        "total": invoice.total,
+        "client": {
+            "name": invoice.client.name,
+            "email": invoice.client.email,
+            "city": invoice.client.city,
+        },
+        "lines": [
+            {
+                "description": line.description,
+                "quantity": line.quantity,
+                "unit_price": line.unit_price,
+                "amount": line.amount,
+            }
+            for line in invoice.lines.all()
+        ],
+    }
+
+
+def render_invoice(data):
+    """
+    Renderiza una factura en HTML.
+
+    Args:
+        data (dict): Datos generados por `serialize_invoice`.
+
+    Returns:
+        tuple: (nombre del archivo, contenido en bytes).
+    """
+    html = render_to_string("invoices/invoice.html", {"invoice": data})
+    return f"factura-{data['number']}.html", html.encode("utf-8")
+
+
+def render_chunk(chunk):
+    """
+    Renderiza un lote de facturas; es la unidad de trabajo del pool de procesos.
+
+    Los procesos de trabajo no acceden a la base de datos: reciben los datos ya
+    serializados y devuelven los archivos renderizados.
+
+    Args:
+        chunk (list): Lista de datos generados por `serialize_invoice`.
+
+    Returns:
+        list: Tuplas (nombre del archivo, contenido en bytes).
+    """
+    return [render_invoice(data) for data in chunk]
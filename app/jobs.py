@@ -0,0 +1,102 @@
+import logging
+import traceback
+
+from django.db import close_old_connections
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(name):
+    """
+    Registra una función como tarea ejecutable por `run_worker`.
+
+    Args:
+        name (str): Nombre con el que se encola la tarea.
+
+    Returns:
+        function: Decorador que registra la función y la devuelve sin cambios.
+    """
+    def register(function):
+        TASKS[name] = function
+        return function
+    return register
+
+
+def enqueue(name, payload=None, run_at=None, max_attempts=5):
+    """
+    Encola una tarea registrada.
+
+    Args:
+        name (str): Nombre de la tarea.
+        payload (dict, opcional): Argumentos de la tarea (serializables en JSON).
+        run_at (datetime, opcional): Momento a partir del cual ejecutarla.
+        max_attempts (int): Cantidad máxima de intentos.
+
+    Returns:
+        Job: El trabajo creado.
+
+    Raises:
+        KeyError: Si la tarea no está registrada.
+    """
+    if name not in TASKS:
+        raise KeyError(f"Tarea desconocida: {name}")
+
+    job = Job(name=name, payload=payload or {}, max_attempts=max_attempts)
+    if run_at is not None:
+        job.run_at = run_at
+    job.save()
+    return job
+
+
+def run_job(job):
+    """
+    Ejecuta un trabajo reclamado y guarda su resultado o su error.
+
+    Antes de ejecutarlo renueva su plazo (`Job.start`); si otro proceso ya lo
+    reclamó, no lo ejecuta.
+
+    Args:
+        job (Job): Trabajo en estado "running".
+
+    Returns:
+        bool: True si la tarea terminó sin errores.
+    """
+    if not job.start():
+        logger.warning("El trabajo %s ya no pertenece a %s", job, job.locked_by)
+        return False
+
+    function = TASKS.get(job.name)
+    try:
+        if function is None:
+            raise KeyError(f"Tarea desconocida: {job.name}")
+        result = function(**job.payload)
+    except Exception:
+        logger.exception("Falló el trabajo %s", job)
+        job.mark_failed(traceback.format_exc(limit=5))
+        return False
+
+    if not job.mark_done(result):
+        logger.warning("El trabajo %s terminó pero otro proceso lo había reclamado", job)
+    return True
+
+
+def run_batch(worker, limit):
+    """
+    Reclama y ejecuta un lote de trabajos.
+
+    Args:
+        worker (str): Identificador del proceso.
+        limit (int): Cantidad máxima de trabajos del lote.
+
+    Returns:
+        int: Cantidad de trabajos ejecutados.
+    """
+    close_old_connections()
+    jobs = Job.claim(worker, limit)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
@@ -0,0 +1,240 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import MedicationAdministration
+
+FIELDS = ("id", "pet_id", "medicine_id", "vet_id", "dose", "administered_at")
+
+
+def partition_path(directory, month):
+    """
+    Obtiene la ruta del archivo comprimido de un mes anterior a las partes.
+
+    Args:
+        directory (Path): Directorio de archivo.
+        month (str): Mes con el formato "YYYY-MM".
+
+    Returns:
+        Path: Ruta del archivo, por ejemplo "administrations-2024-01.jsonl.gz".
+    """
+    return Path(directory) / f"administrations-{month}.jsonl.gz"
+
+
+def part_paths(directory, month):
+    """
+    Obtiene las partes de un mes, ordenadas por número.
+
+    Args:
+        directory (Path): Directorio de archivo.
+        month (str): Mes con el formato "YYYY-MM".
+
+    Returns:
+        list: Rutas de las partes, por ejemplo "administrations-2024-01.part00001.jsonl.gz".
+    """
+    return sorted(Path(directory).glob(f"administrations-{month}.part[0-9]*.jsonl.gz"))
+
+
+def next_part_path(directory, month):
+    """
+    Obtiene la ruta de la siguiente parte de un mes.
+
+    Args:
+        directory (Path): Directorio de archivo.
+        month (str): Mes con el formato "YYYY-MM".
+
+    Returns:
+        Path: Ruta de una parte que todavía no existe.
+    """
+    parts = part_paths(directory, month)
+    number = int(parts[-1].name.split(".")[1][len("part"):]) + 1 if parts else 1
+    return Path(directory) / f"administrations-{month}.part{number:05d}.jsonl.gz"
+
+
+def read_partition(directory, month):
+    """
+    Lee las administraciones archivadas de un mes.
+
+    Si una fila aparece en más de una parte (una ejecución interrumpida entre
+    escribir la parte y confirmar la eliminación), se devuelve una sola vez.
+
+    Args:
+        directory (Path): Directorio de archivo.
+        month (str): Mes con el formato "YYYY-MM".
+
+    Returns:
+        list: Diccionarios con los campos de cada administración archivada.
+    """
+    paths = part_paths(directory, month)
+    legacy = partition_path(directory, month)
+    if legacy.exists():
+        paths.insert(0, legacy)
+
+    records = {}
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                records.setdefault(record["id"], record)
+    return list(records.values())
+
+
+def fsync_directory(directory):
+    """
+    Confirma en disco las entradas de un directorio (creaciones y renombres).
+
+    En Windows no se puede abrir un directorio, así que no hace nada.
+
+    Args:
+        directory (Path): Directorio a sincronizar.
+    """
+    if os.name == "nt":
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class Command(BaseCommand):
+    """
+    Mueve las administraciones antiguas a particiones mensuales comprimidas.
+
+    Las filas anteriores a `--before` se recorren en orden de `administered_at`
+    (índice propio), se escriben como JSON Lines comprimidos y se eliminan de la
+    tabla por lotes, cada uno en su propia transacción corta.
+
+    Cada lote se escribe en su propia parte del mes
+    (`administrations-YYYY-MM.partNNNNN.jsonl.gz`), así que el costo de un lote
+    no depende de lo ya archivado. La parte se escribe en un archivo temporal,
+    se sincroniza a disco (`fsync`) y se renombra antes de eliminar las filas:
+    si la eliminación falla, la parte se borra; si el proceso se interrumpe
+    entre el renombre y la confirmación, las filas quedan en la tabla y en la
+    parte, y la siguiente ejecución las vuelve a archivar en otra parte.
+    `read_partition` descarta esos duplicados por `id`; nunca se pierde una fila.
+    """
+    help = "Archiva las administraciones de medicinas anteriores a una fecha en archivos mensuales comprimidos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            required=True,
+            help="Fecha (YYYY-MM-DD); se archivan las administraciones anteriores.",
+        )
+        parser.add_argument(
+            "--output",
+            default=settings.ARCHIVE_DIR,
+            help="Directorio de las particiones (por defecto ARCHIVE_DIR).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            before = datetime.fromisoformat(options["before"])
+        except ValueError:
+            raise CommandError("--before debe tener el formato YYYY-MM-DD") from None
+        if timezone.is_naive(before):
+            before = timezone.make_aware(before)
+
+        directory = Path(options["output"])
+        directory.mkdir(parents=True, exist_ok=True)
+        batch_size = options["batch_size"]
+
+        total = 0
+        while True:
+            first = (
+                MedicationAdministration.objects.filter(administered_at__lt=before)
+                .order_by("administered_at", "pk")
+                .values_list("administered_at", flat=True)
+                .first()
+            )
+            if first is None:
+                break
+
+            month_start = timezone.localtime(first).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            archived = self.archive_month(
+                directory, month_start, min(month_end, before), batch_size,
+            )
+            total += archived
+            self.stdout.write(f"{month_start:%Y-%m}: {archived} administraciones archivadas")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} administraciones archivadas en {directory}"))
+
+    def archive_month(self, directory, start, end, batch_size):
+        """
+        Archiva y elimina las administraciones de un rango dentro de un mes.
+
+        Args:
+            directory (Path): Directorio de archivo.
+            start (datetime): Inicio del rango (incluido).
+            end (datetime): Fin del rango (excluido).
+            batch_size (int): Cantidad de filas leídas y eliminadas por lote.
+
+        Returns:
+            int: Cantidad de administraciones archivadas.
+        """
+        rows = (
+            MedicationAdministration.objects.between(start, end)
+            .order_by("administered_at", "pk")
+            .values_list(*FIELDS)
+        )
+
+        # Cada lote son las primeras filas que quedan en el rango: como se
+        # eliminan al escribirlas, no hace falta OFFSET ni mantener un cursor abierto.
+        archived = 0
+        month = f"{start:%Y-%m}"
+        while True:
+            batch = list(rows[:batch_size])
+            if not batch:
+                break
+            archived += self.archive_batch(next_part_path(directory, month), batch)
+
+        return archived
+
+    def archive_batch(self, path, batch):
+        """
+        Escribe un lote en una parte nueva y elimina sus filas de la tabla.
+
+        La parte queda en disco antes de que la eliminación se confirme; si la
+        eliminación falla se borra, así que las filas siguen solo en la tabla.
+
+        Args:
+            path (Path): Ruta de la parte, que todavía no existe.
+            batch (list): Filas con los valores de `FIELDS`.
+
+        Returns:
+            int: Cantidad de administraciones eliminadas.
+        """
+        temporary = path.with_name(path.name + ".tmp")
+        try:
+            with open(temporary, "wb") as raw:
+                with gzip.open(raw, "wt", encoding="utf-8") as file:
+                    for row in batch:
+                        record = dict(zip(FIELDS, row))
+                        record["administered_at"] = record["administered_at"].isoformat()
+                        file.write(json.dumps(record) + "\n")
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(temporary, path)
+            fsync_directory(path.parent)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+
+        try:
+            with transaction.atomic():
+                deleted, _ = MedicationAdministration.objects.filter(pk__in=[row[0] for row in batch]).delete()
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+        return deleted
@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+TOTAL = "(total)"
+
+
+def parse_importtime(output):
+    """
+    Interpreta la salida de `python -X importtime`.
+
+    Args:
+        output (str): Salida de error del intérprete.
+
+    Returns:
+        dict: Módulo -> (tiempo propio, tiempo acumulado) en microsegundos.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # encabezado
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(module):
+    """
+    Importa un módulo en un intérprete nuevo con `-X importtime`.
+
+    Args:
+        module (str): Módulo a importar (por ejemplo "vetsoft.wsgi").
+
+    Returns:
+        dict: Módulo -> (tiempo propio, tiempo acumulado) en microsegundos.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=settings.BASE_DIR, env=os.environ.copy(), check=False,
+    )
+    if result.returncode != 0:
+        raise CommandError(f"No se pudo importar {module}:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+class Command(BaseCommand):
+    """
+    Informe del costo de importación del arranque de un worker.
+
+    Importa `--module` (por defecto `vetsoft.wsgi`, lo que carga un worker de
+    gunicorn) en un intérprete nuevo con `-X importtime` y lista los módulos más
+    costosos. Con `--save` guarda los tiempos acumulados como referencia y con
+    `--baseline` los compara con una referencia guardada: termina con error si
+    el total creció más de `--tolerance` por ciento, para usarlo en CI.
+    """
+    help = "Lista los módulos más costosos de importar al iniciar un worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="vetsoft.wsgi", help="Módulo a importar.")
+        parser.add_argument("--limit", type=int, default=20, help="Cantidad de módulos listados.")
+        parser.add_argument("--sort", choices=("cumulative", "self"), default="cumulative", help="Columna de ordenamiento.")
+        parser.add_argument("--save", help="Guarda los tiempos acumulados en este archivo JSON.")
+        parser.add_argument("--baseline", help="Compara con los tiempos guardados en este archivo JSON.")
+        parser.add_argument("--tolerance", type=float, default=20, help="Aumento permitido del total, en por ciento.")
+
+    def handle(self, *args, **options):
+        modules = measure(options["module"])
+        total_us = sum(self_us for self_us, _ in modules.values())
+
+        column = 1 if options["sort"] == "cumulative" else 0
+        ranked = sorted(modules.items(), key=lambda item: item[1][column], reverse=True)
+
+        self.stdout.write(f"{len(modules)} módulos importados en {total_us / 1000:.1f} ms")
+        self.stdout.write(f"{'propio (ms)':>12} {'acumulado (ms)':>15}  módulo")
+        for name, (self_us, cumulative_us) in ranked[:options["limit"]]:
+            self.stdout.write(f"{self_us / 1000:12.1f} {cumulative_us / 1000:15.1f}  {name}")
+
+        cumulative = {name: cumulative_us for name, (_, cumulative_us) in modules.items()}
+        cumulative[TOTAL] = total_us
+
+        if options["save"]:
+            with open(options["save"], "w", encoding="utf-8") as stream:
+                json.dump(cumulative, stream, indent=2, sort_keys=True)
+            self.stdout.write(f"Referencia guardada en {options['save']}")
+
+        if options["baseline"]:
+            self.compare(cumulative, options["baseline"], options["tolerance"], options["limit"])
+
+    def compare(self, cumulative, baseline_path, tolerance, limit):
+        with open(baseline_path, encoding="utf-8") as stream:
+            baseline = json.load(stream)
+
+        new_modules = sorted(set(cumulative) - set(baseline), key=cumulative.get, reverse=True)
+        grown = sorted(
+            (name for name in set(cumulative) & set(baseline) if name != TOTAL),
+            key=lambda name: cumulative[name] - baseline[name], reverse=True,
+        )
+
+        self.stdout.write("")
+        self.stdout.write(f"Módulos nuevos respecto de {baseline_path}:")
+        for name in new_modules[:limit]:
+            self.stdout.write(f"  + {cumulative[name] / 1000:8.1f} ms  {name}")
+        self.stdout.write("Módulos que más crecieron:")
+        for name in grown[:limit]:
+            delta = cumulative[name] - baseline[name]
+            if delta > 0:
+                self.stdout.write(f"  {delta / 1000:+10.1f} ms  {name}")
+
+        change = (cumulative[TOTAL] - baseline[TOTAL]) * 100 / baseline[TOTAL]
+        message = f"Total: {baseline[TOTAL] / 1000:.1f} ms -> {cumulative[TOTAL] / 1000:.1f} ms ({change:+.1f}%)"
+        if change > tolerance:
+            raise CommandError(f"{message}, supera la tolerancia de {tolerance}%")
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.profiling import EXTENSIONS, aggregate
+
+SORT_FIELDS = {
+    "self": "self_time",
+    "total": "total_time",
+    "calls": "calls",
+}
+
+
+class Command(BaseCommand):
+    """
+    Agrupa los perfiles guardados por `ProfilingMiddleware` y lista las funciones más costosas.
+
+    Suma, para cada función, su tiempo propio y acumulado en todos los perfiles
+    (opcionalmente solo los de una vista) y muestra las primeras `--limit`.
+    """
+    help = "Lista las funciones con más tiempo en los perfiles de solicitudes guardados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--view", help="Solo los perfiles de esta vista (por ejemplo, pets_repo).")
+        parser.add_argument("--sort", choices=SORT_FIELDS, default="self", help="Columna de ordenamiento.")
+        parser.add_argument("--limit", type=int, default=25, help="Cantidad de funciones listadas.")
+        parser.add_argument("--dir", default=None, help="Directorio de perfiles; por defecto PROFILING_DIR.")
+
+    def handle(self, *args, **options):
+        root = Path(options["dir"] or settings.PROFILING_DIR)
+        pattern = f"{options['view']}/*" if options["view"] else "*/*"
+        paths = sorted(path for path in root.glob(pattern) if path.suffix in EXTENSIONS.values())
+
+        if not paths:
+            self.stdout.write("No hay perfiles guardados.")
+            return
+
+        totals = aggregate(paths)
+        field = SORT_FIELDS[options["sort"]]
+        ranked = sorted(totals.items(), key=lambda item: item[1][field], reverse=True)
+
+        self.stdout.write(f"{len(paths)} perfiles en {root}")
+        self.stdout.write(f"{'propio (s)':>11} {'total (s)':>11} {'llamadas':>9} {'perfiles':>8}  función")
+        for (function, file_path, line_no), row in ranked[:options["limit"]]:
+            self.stdout.write(
+                f"{row['self_time']:11.4f} {row['total_time']:11.4f} {row['calls']:9d} {row['profiles']:8d}"
+                f"  {function} ({file_path}:{line_no})",
+            )
@@ -0,0 +1,116 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.db.models.deletion import Collector, ProtectedError
+from django.utils import timezone
+
+from app import audit
+from app.models import ArchivedRow, Client, Pet, Product, Provider
+
+# Primero los modelos dependientes, para que la cascada de sus padres sea mínima.
+MODELS = (Pet, Product, Client, Provider)
+
+
+def purge_batch(model, ids, archived_at):
+    """
+    Archiva y elimina definitivamente un lote de registros con borrado lógico.
+
+    El colector de Django obtiene todas las filas que la eliminación arrastra en
+    cascada; todas se copian a `ArchivedRow` antes de eliminarlas. Los registros
+    con filas protegidas (facturas de un cliente, movimientos de stock de un
+    producto) no se eliminan y se devuelven para informarlos.
+
+    Args:
+        model: Modelo con borrado lógico.
+        ids (list): Ids de los registros del lote.
+        archived_at (datetime): Momento del archivado.
+
+    Returns:
+        tuple: (filas archivadas, incluidas las arrastradas en cascada; ids protegidos).
+    """
+    instances = list(model.all_objects.filter(pk__in=ids))
+    protected = []
+    collector = Collector(using=DEFAULT_DB_ALIAS)
+    try:
+        collector.collect(instances)
+    except ProtectedError:
+        # Solo si el lote tiene registros protegidos: se revisan de a uno.
+        purgeable = []
+        for instance in instances:
+            try:
+                Collector(using=DEFAULT_DB_ALIAS).collect([instance])
+            except ProtectedError:
+                protected.append(instance.pk)
+            else:
+                purgeable.append(instance)
+        collector = Collector(using=DEFAULT_DB_ALIAS)
+        collector.collect(purgeable)
+
+    archived = 0
+    for instances in collector.data.values():
+        archived += ArchivedRow.archive(instances, archived_at)
+    for queryset in collector.fast_deletes:
+        archived += ArchivedRow.archive(queryset, archived_at)
+
+    collector.delete()
+    return archived, protected
+
+
+class Command(BaseCommand):
+    """
+    Mueve a `ArchivedRow` los registros eliminados lógicamente hace tiempo.
+
+    Recorre mascotas, productos, clientes y proveedores con `deleted_at`
+    anterior al límite (índice parcial sobre las filas eliminadas) en lotes
+    pequeños, cada uno en su propia transacción, de modo que el bloqueo de
+    escritura dura lo que un lote y no lo que toda la purga.
+
+    Los clientes con facturas y los productos con movimientos de stock se
+    conservan (las claves son PROTECT) y se informan como protegidos.
+    """
+    help = "Archiva y elimina definitivamente los registros eliminados lógicamente hace más de --older-than días."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=365, help="Días desde la eliminación lógica.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Registros por lote (y por transacción).")
+        parser.add_argument("--sleep", type=float, default=0, help="Segundos de espera entre lotes.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than"])
+
+        for model in MODELS:
+            purged = archived = 0
+            protected = []
+            # Los protegidos no se eliminan: el recorrido avanza por
+            # (deleted_at, pk) para no volver a leerlos en cada lote.
+            after = Q()
+            while True:
+                with audit.buffered(actor="purge_archived"), transaction.atomic():
+                    rows = list(
+                        model.all_objects.filter(after, deleted_at__lt=cutoff)
+                        .order_by("deleted_at", "pk")
+                        .values_list("pk", "deleted_at")[:options["batch_size"]],
+                    )
+                    if not rows:
+                        break
+                    ids = [pk for pk, _ in rows]
+                    batch_archived, batch_protected = purge_batch(model, ids, timezone.now())
+                archived += batch_archived
+                protected += batch_protected
+                purged += len(ids) - len(batch_protected)
+                last_pk, last_deleted_at = rows[-1]
+                after = Q(deleted_at__gt=last_deleted_at) | Q(deleted_at=last_deleted_at, pk__gt=last_pk)
+                if options["sleep"]:
+                    time.sleep(options["sleep"])
+
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {purged} purgados, {archived} filas archivadas, "
+                f"{len(protected)} protegidos",
+            )
+            if protected:
+                self.stdout.write(f"  protegidos: {', '.join(map(str, protected))}")
+
+        self.stdout.write(self.style.SUCCESS("Purga terminada"))
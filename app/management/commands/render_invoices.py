@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.invoices import init_worker, render_chunk, serialize_invoice
+from app.models import Invoice
+
+
+class Command(BaseCommand):
+    """
+    Genera y renderiza las facturas de un mes en un archivo zip.
+
+    Las facturas se leen por lotes con paginación por clave (id), cada lote se
+    renderiza en un `ProcessPoolExecutor` y los archivos resultantes se escriben
+    en el zip a medida que terminan. Como nunca hay más de `2 * workers` lotes en
+    vuelo, la memoria queda acotada por el tamaño del lote y no por la cantidad
+    de facturas del mes. Con `--workers 1` los lotes se renderizan en el mismo
+    proceso, sin pool.
+
+    Los procesos del pool se inician con "spawn": no heredan las conexiones a la
+    base de datos que el comando sigue usando para leer los lotes mientras ellos
+    renderizan.
+    """
+    help = "Genera las facturas de un mes y las renderiza en HTML dentro de un zip."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", required=True, help="Mes a facturar (YYYY-MM).")
+        parser.add_argument("--output", help="Ruta del zip (por defecto ARCHIVE_DIR/facturas-YYYY-MM.zip).")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos de renderizado.")
+        parser.add_argument("--chunk-size", type=int, default=200, help="Facturas por lote.")
+        parser.add_argument(
+            "--skip-generate", action="store_true", help="Solo renderiza las facturas ya generadas.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            month = date.fromisoformat(options["month"] + "-01")
+        except ValueError:
+            raise CommandError("--month debe tener el formato YYYY-MM") from None
+
+        if not options["skip_generate"]:
+            created = Invoice.generate_month(month)
+            self.stdout.write(f"{created} facturas generadas")
+
+        output = Path(options["output"] or Path(settings.ARCHIVE_DIR) / f"facturas-{month:%Y-%m}.zip")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        workers = max(1, options["workers"] or 1)
+        chunk_size = options["chunk_size"]
+
+        rendered = 0
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            if workers == 1:
+                for chunk in self.chunks(month, chunk_size):
+                    rendered += self.write(archive, render_chunk(chunk))
+            else:
+                rendered += self.render_in_pool(archive, self.chunks(month, chunk_size), workers)
+
+        self.stdout.write(self.style.SUCCESS(f"{rendered} facturas renderizadas en {output}"))
+
+    def render_in_pool(self, archive, chunks, workers):
+        """
+        Renderiza los lotes en un pool de procesos y los escribe en el zip.
+
+        Args:
+            archive (ZipFile): Zip de salida.
+            chunks (iterable): Lotes generados por `chunks`.
+            workers (int): Cantidad de procesos.
+
+        Returns:
+            int: Cantidad de facturas renderizadas.
+        """
+        rendered = 0
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as executor:
+            pending = []
+            for chunk in chunks:
+                pending.append(executor.submit(render_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    rendered += self.write(archive, pending.pop(0).result())
+            for future in pending:
+                rendered += self.write(archive, future.result())
+        return rendered
+
+    def chunks(self, month, chunk_size):
+        """
+        Recorre las facturas del mes en lotes serializados.
+
+        Args:
+            month (date): Primer día del mes.
+            chunk_size (int): Cantidad de facturas por lote.
+
+        Yields:
+            list: Datos de las facturas del lote (ver `serialize_invoice`).
+        """
+        invoices = (
+            Invoice.objects.filter(month=month)
+            .select_related("client")
+            .prefetch_related("lines")
+            .order_by("pk")
+        )
+        last_pk = 0
+        while True:
+            batch = list(invoices.filter(pk__gt=last_pk)[:chunk_size])
+            if not batch:
+                return
+            last_pk = batch[-1].pk
+            yield [serialize_invoice(invoice) for invoice in batch]
+
+    def write(self, archive, files):
+        for name, content in files:
+            archive.writestr(name, content)
+        return len(files)
@@ -0,0 +1,44 @@
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.jobs import run_batch
+
+
+class Command(BaseCommand):
+    """
+    Proceso que ejecuta los trabajos de la cola guardada en la base de datos.
+
+    Reclama lotes de trabajos listos, los ejecuta y, si no hay trabajos, espera
+    `--sleep` segundos antes de volver a consultar. Al recibir SIGTERM o SIGINT
+    termina el lote en curso y sale.
+    """
+    help = "Ejecuta los trabajos en segundo plano encolados en la base de datos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10, help="Trabajos reclamados por lote.")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Segundos de espera sin trabajos.")
+        parser.add_argument("--once", action="store_true", help="Ejecuta los trabajos pendientes y sale.")
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        total = 0
+        while not self.stopping:
+            processed = run_batch(worker, options["batch_size"])
+            total += processed
+            if processed == 0:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+
+        self.stdout.write(f"{total} trabajos ejecutados por {worker}")
+
+    def stop(self, signum, frame):
+        self.stopping = True
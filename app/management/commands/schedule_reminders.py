@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from app.models import Reminder
+from app.reminders import enqueue_sends, send_batch
+
+
+class Command(BaseCommand):
+    """
+    Programa los recordatorios de vacunación y de reposición del día.
+
+    Pensado para ejecutarse cada noche desde cron. Por defecto encola el envío
+    en lotes para `run_worker`; con `--send` los envía en el mismo proceso.
+    Ejecutarlo más de una vez el mismo día no duplica recordatorios ni envíos.
+    """
+    help = "Programa los recordatorios del día y encola (o realiza) su envío."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=date.fromisoformat, help="Día de la ejecución (YYYY-MM-DD); por defecto hoy.")
+        parser.add_argument("--lead-days", type=int, default=Reminder.LEAD_DAYS, help="Días de anticipación del aviso.")
+        parser.add_argument("--batch-size", type=int, default=Reminder.BATCH_SIZE, help="Recordatorios por lote de envío.")
+        parser.add_argument("--send", action="store_true", help="Envía los recordatorios sin pasar por la cola.")
+
+    def handle(self, *args, **options):
+        created = Reminder.schedule(options["date"], options["lead_days"])
+        self.stdout.write(f"{created} recordatorios programados")
+
+        if options["send"]:
+            sent = 0
+            while True:
+                batch = send_batch(options["batch_size"])["sent"]
+                if batch == 0:
+                    break
+                sent += batch
+            self.stdout.write(self.style.SUCCESS(f"{sent} recordatorios enviados"))
+        else:
+            jobs = enqueue_sends(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{jobs} trabajos de envío encolados"))
@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.slow_queries import top_offenders
+
+
+class Command(BaseCommand):
+    """
+    Lista las consultas lentas registradas, ordenadas por tiempo total.
+
+    Lee el archivo `SLOW_QUERY_LOG` (que comparten todos los procesos), agrupa
+    las ejecuciones de una misma consulta y muestra, para cada una, cuántas
+    veces se ejecutó, el tiempo total y máximo, las vistas y líneas que la
+    ejecutaron y el plan de la ejecución más lenta.
+    """
+    help = "Lista las consultas lentas registradas que más tiempo consumieron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=10, help="Cantidad de consultas listadas.")
+        parser.add_argument("--view", help="Solo las consultas de esta vista (por ejemplo, pets_repo).")
+        parser.add_argument("--file", default=None, help="Archivo del registro; por defecto SLOW_QUERY_LOG.")
+
+    def handle(self, *args, **options):
+        path = options["file"] or settings.SLOW_QUERY_LOG
+        if not path or not Path(path).exists():
+            raise CommandError(f"No existe el registro de consultas lentas: {path}")
+
+        with open(path, encoding="utf-8") as stream:
+            entries = [json.loads(line) for line in stream if line.strip()]
+        if options["view"]:
+            entries = [entry for entry in entries if entry["view"] == options["view"]]
+
+        offenders = top_offenders(entries, options["limit"])
+        self.stdout.write(f"{len(entries)} consultas lentas, {len(offenders)} distintas listadas")
+
+        for rank, group in enumerate(offenders, start=1):
+            self.stdout.write("")
+            self.stdout.write(
+                f"{rank}. {group['total_ms']:.1f} ms en {group['count']} ejecuciones "
+                f"(máx. {group['max_ms']:.1f} ms)",
+            )
+            self.stdout.write(f"   {group['sql']}")
+            if group["views"]:
+                self.stdout.write(f"   vistas: {', '.join(sorted(group['views']))}")
+            for site in sorted(group["sites"]):
+                self.stdout.write(f"   desde: {site}")
+            for row in group["plan"] or []:
+                self.stdout.write(f"   plan: {row}")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from app.models import StockSnapshot
+
+
+class Command(BaseCommand):
+    """
+    Actualiza las fotos de stock de los productos con movimientos nuevos.
+
+    Pensado para ejecutarse periódicamente (por ejemplo, cada noche desde cron):
+    cuanto más reciente es la foto, menos movimientos hay que sumar al consultar
+    el stock actual.
+    """
+    help = "Actualiza los saldos de stock (StockSnapshot) con los movimientos nuevos del libro."
+
+    def handle(self, *args, **options):
+        updated = StockSnapshot.take()
+        self.stdout.write(self.style.SUCCESS(f"{updated} productos actualizados"))
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(source, target):
+    """
+    Copia una base SQLite sobre otra con la API de backup de SQLite.
+
+    La copia se hace página a página y es consistente aunque la base de origen
+    reciba escrituras mientras tanto.
+
+    Args:
+        source (str): Alias de la base de origen.
+        target (str): Alias de la base de destino.
+    """
+    for alias in (source, target):
+        if connections[alias].vendor != "sqlite":
+            raise CommandError(f"La base '{alias}' no es SQLite; use la replicación del motor.")
+        connections[alias].ensure_connection()
+
+    connections[source].connection.backup(connections[target].connection)
+
+
+class Command(BaseCommand):
+    """
+    Sustituto local de la replicación: copia la base principal a las réplicas.
+
+    Solo admite réplicas SQLite (ver `DATABASES["replica"]` en la
+    configuración); con `--interval` repite la copia para simular el retraso de
+    una réplica real.
+    """
+    help = "Copia la base principal a las réplicas SQLite de DATABASE_REPLICAS."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=float, default=0,
+            help="Segundos entre copias; 0 copia una sola vez.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No hay réplicas configuradas (VETSOFT_REPLICA=1).")
+
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database(DEFAULT_DB_ALIAS, alias)
+                self.stdout.write(f"Réplica '{alias}' actualizada")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,259 @@
+import logging
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from . import audit, health, profiling, replicas, slow_queries, tenancy
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - Brotli es opcional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def parse_accept_encoding(header):
+    """
+    Obtiene las codificaciones aceptadas por el cliente.
+
+    Args:
+        header (str): Valor de la cabecera Accept-Encoding.
+
+    Returns:
+        set: Codificaciones aceptadas (en minúsculas) con calidad mayor que 0.
+    """
+    accepted = set()
+
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if quality > 0:
+            accepted.add(coding)
+
+    return accepted
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Comprime las respuestas HTML con brotli o gzip según Accept-Encoding.
+
+    Las respuestas pequeñas y las respuestas en streaming (exportaciones) se
+    envían sin comprimir. Las páginas que incluyen un token CSRF se comprimen
+    siempre con gzip y relleno aleatorio (mitigación de BREACH de Django) en
+    lugar de brotli, que no admite ese relleno.
+
+    Atributos:
+    ----------
+    min_length : int
+        Tamaño mínimo en bytes para comprimir una respuesta.
+    brotli_quality : int
+        Nivel de compresión de brotli (0-11).
+    """
+    min_length = 1024
+    brotli_quality = 5
+
+    def process_response(self, request, response):
+        if response.streaming or len(response.content) < self.min_length:
+            return response
+
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        accepted = parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        # CsrfViewMiddleware envía la cookie cada vez que la página usó el token.
+        has_csrf_token = (
+            request.META.get("CSRF_COOKIE_NEEDS_UPDATE", False)
+            or settings.CSRF_COOKIE_NAME in response.cookies
+        )
+
+        if brotli is not None and "br" in accepted and not has_csrf_token:
+            encoding = "br"
+            compressed_content = brotli.compress(
+                response.content, quality=self.brotli_quality,
+            )
+        elif "gzip" in accepted:
+            encoding = "gzip"
+            compressed_content = compress_string(
+                response.content, max_random_bytes=self.max_random_bytes,
+            )
+        else:
+            return response
+
+        # Solo se devuelve el contenido comprimido si realmente es más corto.
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+
+        return response
+
+
+def _actor(request):
+    """
+    Obtiene el nombre del usuario autenticado de la solicitud.
+
+    Args:
+        request: El objeto HttpRequest.
+
+    Returns:
+        str: Nombre de usuario o cadena vacía si no hay sesión iniciada.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.get_username()
+    return ""
+
+
+class AuditMiddleware:
+    """
+    Acumula las entradas de auditoría de la solicitud y las guarda al final.
+
+    Todas las entradas se insertan en forma sincrónica con un único
+    `bulk_create` cuando la vista termina, antes de devolver la respuesta. Solo
+    se acumulan los cambios confirmados (ver `app.audit.record`), así que una
+    vista que revierte su transacción no deja entradas. Las solicitudes sin
+    cambios no ejecutan ninguna consulta y el usuario solo se resuelve si hubo
+    cambios.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit.buffered(actor=lambda: _actor(request)):
+            return self.get_response(request)
+
+
+class ClinicMiddleware:
+    """
+    Activa la clínica que atiende el dominio de la solicitud.
+
+    Los dominios de las clínicas se guardan en memoria de cada proceso y solo se
+    recargan cuando cambian o vence su plazo (ver `app.tenancy.resolve`), por lo
+    que resolver la clínica casi nunca agrega consultas.
+    Sin clínicas cargadas, la solicitud se atiende sin filtrar por clínica.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.clinic_id = tenancy.resolve(request.get_host())
+        with tenancy.activate(request.clinic_id):
+            return self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """
+    Ejecuta las vistas marcadas con `reads_from_replica` leyendo de una réplica.
+
+    Después de una solicitud que puede escribir (cualquier método no seguro)
+    agrega la cookie `replicas.STICKY_COOKIE`, que mantiene las lecturas de la
+    sesión en la base principal durante `settings.REPLICA_STICKY_SECONDS`.
+    Debe ser el último middleware, porque ejecuta la vista en `process_view`.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS", "TRACE"):
+            response.set_cookie(
+                replicas.STICKY_COOKIE, "1",
+                max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(view_func, "reads_from_replica", False):
+            return None
+
+        alias = replicas.choose_replica(request)
+        if alias is None:
+            return None
+
+        with replicas.use_replica(alias):
+            return view_func(request, *view_args, **view_kwargs)
+
+
+class ProfilingMiddleware:
+    """
+    Perfila las solicitudes pedidas con la cabecera `X-Profile` o elegidas por muestreo.
+
+    El perfil cubre los middlewares siguientes, la vista, el procesador de
+    contexto y el renderizado de la plantilla; las respuestas en streaming
+    solo se perfilan hasta que empiezan a enviarse. Sin token ni muestreo
+    configurados no agrega trabajo a la solicitud (ver `app.profiling`).
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.should_profile(request):
+            return self.get_response(request)
+
+        capture = profiling.CAPTURES[settings.PROFILER]()
+        capture.start()
+        try:
+            return self.get_response(request)
+        finally:
+            capture.stop()
+            match = request.resolver_match
+            path = profiling.profile_path(match.view_name if match else "unresolved")
+            capture.save(path)
+            logger.info("Perfil de %s guardado en %s", request.path, path)
+
+
+class SlowQueryMiddleware:
+    """
+    Atribuye las consultas lentas de la solicitud a su vista (ver `app.slow_queries`).
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with slow_queries.for_request(request):
+            return self.get_response(request)
+
+
+class HealthCheckMiddleware:
+    """
+    Atiende `/healthz` y `/readyz` antes que el resto de los middlewares.
+
+    Debe ser el primer middleware: las sondas no pasan por la validación del
+    dominio, la sesión ni la clínica (ver `app.health`).
+    """
+    views = {
+        "/healthz": health.healthz,
+        "/readyz": health.readyz,
+    }
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        view = self.views.get(request.path_info)
+        if view is None:
+            return self.get_response(request)
+        return view(request)
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-19 02:55
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_repository_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='app_client_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='app_medicine_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='app_product_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vet',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='app_vet_name_lower_idx'),
+        ),
+    ]
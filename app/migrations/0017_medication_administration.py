@@ -0,0 +1,29 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MedicationAdministration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dose', models.FloatField()),
+                ('administered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('medicine', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='app.medicine')),
+                ('pet', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='administrations', to='app.pet')),
+                ('vet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='app.vet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pet', 'administered_at'], name='app_medicat_pet_id_471f42_idx'), models.Index(fields=['administered_at'], name='app_medicat_adminis_d96d28_idx')],
+            },
+        ),
+    ]
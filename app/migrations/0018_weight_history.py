@@ -0,0 +1,75 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_weights(apps, schema_editor):
+    """Registra el peso actual de cada mascota como primer punto de su historial."""
+    Pet = apps.get_model("app", "Pet")
+    WeightRecord = apps.get_model("app", "WeightRecord")
+    WeightSeries = apps.get_model("app", "WeightSeries")
+
+    now = timezone.now()
+    day = timezone.localdate(now)
+    buckets = {
+        "day": day,
+        "week": day - timedelta(days=day.weekday()),
+        "month": day.replace(day=1),
+    }
+
+    for pet_id, weight in Pet.objects.values_list("id", "weight").iterator():
+        WeightRecord.objects.create(pet_id=pet_id, weight=weight, recorded_at=now)
+        WeightSeries.objects.bulk_create(
+            [
+                WeightSeries(
+                    pet_id=pet_id, resolution=resolution, bucket=bucket,
+                    total=weight, count=1, minimum=weight, maximum=weight,
+                )
+                for resolution, bucket in buckets.items()
+            ],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_medication_administration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeightSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('day', 'day'), ('week', 'week'), ('month', 'month')], max_length=5)),
+                ('bucket', models.DateField()),
+                ('total', models.FloatField()),
+                ('count', models.PositiveIntegerField()),
+                ('minimum', models.FloatField()),
+                ('maximum', models.FloatField()),
+                ('pet', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='weight_series', to='app.pet')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WeightRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.FloatField()),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('pet', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='weight_records', to='app.pet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pet', 'recorded_at'], name='app_weightr_pet_id_9a6dd1_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='weightseries',
+            constraint=models.UniqueConstraint(fields=('resolution', 'pet', 'bucket'), name='app_weightseries_unique_bucket'),
+        ),
+        migrations.RunPython(backfill_weights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_weight_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('pet', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='app.pet')),
+                ('vet', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='app.vet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['vet', 'start'], name='app_appoint_vet_id_49a9e1_idx'), models.Index(fields=['pet', 'start'], name='app_appoint_pet_id_52deb6_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.CheckConstraint(check=models.Q(('end__gt', models.F('start'))), name='app_appointment_end_after_start'),
+        ),
+    ]
@@ -0,0 +1,163 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:40
+
+import django.core.serializers.json
+import django.db.models.functions.text
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_audit_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='app_client_name_e3b74f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='app_client_city_d98882_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='app_client_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='app_pet_name_a924ff_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='app_pet_breed_239d86_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='app_pet_birthda_844283_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='app_pet_weight_8433e1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_name_f168ea_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_type_dcf4d8_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_price_d352a5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='provider',
+            name='app_provide_name_e75f04_idx',
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='provider',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['name'], name='app_client_name_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['city'], name='app_client_city_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('name'), condition=models.Q(('deleted_at__isnull', True)), name='app_client_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='app_client_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['name'], name='app_pet_name_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['breed'], name='app_pet_breed_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['birthday'], name='app_pet_birthday_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['weight'], name='app_pet_weight_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='app_pet_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['name'], name='app_product_name_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['type'], name='app_product_type_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('name'), condition=models.Q(('deleted_at__isnull', True)), name='app_product_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['price'], name='app_product_price_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='app_product_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='provider',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['name'], name='app_provider_name_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='provider',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='app_provider_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrow',
+            index=models.Index(fields=['model', 'object_id'], name='app_archive_model_7a4966_idx'),
+        ),
+    ]
@@ -0,0 +1,210 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:45
+
+import app.tenancy
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def create_default_clinic(apps, schema_editor):
+    """Crea la clínica por defecto (sin dominio) y le asigna los registros existentes."""
+    Clinic = apps.get_model("app", "Clinic")
+    clinic = Clinic.objects.create(name="Principal", domain="")
+
+    for model_name in ("Client", "Provider", "Product", "Vet", "Pet", "Medicine"):
+        apps.get_model("app", model_name).objects.filter(clinic__isnull=True).update(clinic=clinic)
+
+    app.tenancy.clear_cache()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Clinic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('domain', models.CharField(blank=True, max_length=253, unique=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='app_client_name_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='app_client_city_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='app_client_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='medicine',
+            name='app_medicin_name_d1c41c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='medicine',
+            name='app_medicin_dose_b95552_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='medicine',
+            name='app_medicine_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='app_pet_name_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='app_pet_breed_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='app_pet_birthday_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='pet',
+            name='app_pet_weight_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_name_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_type_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_price_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='provider',
+            name='app_provider_name_live_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vet',
+            name='app_vet_name_e6dd94_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vet',
+            name='app_vet_special_de2dd1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vet',
+            name='app_vet_name_lower_idx',
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='clinic',
+            field=models.ForeignKey(blank=True, db_index=False, default=app.tenancy.clinic_for_new_rows, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.clinic'),
+        ),
+        migrations.AddField(
+            model_name='medicine',
+            name='clinic',
+            field=models.ForeignKey(blank=True, db_index=False, default=app.tenancy.clinic_for_new_rows, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.clinic'),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='clinic',
+            field=models.ForeignKey(blank=True, db_index=False, default=app.tenancy.clinic_for_new_rows, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.clinic'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='clinic',
+            field=models.ForeignKey(blank=True, db_index=False, default=app.tenancy.clinic_for_new_rows, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.clinic'),
+        ),
+        migrations.AddField(
+            model_name='provider',
+            name='clinic',
+            field=models.ForeignKey(blank=True, db_index=False, default=app.tenancy.clinic_for_new_rows, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.clinic'),
+        ),
+        migrations.AddField(
+            model_name='vet',
+            name='clinic',
+            field=models.ForeignKey(blank=True, db_index=False, default=app.tenancy.clinic_for_new_rows, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.clinic'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'name'], name='app_client_name_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'city'], name='app_client_city_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(models.F('clinic'), django.db.models.functions.text.Lower('name'), condition=models.Q(('deleted_at__isnull', True)), name='app_client_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['clinic', 'name'], name='app_medicine_clinic_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['clinic', 'dose'], name='app_medicine_clinic_dose_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(models.F('clinic'), django.db.models.functions.text.Lower('name'), name='app_medicine_clinic_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'name'], name='app_pet_name_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'breed'], name='app_pet_breed_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'birthday'], name='app_pet_birthday_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'weight'], name='app_pet_weight_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'name'], name='app_product_name_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'type'], name='app_product_type_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.F('clinic'), django.db.models.functions.text.Lower('name'), condition=models.Q(('deleted_at__isnull', True)), name='app_product_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'price'], name='app_product_price_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='provider',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'name'], name='app_provider_name_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vet',
+            index=models.Index(fields=['clinic', 'name'], name='app_vet_clinic_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vet',
+            index=models.Index(fields=['clinic', 'specialty'], name='app_vet_clinic_specialty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vet',
+            index=models.Index(models.F('clinic'), django.db.models.functions.text.Lower('name'), name='app_vet_clinic_name_lower_idx'),
+        ),
+        migrations.RunPython(create_default_clinic, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:37
+
+from django.db import migrations, models
+
+from app.models import search_key
+
+
+def fill_name_search(apps, schema_editor):
+    """Completa el nombre normalizado de los registros existentes."""
+    for model_name in ("Client", "Medicine", "Product", "Vet"):
+        model = apps.get_model("app", model_name)
+        rows = [
+            model(pk=pk, name_search=search_key(name))
+            for pk, name in model.objects.values_list("pk", "name").iterator()
+        ]
+        model.objects.bulk_update(rows, ["name_search"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0026_clinics'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='client',
+            name='app_client_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='medicine',
+            name='app_medicine_clinic_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='app_product_name_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vet',
+            name='app_vet_clinic_name_lower_idx',
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='medicine',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='vet',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_name_search, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'name_search'], name='app_client_search_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['clinic', 'name_search'], name='app_medicine_clinic_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['clinic', 'name_search'], name='app_product_search_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vet',
+            index=models.Index(fields=['clinic', 'name_search'], name='app_vet_clinic_search_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:43
+
+import app.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0028_protect_ledgers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='clinic',
+            field=models.ForeignKey(blank=True, db_index=False, default=app.tenancy.clinic_for_new_rows, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='app.clinic'),
+        ),
+    ]
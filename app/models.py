@@ -1,7 +1,24 @@
+import calendar
+import random
 import re
+import unicodedata
+from datetime import date, datetime, time, timedelta
 from enum import Enum
 
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
+from django.db.models import Exists, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from . import audit, tenancy
+
+CONFLICT_ERROR = (
+    "Los datos fueron modificados por otro usuario. Recargue la página e intente nuevamente."
+)
+
+INVALID_VALUE_ERROR = "Por favor ingrese un valor valido"
 
 
 class Specialty(Enum):
@@ -42,6 +59,311 @@ class Specialty(Enum):
     def choices(cls):
         return [(key.value, key.value) for key in cls]
 
+
+def search_key(value):
+    """
+    Normaliza un texto para las búsquedas por prefijo.
+
+    `LOWER()` de SQLite solo convierte letras ASCII, así que "Ángel" no
+    coincidiría con "án". La clave se calcula en Python: sin mayúsculas
+    (`casefold`) ni tildes, de modo que "an", "án" y "ÁN" encuentran "Ángel".
+
+    Args:
+        value (str): Texto original.
+
+    Returns:
+        str: Texto normalizado.
+    """
+    decomposed = unicodedata.normalize("NFKD", str(value or "").casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class VersionedModel(models.Model):
+    """
+    Modelo abstracto con control de concurrencia optimista.
+
+    Atributos:
+    ----------
+    version : int
+        Número de versión del registro; se incrementa en cada actualización.
+
+    Métodos:
+    --------
+    update_if_current(values, version=None):
+        Actualiza solo los campos modificados si la versión no cambió.
+        Los cambios de los modelos auditados se registran en `AuditEntry`.
+    derived_changes(changes):
+        Columnas calculadas que acompañan a los cambios (por defecto, ninguna).
+    """
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        abstract = True
+
+    def derived_changes(self, changes):
+        return {}
+
+    def update_if_current(self, values, version=None):
+        """
+        Guarda los campos modificados con un único UPDATE condicional.
+
+        Ejecuta `UPDATE ... SET <campos>, version = version + 1 WHERE id = ? AND
+        version = ?`, de modo que si otro usuario guardó el registro mientras se
+        editaba, la actualización no pisa sus cambios.
+
+        Args:
+            values (dict): Valores candidatos por nombre de campo.
+            version (str | int, opcional): Versión que se editó (la del formulario).
+                Si no se indica se usa la versión de la instancia.
+
+        Returns:
+            tuple: (True, None) si se actualizó o no había cambios;
+            (False, errores) si hubo un conflicto de versión o un valor que no
+            se puede convertir al tipo del campo (por ejemplo, un peso "abc").
+        """
+        try:
+            expected = int(version)
+        except (TypeError, ValueError):
+            expected = self.version
+
+        changes = {}
+        previous = {}
+        errors = {}
+        for name, value in values.items():
+            field = self._meta.get_field(name)
+            try:
+                value = field.to_python(value)
+            except ValidationError:
+                errors[name] = INVALID_VALUE_ERROR
+                continue
+            current = field.to_python(getattr(self, name))
+            if value != current:
+                changes[name] = value
+                previous[name] = current
+
+        if errors:
+            return False, errors
+        if not changes:
+            return True, None
+
+        derived = self.derived_changes(changes)
+        updated = type(self).objects.filter(pk=self.pk, version=expected).update(
+            version=F("version") + 1, **changes, **derived,
+        )
+        if not updated:
+            return False, {"version": CONFLICT_ERROR}
+
+        for name, value in {**changes, **derived}.items():
+            setattr(self, name, value)
+        self.version = expected + 1
+
+        if audit.is_audited(self):
+            audit.record(
+                self._meta.model_name,
+                self.pk,
+                audit.UPDATE,
+                {name: [previous[name], value] for name, value in changes.items()},
+            )
+
+        return True, None
+
+
+class Clinic(models.Model):
+    """
+    Clínica (tenant) a la que pertenecen los registros.
+
+    Cada clínica se atiende en su propio dominio; la clínica sin dominio es la
+    clínica por defecto y atiende cualquier otro dominio (ver
+    `app.tenancy.resolve`).
+
+    Atributos:
+    ----------
+    name : str
+        Nombre de la clínica.
+    domain : str
+        Dominio por el que se accede (vacío en la clínica por defecto).
+    """
+    name = models.CharField(max_length=100)
+    domain = models.CharField(max_length=253, unique=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # También después de confirmar: otro proceso podría haber recargado los
+        # dominios antes de que el cambio fuera visible.
+        tenancy.clear_cache()
+        transaction.on_commit(tenancy.clear_cache)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        tenancy.clear_cache()
+        transaction.on_commit(tenancy.clear_cache)
+        return result
+
+
+class SearchableNameModel(models.Model):
+    """
+    Modelo abstracto con nombre buscable por prefijo (ver `views.autocomplete`).
+
+    Atributos:
+    ----------
+    name_search : str
+        Nombre normalizado con `search_key`; se completa al guardar y al
+        actualizar el nombre con `update_if_current`.
+    """
+    name_search = models.CharField(max_length=100, default="", editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.name_search = search_key(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "name_search"}
+        super().save(*args, **kwargs)
+
+    def derived_changes(self, changes):
+        if "name" in changes:
+            return {"name_search": search_key(changes["name"])}
+        return {}
+
+
+class TenantManager(models.Manager):
+    """
+    Manager que filtra por la clínica activa (ver `app.tenancy`).
+    """
+    def get_queryset(self):
+        return tenancy.scope(super().get_queryset())
+
+
+class TenantModel(VersionedModel):
+    """
+    Modelo abstracto de los registros que pertenecen a una clínica.
+
+    Las altas toman la clínica activa (o la clínica por defecto fuera de una
+    solicitud) y `objects` solo devuelve los registros de esa clínica;
+    `all_objects` devuelve los de todas. Los índices de los modelos empiezan por
+    `clinic`, de modo que las consultas de una clínica recorren solo sus filas,
+    sin importar el tamaño de las demás.
+
+    Atributos:
+    ----------
+    clinic : ForeignKey
+        Clínica del registro (nula en instalaciones sin clínicas).
+    """
+    # Los índices compuestos de cada modelo empiezan por clinic_id.
+    clinic = models.ForeignKey(
+        Clinic,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        default=tenancy.clinic_for_new_rows,
+        related_name="+",
+        db_index=False,
+    )
+
+    objects = TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        abstract = True
+
+
+# Condiciones de los índices parciales: los listados solo consultan filas vivas y
+# `purge_archived` solo las eliminadas, así que cada índice cubre únicamente su parte.
+LIVE_ROWS = Q(deleted_at__isnull=True)
+DELETED_ROWS = Q(deleted_at__isnull=False)
+
+
+class LiveManager(TenantManager):
+    """
+    Manager por defecto de los modelos con borrado lógico: excluye las filas
+    eliminadas y filtra por la clínica activa.
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class SoftDeleteModel(TenantModel):
+    """
+    Modelo abstracto con borrado lógico.
+
+    Eliminar un registro solo completa `deleted_at`; `objects` (el manager por
+    defecto, que también usan las relaciones inversas) oculta las filas
+    eliminadas y `all_objects` las incluye (de todas las clínicas). Las filas
+    eliminadas hace tiempo se mueven a `ArchivedRow` con el comando
+    `purge_archived`.
+
+    Atributos:
+    ----------
+    deleted_at : DateTimeField
+        Momento de la eliminación (nulo si el registro está vivo).
+
+    Métodos:
+    --------
+    soft_delete(pk):
+        Elimina lógicamente un registro y sus dependientes.
+    mark_deleted(ids, deleted_at):
+        Marca como eliminados varios registros con un único UPDATE.
+    soft_delete_related(ids, deleted_at):
+        Extiende la eliminación a los registros dependientes (por defecto, ninguno).
+    """
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def soft_delete(cls, pk):
+        """
+        Elimina lógicamente un registro y sus dependientes en una transacción.
+
+        Args:
+            pk (int): Id del registro.
+
+        Returns:
+            int: 1 si se eliminó, 0 si no existía o ya estaba eliminado.
+        """
+        with audit.buffered(), transaction.atomic():
+            return cls.mark_deleted([pk], timezone.now())
+
+    @classmethod
+    def mark_deleted(cls, ids, deleted_at):
+        """
+        Marca como eliminados los registros vivos indicados y sus dependientes.
+
+        Args:
+            ids (list): Ids de los registros.
+            deleted_at (datetime): Momento de la eliminación.
+
+        Returns:
+            int: Cantidad de registros marcados.
+        """
+        if not ids:
+            return 0
+
+        deleted = cls.objects.filter(pk__in=ids).update(deleted_at=deleted_at)
+        if not deleted:
+            return 0
+
+        cls.soft_delete_related(ids, deleted_at)
+        if audit.is_audited(cls):
+            for pk in ids:
+                audit.record(cls._meta.model_name, pk, audit.DELETE, {"deleted_at": [None, deleted_at]})
+
+        return deleted
+
+    @classmethod
+    def soft_delete_related(cls, ids, deleted_at):
+        pass
+
+
 def validate_client(data):
     """
     Valida los datos de un cliente.
@@ -136,7 +458,7 @@ def validate_vet(data):
     return errors
 
 
-class Vet(models.Model):
+class Vet(SearchableNameModel, TenantModel):
     """
     Modelo para representar un veterinario.
 
@@ -158,13 +480,20 @@ class Vet(models.Model):
     save_vet(vet_data):
         Guarda un nuevo veterinario en la base de datos si los datos son válidos.
     update_vet(vet_data):
-        Actualiza los datos de un veterinario existente.
+        Actualiza los datos de un veterinario existente; devuelve (guardado, errores).
     """
     name = models.CharField(max_length=100)
     phone = models.CharField(max_length=15)
     email = models.EmailField()
     specialty = models.CharField(max_length=50, choices=Specialty.choices(), default=Specialty.GENERAL.value)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["clinic", "name"], name="app_vet_clinic_name_idx"),
+            models.Index(fields=["clinic", "specialty"], name="app_vet_clinic_specialty_idx"),
+            models.Index(fields=["clinic", "name_search"], name="app_vet_clinic_search_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -185,12 +514,15 @@ class Vet(models.Model):
         return True, None
 
     def update_vet(self, vet_data):
-        self.name = vet_data.get("name", "") or self.name
-        self.email = vet_data.get("email", "") or self.email
-        self.phone = vet_data.get("phone", "") or self.phone
-        self.specialty = vet_data.get("specialty", "") or self.specialty
-
-        self.save()
+        return self.update_if_current(
+            {
+                "name": vet_data.get("name", "") or self.name,
+                "email": vet_data.get("email", "") or self.email,
+                "phone": vet_data.get("phone", "") or self.phone,
+                "specialty": vet_data.get("specialty", "") or self.specialty,
+            },
+            vet_data.get("version"),
+        )
 
 def validate_product(data):
     """
@@ -230,6 +562,10 @@ def validate_product(data):
     if not provider:
         errors["provider"] = "Por favor seleccione un proveedor"
 
+    reorder_level = str(data.get("reorder_level", ""))
+    if reorder_level != "" and not reorder_level.isdigit():
+        errors["reorder_level"] = "Por favor ingrese un stock mínimo valido"
+
     return errors
 
 def validate_pet(data):
@@ -273,7 +609,7 @@ def validate_pet(data):
         errors["weight"] = "Por favor ingrese un peso valido"
     return errors
                 
-class Provider(models.Model):
+class Provider(SoftDeleteModel):
     """
     Modelo para representar un proveedor.
 
@@ -293,12 +629,26 @@ class Provider(models.Model):
     save_provider(provider_data):
         Guarda un nuevo proveedor en la base de datos si los datos son válidos.
     update_provider(provider_data):
-        Actualiza los datos de un proveedor existente.
+        Actualiza los datos de un proveedor existente; devuelve (guardado, errores).
+    soft_delete_related(ids, deleted_at):
+        Elimina lógicamente los productos de los proveedores eliminados.
     """
     name = models.CharField(max_length=100)
     email = models.EmailField()
     address = models.CharField(max_length=100, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["clinic", "name"], name="app_provider_name_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["deleted_at"], name="app_provider_deleted_idx", condition=DELETED_ROWS),
+        ]
+
+    @classmethod
+    def soft_delete_related(cls, ids, deleted_at):
+        Product.mark_deleted(
+            list(Product.objects.filter(provider_id__in=ids).values_list("pk", flat=True)), deleted_at,
+        )
+
     def __str__(self):
         return self.name
     
@@ -317,13 +667,56 @@ class Provider(models.Model):
         return True, None
     
     def update_provider(self, provider_data):
-        self.name = provider_data.get("name", "") or self.name
-        self.email = provider_data.get("email", "") or self.email
-        self.address = provider_data.get("address", "") or self.address
-
-        self.save()
+        return self.update_if_current(
+            {
+                "name": provider_data.get("name", "") or self.name,
+                "email": provider_data.get("email", "") or self.email,
+                "address": provider_data.get("address", "") or self.address,
+            },
+            provider_data.get("version"),
+        )
     
-class Product(models.Model):
+class ProductQuerySet(models.QuerySet):
+    """
+    Consultas de stock sobre los productos.
+
+    Métodos:
+    --------
+    with_stock():
+        Anota el stock actual de cada producto.
+    low_stock():
+        Filtra los productos con stock menor o igual que su stock mínimo.
+    """
+    def with_stock(self):
+        """
+        Anota el stock actual (`stock`) a partir de la última foto más el delta.
+
+        El stock es el saldo de `StockSnapshot` más la suma de los movimientos
+        posteriores a esa foto (`id > last_movement_id`), que se resuelve con el
+        índice por producto del libro de movimientos sin sumar todo el historial.
+
+        Returns:
+            QuerySet: Productos con el atributo `stock`.
+        """
+        snapshot = StockSnapshot.objects.filter(product=OuterRef("pk"))
+        delta = (
+            StockMovement.objects.filter(product=OuterRef("pk"), pk__gt=OuterRef("snapshot_movement"))
+            .order_by()
+            .values("product")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return self.annotate(
+            snapshot_movement=Coalesce(Subquery(snapshot.values("last_movement_id")[:1]), 0),
+            stock=Coalesce(Subquery(snapshot.values("quantity")[:1]), 0)
+            + Coalesce(Subquery(delta), 0),
+        )
+
+    def low_stock(self):
+        return self.with_stock().filter(stock__lte=F("reorder_level"))
+
+
+class Product(SearchableNameModel, SoftDeleteModel):
     """
     Modelo para representar un producto.
 
@@ -337,6 +730,8 @@ class Product(models.Model):
         Precio del producto.
     provider : ForeignKey
         Proveedor del producto.
+    reorder_level : int
+        Stock mínimo; por debajo o igual a este valor el producto aparece en el reporte de faltantes.
 
     Métodos:
     --------
@@ -345,12 +740,24 @@ class Product(models.Model):
     save_product(product_data):
         Guarda un nuevo producto en la base de datos si los datos son válidos.
     update_product(product_data):
-        Actualiza los datos de un producto existente.
+        Actualiza los datos de un producto existente; devuelve (guardado, errores).
     """
     name = models.CharField(max_length=100)
     type = models.CharField(max_length=50)
     price = models.FloatField()
     provider = models.ForeignKey(Provider, on_delete=models.CASCADE, null=True, blank=True)
+    reorder_level = models.PositiveIntegerField(default=0)
+
+    objects = LiveManager.from_queryset(ProductQuerySet)()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["clinic", "name"], name="app_product_name_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["clinic", "type"], name="app_product_type_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["clinic", "name_search"], name="app_product_search_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["clinic", "price"], name="app_product_price_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["deleted_at"], name="app_product_deleted_idx", condition=DELETED_ROWS),
+        ]
 
     def __str__(self):
         return self.name
@@ -361,28 +768,48 @@ class Product(models.Model):
 
         if len(errors.keys()) > 0:
             return False, errors
-        provider_id = product_data.get("provider")
-        provider_instance = Provider.objects.get(id=provider_id)
-
-        Product.objects.create(
-            name=product_data.get("name"),
-            type=product_data.get("type"),
-            price=product_data.get("price"),
-            provider = provider_instance,
-        )
+
+        provider_error = {"provider": "Por favor seleccione un proveedor valido"}
+        try:
+            provider_id = int(product_data.get("provider"))
+        except (TypeError, ValueError):
+            return False, provider_error
+
+        # La integridad de la FK la valida la base de datos; no se consulta el
+        # proveedor salvo con una clínica activa, donde debe ser de esa clínica.
+        if tenancy.current_clinic_id() is not None and not Provider.objects.filter(pk=provider_id).exists():
+            return False, provider_error
+
+        try:
+            Product.objects.create(
+                name=product_data.get("name"),
+                type=product_data.get("type"),
+                price=product_data.get("price"),
+                provider_id=provider_id,
+                reorder_level=product_data.get("reorder_level", "") or 0,
+            )
+        except IntegrityError:
+            return False, provider_error
+
         return True, None
     
     def update_product(self, product_data):
-        self.name = product_data.get("name", "") or self.name
-        self.type = product_data.get("type", "") or self.type
         try:
-            self.price = float(product_data.get("price", "")) or self.price
+            price = float(product_data.get("price", "")) or self.price
         except ValueError:
-            pass
-
-        self.save()
+            price = self.price
+
+        return self.update_if_current(
+            {
+                "name": product_data.get("name", "") or self.name,
+                "type": product_data.get("type", "") or self.type,
+                "price": price,
+                "reorder_level": product_data.get("reorder_level", "") or self.reorder_level,
+            },
+            product_data.get("version"),
+        )
 
-class Client(models.Model):
+class Client(SearchableNameModel, SoftDeleteModel):
     """
     Modelo para representar un cliente.
 
@@ -406,7 +833,9 @@ class Client(models.Model):
     save_client(client_data):
         Guarda un nuevo cliente en la base de datos si los datos son válidos.
     update_client(client_data):
-        Actualiza los datos de un cliente existente.
+        Actualiza los datos de un cliente existente; devuelve (guardado, errores).
+    soft_delete_related(ids, deleted_at):
+        Elimina lógicamente las mascotas de los clientes eliminados.
     """
     name = models.CharField(max_length=100)
     phone = models.IntegerField()
@@ -414,6 +843,20 @@ class Client(models.Model):
     city = models.CharField(max_length=100, blank=True)
     products = models.ManyToManyField(Product)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["clinic", "name"], name="app_client_name_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["clinic", "city"], name="app_client_city_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["clinic", "name_search"], name="app_client_search_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["deleted_at"], name="app_client_deleted_idx", condition=DELETED_ROWS),
+        ]
+
+    @classmethod
+    def soft_delete_related(cls, ids, deleted_at):
+        Pet.mark_deleted(
+            list(Pet.objects.filter(client_id__in=ids).values_list("pk", flat=True)), deleted_at,
+        )
+
     def str(self):
         return self.name
 
@@ -434,12 +877,15 @@ class Client(models.Model):
         return True, None
 
     def update_client(self, client_data):
-        self.name = client_data.get("name", "") or self.name
-        self.email = client_data.get("email", "") or self.email
-        self.phone = client_data.get("phone", "") or self.phone
-        self.city = client_data.get("city", "") or self.city
-
-        self.save()
+        return self.update_if_current(
+            {
+                "name": client_data.get("name", "") or self.name,
+                "email": client_data.get("email", "") or self.email,
+                "phone": client_data.get("phone", "") or self.phone,
+                "city": client_data.get("city", "") or self.city,
+            },
+            client_data.get("version"),
+        )
 
 def validate_medicine(data):
     """
@@ -479,10 +925,18 @@ def validate_medicine(data):
         except ValueError:
             errors["dose"] = "Por favor ingrese una dosis valida"
 
+    refill_days = data.get("refill_days", "")
+    if refill_days not in ("", None):
+        try:
+            if int(refill_days) < 1:
+                errors["refill_days"] = "Por favor ingrese una cantidad de días mayor que 0"
+        except (TypeError, ValueError):
+            errors["refill_days"] = "Por favor ingrese una cantidad de días valida"
+
     return errors
 
 
-class Medicine(models.Model):
+class Medicine(SearchableNameModel, TenantModel):
     """
     Modelo para representar una medicina.
 
@@ -494,6 +948,9 @@ class Medicine(models.Model):
         Descripción de la medicina.
     dose : float
         Dosis de la medicina.
+    refill_days : int, opcional
+        Días que dura un tratamiento; se usa para recordar la reposición
+        (ver `Reminder.schedule`).
 
     Métodos:
     --------
@@ -502,13 +959,21 @@ class Medicine(models.Model):
     save_medicine(medicine_data):
         Guarda una nueva medicina en la base de datos si los datos son válidos.
     update_medicine(medicine_data):
-        Actualiza los datos de una medicina existente.
+        Actualiza los datos de una medicina existente; devuelve (guardado, errores).
     """
     name = models.CharField(max_length=100)
     description = models.CharField(max_length=500)
     dose = models.FloatField()
+    refill_days = models.PositiveIntegerField(null=True, blank=True)
 #    pets = models.ManyToManyField('Pet', related_name='medicines')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["clinic", "name"], name="app_medicine_clinic_name_idx"),
+            models.Index(fields=["clinic", "dose"], name="app_medicine_clinic_dose_idx"),
+            models.Index(fields=["clinic", "name_search"], name="app_medicine_clinic_search_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -523,18 +988,23 @@ class Medicine(models.Model):
             name=medicine_data.get("name"),
             description=medicine_data.get("description"),
             dose=medicine_data.get("dose"),
+            refill_days=medicine_data.get("refill_days") or None,
         )
     
         return True, None
     
     def update_medicine(self, medicine_data):
-        self.name =medicine_data.get("name", "") or self.name
-        self.description = medicine_data.get("description", "") or self.description
-        self.dose = medicine_data.get("dose", "") or self.dose
-
-        self.save()
+        return self.update_if_current(
+            {
+                "name": medicine_data.get("name", "") or self.name,
+                "description": medicine_data.get("description", "") or self.description,
+                "dose": medicine_data.get("dose", "") or self.dose,
+                "refill_days": medicine_data.get("refill_days", "") or self.refill_days,
+            },
+            medicine_data.get("version"),
+        )
 
-class Pet(models.Model):
+class Pet(SoftDeleteModel):
     """
     Modelo para representar una mascota.
 
@@ -562,7 +1032,10 @@ class Pet(models.Model):
     save_pet(pet_data):
         Guarda una nueva mascota en la base de datos si los datos son válidos.
     update_pet(pet_data):
-        Actualiza los datos de una mascota existente.
+        Actualiza los datos de una mascota existente; devuelve (guardado, errores).
+        Cada cambio de peso se registra en el historial (`WeightRecord`).
+    soft_delete_related(ids, deleted_at):
+        Cancela los turnos futuros y los recordatorios pendientes de las mascotas eliminadas.
     """
     name=models.CharField(max_length=100)
     breed=models.CharField(max_length=100)
@@ -572,6 +1045,21 @@ class Pet(models.Model):
     medicines = models.ManyToManyField(Medicine)
     vets = models.ManyToManyField(Vet)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["clinic", "name"], name="app_pet_name_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["clinic", "breed"], name="app_pet_breed_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["clinic", "birthday"], name="app_pet_birthday_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["clinic", "weight"], name="app_pet_weight_live_idx", condition=LIVE_ROWS),
+            models.Index(fields=["deleted_at"], name="app_pet_deleted_idx", condition=DELETED_ROWS),
+        ]
+
+    @classmethod
+    def soft_delete_related(cls, ids, deleted_at):
+        # Los turnos pasados y los recordatorios enviados quedan como historia.
+        Appointment.objects.filter(pet_id__in=ids, start__gte=deleted_at).delete()
+        Reminder.objects.filter(pet_id__in=ids, status=Reminder.PENDING).delete()
+
     def __str__(self):
         return self.name
     
@@ -581,24 +1069,1694 @@ class Pet(models.Model):
 
         if len(errors.keys()) > 0:
             return False, errors
-        client2=Client.objects.get(id=pet_data.get("client"))
-        Pet.objects.create(
-            name = pet_data.get("name"),
-            breed= pet_data.get("breed"),
-            birthday = pet_data.get("birthday"),
-            weight = pet_data.get("weight"),
-            client = client2,
-        )
+
+        client_error = {"client": "Por favor seleccione un cliente valido"}
+        try:
+            client_id = int(pet_data.get("client"))
+        except (TypeError, ValueError):
+            return False, client_error
+
+        # La integridad de la FK la valida la base de datos; no se consulta el
+        # cliente salvo con una clínica activa, donde debe ser de esa clínica.
+        if tenancy.current_clinic_id() is not None and not Client.objects.filter(pk=client_id).exists():
+            return False, client_error
+
+        try:
+            with transaction.atomic():
+                pet = Pet.objects.create(
+                    name = pet_data.get("name"),
+                    breed= pet_data.get("breed"),
+                    birthday = pet_data.get("birthday"),
+                    weight = pet_data.get("weight"),
+                    client_id = client_id,
+                )
+                WeightRecord.record(pet.id, float(pet.weight), new_pet=True)
+        except IntegrityError:
+            return False, client_error
 
         return True, None
     
     def update_pet(self, pet_data):
-        self.name = pet_data.get("name","") or self.name
-        self.breed = pet_data.get("breed", "") or self.breed
-        self.birthday = pet_data.get("birthday", "") or self.birthday
-        self.weight = pet_data.get("weight", "") or self.weight
+        previous_weight = self.weight
+
+        with transaction.atomic():
+            saved, errors = self.update_if_current(
+                {
+                    "name": pet_data.get("name", "") or self.name,
+                    "breed": pet_data.get("breed", "") or self.breed,
+                    "birthday": pet_data.get("birthday", "") or self.birthday,
+                    "weight": pet_data.get("weight", "") or self.weight,
+                },
+                pet_data.get("version"),
+            )
+            if saved and self.weight != previous_weight:
+                WeightRecord.record(self.id, self.weight)
+
+        return saved, errors
+
+
+# Ids de mascotas por consulta en `WeightSeries.chart_data` (SQLite admite 999 parámetros).
+WEIGHT_CHART_BATCH_SIZE = 900
+
+
+class WeightSeries(models.Model):
+    """
+    Serie de peso de una mascota reducida a intervalos diarios, semanales y mensuales.
+
+    Cada fila acumula los pesos registrados en un intervalo (suma, cantidad,
+    mínimo y máximo) y se actualiza al registrar un peso, por lo que las curvas
+    de crecimiento se leen de esta tabla sin recorrer el historial completo.
+
+    Atributos:
+    ----------
+    pet : ForeignKey
+        Mascota de la serie.
+    resolution : str
+        Tamaño del intervalo: "day", "week" o "month".
+    bucket : DateField
+        Primer día del intervalo (lunes para las semanas).
+    total : float
+        Suma de los pesos registrados en el intervalo.
+    count : int
+        Cantidad de pesos registrados en el intervalo.
+    minimum : float
+        Peso mínimo del intervalo.
+    maximum : float
+        Peso máximo del intervalo.
+
+    Métodos:
+    --------
+    bucket_start(resolution, day):
+        Devuelve el primer día del intervalo que contiene una fecha.
+    chart_data(pet_ids, resolution, start=None, end=None):
+        Devuelve las series de varias mascotas agrupadas por mascota.
+    """
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    RESOLUTIONS = (DAY, WEEK, MONTH)
+
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="weight_series", db_index=False)
+    resolution = models.CharField(max_length=5, choices=[(value, value) for value in RESOLUTIONS])
+    bucket = models.DateField()
+    total = models.FloatField()
+    count = models.PositiveIntegerField()
+    minimum = models.FloatField()
+    maximum = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resolution", "pet", "bucket"], name="app_weightseries_unique_bucket",
+            ),
+        ]
+
+    @property
+    def average(self):
+        return self.total / self.count
+
+    @classmethod
+    def bucket_start(cls, resolution, day):
+        """
+        Obtiene el primer día del intervalo que contiene una fecha.
+
+        Args:
+            resolution (str): "day", "week" o "month".
+            day (date): Fecha dentro del intervalo.
+
+        Returns:
+            date: Primer día del intervalo.
+        """
+        if resolution == cls.WEEK:
+            return day - timedelta(days=day.weekday())
+        if resolution == cls.MONTH:
+            return day.replace(day=1)
+        return day
+
+    @classmethod
+    def chart_data(cls, pet_ids, resolution, start=None, end=None):
+        """
+        Obtiene las series de varias mascotas con una consulta por lote de ids.
+
+        Args:
+            pet_ids (list): Ids de las mascotas.
+            resolution (str): "day", "week" o "month".
+            start (date, opcional): Primer intervalo incluido.
+            end (date, opcional): Último intervalo incluido.
+
+        Returns:
+            dict: Mapea el id de cada mascota a una lista de
+            [bucket ISO, promedio, mínimo, máximo] ordenada por fecha.
+        """
+        series = {pet_id: [] for pet_id in pet_ids}
+        if not series:
+            return series
+
+        queryset = cls.objects.filter(resolution=resolution)
+        if start is not None:
+            queryset = queryset.filter(bucket__gte=start)
+        if end is not None:
+            queryset = queryset.filter(bucket__lte=end)
+
+        ids = list(series)
+        chunk_size = WEIGHT_CHART_BATCH_SIZE
+        for offset in range(0, len(ids), chunk_size):
+            rows = (
+                queryset.filter(pet_id__in=ids[offset:offset + chunk_size])
+                .order_by("pet_id", "bucket")
+                .values_list("pet_id", "bucket", "total", "count", "minimum", "maximum")
+            )
+            for pet_id, bucket, total, count, minimum, maximum in rows:
+                series[pet_id].append([bucket.isoformat(), round(total / count, 2), minimum, maximum])
+
+        return series
+
+
+class WeightRecord(models.Model):
+    """
+    Historial de pesos de una mascota.
+
+    Atributos:
+    ----------
+    pet : ForeignKey
+        Mascota pesada.
+    weight : float
+        Peso registrado.
+    recorded_at : DateTimeField
+        Momento del registro.
+
+    Métodos:
+    --------
+    record(pet_id, weight, recorded_at=None, new_pet=False):
+        Registra un peso y actualiza las series reducidas de la mascota.
+    """
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="weight_records", db_index=False)
+    weight = models.FloatField()
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["pet", "recorded_at"]),
+        ]
+
+    @classmethod
+    def record(cls, pet_id, weight, recorded_at=None, new_pet=False):
+        """
+        Registra un peso y lo acumula en los intervalos diario, semanal y mensual.
+
+        Los intervalos existentes se actualizan con un único UPDATE; solo los que
+        faltan se crean con un INSERT por lotes. Para una mascota nueva no existen
+        intervalos previos, por lo que se omite el UPDATE.
+
+        Args:
+            pet_id (int): Id de la mascota.
+            weight (float): Peso registrado.
+            recorded_at (datetime, opcional): Momento del registro (por defecto, ahora).
+            new_pet (bool): Indica que la mascota se acaba de crear.
+
+        Returns:
+            WeightRecord: El registro creado.
+        """
+        recorded_at = recorded_at or timezone.now()
+        day = timezone.localdate(recorded_at)
+        buckets = {
+            resolution: WeightSeries.bucket_start(resolution, day)
+            for resolution in WeightSeries.RESOLUTIONS
+        }
+
+        with transaction.atomic(savepoint=False):
+            record = cls.objects.create(pet_id=pet_id, weight=weight, recorded_at=recorded_at)
+
+            missing = buckets
+            if not new_pet:
+                existing = WeightSeries.objects.filter(pet_id=pet_id).filter(
+                    Q(resolution=WeightSeries.DAY, bucket=buckets[WeightSeries.DAY])
+                    | Q(resolution=WeightSeries.WEEK, bucket=buckets[WeightSeries.WEEK])
+                    | Q(resolution=WeightSeries.MONTH, bucket=buckets[WeightSeries.MONTH]),
+                )
+                updated = existing.update(
+                    total=F("total") + weight,
+                    count=F("count") + 1,
+                    minimum=Least("minimum", models.Value(weight)),
+                    maximum=Greatest("maximum", models.Value(weight)),
+                )
+                if updated < len(buckets):
+                    found = set(existing.values_list("resolution", flat=True))
+                    missing = {key: value for key, value in buckets.items() if key not in found}
+                else:
+                    missing = {}
+
+            WeightSeries.objects.bulk_create(
+                [
+                    WeightSeries(
+                        pet_id=pet_id, resolution=resolution, bucket=bucket,
+                        total=weight, count=1, minimum=weight, maximum=weight,
+                    )
+                    for resolution, bucket in missing.items()
+                ],
+            )
+
+        return record
+
+
+def validate_administration(data):
+    """
+    Valida los datos de una administración de medicina.
+
+    Args:
+        data (dict): Diccionario con los datos de la administración.
+
+    Returns:
+        dict: Diccionario con los errores de validación.
+    """
+    errors = {}
+
+    medicine = data.get("medicine", "")
+    dose = data.get("dose", "")
+    administered_at = data.get("administered_at", "")
+
+    if not str(medicine).isdigit():
+        errors["medicine"] = "Por favor seleccione una medicina"
+
+    vet = data.get("vet", "")
+    if vet != "" and not str(vet).isdigit():
+        errors["vet"] = "Por favor seleccione un veterinario valido"
+
+    if dose == "":
+        errors["dose"] = "Por favor ingrese una dosis"
+    else:
+        try:
+            if float(dose) <= 0:
+                errors["dose"] = "Por favor ingrese una dosis mayor que 0"
+        except ValueError:
+            errors["dose"] = "Por favor ingrese una dosis valida"
+
+    if administered_at != "":
+        try:
+            datetime.fromisoformat(administered_at)
+        except ValueError:
+            errors["administered_at"] = "Por favor ingrese una fecha valida"
+
+    return errors
+
+
+class AdministrationQuerySet(models.QuerySet):
+    """
+    Consultas por rango sobre el registro de administraciones.
+
+    Todas las consultas filtran por mascota y rango de `administered_at`, de modo
+    que se resuelven con el índice (pet, administered_at) sin recorrer la tabla.
+
+    Métodos:
+    --------
+    for_pet(pet_id):
+        Filtra las administraciones de una mascota.
+    between(start=None, end=None):
+        Filtra por el rango semiabierto [start, end) de `administered_at`.
+    timeline(pet_id, cursor=None, limit=TIMELINE_PAGE_SIZE):
+        Devuelve una página de la línea de tiempo de una mascota con paginación por clave.
+    """
+    def for_pet(self, pet_id):
+        return self.filter(pet_id=pet_id)
+
+    def between(self, start=None, end=None):
+        """
+        Filtra por rango de fecha de administración.
+
+        Args:
+            start (datetime, opcional): Inicio del rango (incluido).
+            end (datetime, opcional): Fin del rango (excluido).
+
+        Returns:
+            QuerySet: Administraciones dentro del rango.
+        """
+        queryset = self
+        if start is not None:
+            queryset = queryset.filter(administered_at__gte=start)
+        if end is not None:
+            queryset = queryset.filter(administered_at__lt=end)
+        return queryset
+
+    def timeline(self, pet_id, cursor=None, limit=None):
+        """
+        Obtiene una página de la línea de tiempo de una mascota, de la más reciente a la más antigua.
+
+        La paginación es por clave (`administered_at`, `id`): la página siguiente
+        empieza después de la última fila de la anterior, por lo que el costo no
+        crece con el número de página como con OFFSET.
+
+        Args:
+            pet_id (int): Id de la mascota.
+            cursor (str, opcional): Cursor devuelto por la página anterior.
+            limit (int, opcional): Cantidad de filas por página.
+
+        Returns:
+            tuple: (lista de administraciones, cursor de la página siguiente o None).
+        """
+        limit = limit or MedicationAdministration.TIMELINE_PAGE_SIZE
+        queryset = self.for_pet(pet_id).select_related("medicine", "vet")
+
+        position = MedicationAdministration.parse_cursor(cursor)
+        if position is not None:
+            administered_at, pk = position
+            queryset = queryset.filter(
+                Q(administered_at__lt=administered_at)
+                | Q(administered_at=administered_at, pk__lt=pk),
+            )
+
+        rows = list(queryset.order_by("-administered_at", "-pk")[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1].cursor
+
+        return rows, next_cursor
+
+
+class MedicationAdministration(models.Model):
+    """
+    Registro de solo inserción de las medicinas administradas a una mascota.
+
+    A diferencia de `Pet.medicines`, cada fila guarda la dosis, el veterinario y
+    el momento de la administración. Las filas no se modifican: las correcciones
+    se registran como una nueva administración, y las filas antiguas se mueven a
+    archivos mensuales comprimidos con el comando `archive_administrations`.
+
+    Atributos:
+    ----------
+    pet : ForeignKey
+        Mascota que recibió la medicina.
+    medicine : ForeignKey
+        Medicina administrada (nula si la medicina se eliminó).
+    vet : ForeignKey
+        Veterinario que la administró (opcional).
+    dose : float
+        Dosis administrada.
+    administered_at : DateTimeField
+        Momento de la administración.
+
+    Métodos:
+    --------
+    __str__():
+        Devuelve una representación en cadena de la administración.
+    save_administration(pet, data):
+        Registra una nueva administración si los datos son válidos.
+    parse_cursor(cursor):
+        Convierte un cursor de la línea de tiempo en (administered_at, id).
+    """
+    TIMELINE_PAGE_SIZE = 50
+
+    # El índice compuesto (pet, administered_at) ya cubre las búsquedas por mascota.
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="administrations", db_index=False)
+    medicine = models.ForeignKey(Medicine, on_delete=models.SET_NULL, null=True)
+    vet = models.ForeignKey(Vet, on_delete=models.SET_NULL, null=True, blank=True)
+    dose = models.FloatField()
+    administered_at = models.DateTimeField(default=timezone.now)
+
+    objects = AdministrationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["pet", "administered_at"]),
+            models.Index(fields=["administered_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.pet_id} - {self.medicine_id} ({self.administered_at:%Y-%m-%d %H:%M})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Las administraciones no se pueden modificar")
+        super().save(*args, **kwargs)
+
+    @property
+    def cursor(self):
+        return f"{self.administered_at.isoformat()}_{self.pk}"
+
+    @staticmethod
+    def parse_cursor(cursor):
+        """
+        Convierte un cursor de la línea de tiempo en la posición que representa.
+
+        Args:
+            cursor (str): Cursor con el formato "<administered_at ISO>_<id>".
+
+        Returns:
+            tuple | None: (administered_at, id) o None si el cursor no es válido.
+        """
+        administered_at, _, pk = str(cursor or "").rpartition("_")
+        try:
+            return datetime.fromisoformat(administered_at), int(pk)
+        except ValueError:
+            return None
+
+    @classmethod
+    def save_administration(cls, pet, data):
+        errors = validate_administration(data)
+
+        if len(errors.keys()) > 0:
+            return False, errors
+
+        administered_at = data.get("administered_at", "")
+        if administered_at == "":
+            administered_at = timezone.now()
+        else:
+            administered_at = datetime.fromisoformat(administered_at)
+            if timezone.is_naive(administered_at):
+                administered_at = timezone.make_aware(administered_at)
+
+        # Las FK se asignan por id; la base de datos valida que existan.
+        try:
+            cls.objects.create(
+                pet=pet,
+                medicine_id=int(data.get("medicine")),
+                vet_id=int(data.get("vet")) if data.get("vet", "") != "" else None,
+                dose=data.get("dose"),
+                administered_at=administered_at,
+            )
+        except IntegrityError:
+            return False, {"medicine": "Por favor seleccione una medicina valida"}
+
+        return True, None
+
+
+def validate_appointment(data):
+    """
+    Valida los datos de un turno.
+
+    Args:
+        data (dict): Diccionario con los datos del turno.
+
+    Returns:
+        dict: Diccionario con los errores de validación.
+    """
+    errors = {}
+
+    vet = data.get("vet", "")
+    start = data.get("start", "")
+    duration = data.get("duration", "")
+
+    if not str(vet).isdigit():
+        errors["vet"] = "Por favor seleccione un veterinario"
+
+    if start == "":
+        errors["start"] = "Por favor ingrese la fecha y hora del turno"
+    else:
+        try:
+            datetime.fromisoformat(start)
+        except ValueError:
+            errors["start"] = "Por favor ingrese una fecha valida"
+
+    try:
+        minutes = int(duration)
+        if minutes <= 0 or minutes % Appointment.SLOT_MINUTES != 0:
+            errors["duration"] = f"La duración debe ser múltiplo de {Appointment.SLOT_MINUTES} minutos"
+        elif timedelta(minutes=minutes) > Appointment.MAX_DURATION:
+            errors["duration"] = "La duración máxima de un turno es de 4 horas"
+    except ValueError:
+        errors["duration"] = "Por favor ingrese una duración valida"
+
+    return errors
+
+
+class AppointmentQuerySet(models.QuerySet):
+    """
+    Consultas por intervalo sobre los turnos.
+
+    Métodos:
+    --------
+    overlapping(start, end):
+        Filtra los turnos que se superponen con el intervalo [start, end).
+    """
+    def overlapping(self, start, end):
+        """
+        Filtra los turnos que se superponen con un intervalo.
+
+        Como ningún turno dura más de `Appointment.MAX_DURATION`, un turno que se
+        superpone tiene que empezar después de `start - MAX_DURATION`. Esa cota
+        convierte la búsqueda en un rango acotado sobre el índice (vet, start),
+        que no depende de los años de historial acumulados.
+
+        Args:
+            start (datetime): Inicio del intervalo (incluido).
+            end (datetime): Fin del intervalo (excluido).
+
+        Returns:
+            QuerySet: Turnos con `start < end` y `end > start`.
+        """
+        return self.filter(
+            start__gt=start - Appointment.MAX_DURATION,
+            start__lt=end,
+            end__gt=start,
+        )
 
-        self.save()    
 
+class Appointment(models.Model):
+    """
+    Modelo para representar un turno de una mascota con un veterinario.
 
+    Atributos:
+    ----------
+    pet : ForeignKey
+        Mascota atendida.
+    vet : ForeignKey
+        Veterinario que atiende el turno.
+    start : DateTimeField
+        Inicio del turno.
+    end : DateTimeField
+        Fin del turno (excluido).
 
+    Métodos:
+    --------
+    __str__():
+        Devuelve una representación en cadena del turno.
+    save_appointment(pet, data):
+        Guarda un nuevo turno si los datos son válidos y el veterinario está libre.
+    next_free_slot(specialty, after, duration, days=14):
+        Busca el primer horario libre de cualquier veterinario de una especialidad.
+    agenda(vet_id, day):
+        Devuelve los turnos de un veterinario que se superponen con un día.
+    """
+    SLOT_MINUTES = 15
+    MAX_DURATION = timedelta(hours=4)
+    OPENING = time(9)
+    CLOSING = time(18)
+
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="appointments", db_index=False)
+    vet = models.ForeignKey(Vet, on_delete=models.CASCADE, related_name="appointments", db_index=False)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+
+    objects = AppointmentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["vet", "start"]),
+            models.Index(fields=["pet", "start"]),
+        ]
+        constraints = [
+            models.CheckConstraint(check=Q(end__gt=F("start")), name="app_appointment_end_after_start"),
+        ]
+
+    def __str__(self):
+        return f"{self.pet_id} - {self.vet_id} ({self.start:%Y-%m-%d %H:%M})"
+
+    @classmethod
+    def opening_hours(cls, day):
+        """
+        Obtiene el horario de atención de un día.
+
+        Args:
+            day (date): Día de atención.
+
+        Returns:
+            tuple: (apertura, cierre) como datetimes con zona horaria.
+        """
+        return (
+            timezone.make_aware(datetime.combine(day, cls.OPENING)),
+            timezone.make_aware(datetime.combine(day, cls.CLOSING)),
+        )
+
+    @classmethod
+    def round_to_slot(cls, moment):
+        """
+        Redondea un momento hacia arriba al siguiente inicio de turno.
+
+        Args:
+            moment (datetime): Momento a redondear.
+
+        Returns:
+            datetime: Primer múltiplo de SLOT_MINUTES mayor o igual que `moment`.
+        """
+        slot = timedelta(minutes=cls.SLOT_MINUTES)
+        day_start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = moment - day_start
+        return day_start + -(-elapsed // slot) * slot
+
+    @classmethod
+    def save_appointment(cls, pet, data):
+        errors = validate_appointment(data)
+
+        if len(errors.keys()) > 0:
+            return False, errors
+
+        start = datetime.fromisoformat(data.get("start"))
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        end = start + timedelta(minutes=int(data.get("duration")))
+
+        with transaction.atomic():
+            # Bloquea al veterinario (en bases que lo soportan) para que dos altas
+            # simultáneas no pasen ambas la verificación de superposición.
+            if not Vet.objects.select_for_update().filter(pk=int(data.get("vet"))).exists():
+                return False, {"vet": "Por favor seleccione un veterinario valido"}
+
+            if cls.objects.filter(vet_id=int(data.get("vet"))).overlapping(start, end).exists():
+                return False, {"start": "El veterinario ya tiene un turno en ese horario"}
+
+            cls.objects.create(pet=pet, vet_id=int(data.get("vet")), start=start, end=end)
+
+        return True, None
+
+    @classmethod
+    def next_free_slot(cls, specialty, after, duration, days=14):
+        """
+        Busca el primer horario libre de cualquier veterinario de una especialidad.
+
+        Recorre los días desde `after` con una consulta por día: trae los turnos de
+        todos los veterinarios de la especialidad que se superponen con el horario
+        de atención (rango acotado sobre el índice (vet, start)) y busca en cada
+        agenda ordenada el primer hueco de la duración pedida.
+
+        Args:
+            specialty (str): Especialidad de los veterinarios.
+            after (datetime): Momento desde el cual buscar.
+            duration (timedelta): Duración del turno.
+            days (int): Cantidad máxima de días a revisar.
+
+        Returns:
+            tuple | None: (veterinario, inicio) del primer horario libre, o None si
+            no hay horarios libres en el período.
+        """
+        vets = {vet.id: vet for vet in Vet.objects.filter(specialty=specialty).only("id", "name")}
+        if not vets:
+            return None
+
+        after = timezone.localtime(after)
+        for offset in range(days):
+            opening, closing = cls.opening_hours(after.date() + timedelta(days=offset))
+            earliest = max(opening, cls.round_to_slot(after))
+            if earliest + duration > closing:
+                continue
+
+            busy = {vet_id: [] for vet_id in vets}
+            appointments = (
+                cls.objects.filter(vet_id__in=Vet.objects.filter(specialty=specialty).values("id"))
+                .overlapping(earliest, closing)
+                .order_by("vet_id", "start")
+                .values_list("vet_id", "start", "end")
+            )
+            for vet_id, start, end in appointments:
+                busy[vet_id].append((start, end))
+
+            best = None
+            for vet_id, intervals in busy.items():
+                candidate = earliest
+                for start, end in intervals:
+                    if start - candidate >= duration:
+                        break
+                    candidate = max(candidate, cls.round_to_slot(end))
+                if candidate + duration <= closing and (best is None or candidate < best[1]):
+                    best = (vet_id, candidate)
+
+            if best is not None:
+                return vets[best[0]], best[1]
+
+        return None
+
+    @classmethod
+    def agenda(cls, vet_id, day):
+        """
+        Obtiene los turnos de un veterinario que se superponen con un día.
+
+        Args:
+            vet_id (int): Id del veterinario.
+            day (date): Día de la agenda.
+
+        Returns:
+            QuerySet: Turnos del día ordenados por inicio, con la mascota y su cliente.
+        """
+        day_start = timezone.make_aware(datetime.combine(day, time.min))
+        return (
+            cls.objects.filter(vet_id=vet_id)
+            .overlapping(day_start, day_start + timedelta(days=1))
+            .select_related("pet__client")
+            .order_by("start")
+        )
+
+
+def validate_stock_movement(data):
+    """
+    Valida los datos de un movimiento de stock.
+
+    Args:
+        data (dict): Diccionario con los datos del movimiento.
+
+    Returns:
+        dict: Diccionario con los errores de validación.
+    """
+    errors = {}
+
+    kind = data.get("kind", "")
+    quantity = data.get("quantity", "")
+
+    if kind not in StockMovement.KINDS:
+        errors["kind"] = "Por favor seleccione un tipo de movimiento"
+
+    try:
+        quantity = int(quantity)
+        if quantity == 0 or (kind != StockMovement.ADJUSTMENT and quantity < 0):
+            errors["quantity"] = "Por favor ingrese una cantidad mayor que 0"
+    except ValueError:
+        errors["quantity"] = "Por favor ingrese una cantidad valida"
+
+    if kind == StockMovement.SALE and not str(data.get("client", "")).isdigit():
+        errors["client"] = "Por favor seleccione un cliente"
+
+    return errors
+
+
+class StockMovement(models.Model):
+    """
+    Libro de movimientos de stock de los productos (solo inserción).
+
+    Las cantidades tienen signo: las compras suman, las ventas restan y los
+    ajustes pueden hacer ambas cosas.
+
+    Atributos:
+    ----------
+    product : ForeignKey
+        Producto movido. El libro no se pierde al borrar el producto (PROTECT).
+    kind : str
+        Tipo de movimiento: "purchase", "sale" o "adjustment".
+    quantity : int
+        Cantidad con signo.
+    provider : ForeignKey
+        Proveedor de la compra (solo compras).
+    client : ForeignKey
+        Cliente de la venta (solo ventas).
+    created_at : DateTimeField
+        Momento del movimiento.
+
+    Métodos:
+    --------
+    save_movement(product, data):
+        Registra un movimiento si los datos son válidos y hay stock suficiente.
+    """
+    PURCHASE = "purchase"
+    SALE = "sale"
+    ADJUSTMENT = "adjustment"
+    KINDS = {PURCHASE: "Compra", SALE: "Venta", ADJUSTMENT: "Ajuste"}
+
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="stock_movements")
+    kind = models.CharField(max_length=10, choices=list(KINDS.items()))
+    quantity = models.IntegerField()
+    provider = models.ForeignKey(Provider, on_delete=models.SET_NULL, null=True, blank=True)
+    client = models.ForeignKey(Client, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.kind} {self.quantity}"
+
+    @classmethod
+    def save_movement(cls, product, data):
+        errors = validate_stock_movement(data)
+
+        if len(errors.keys()) > 0:
+            return False, errors
+
+        kind = data.get("kind")
+        quantity = int(data.get("quantity"))
+        if kind == cls.SALE:
+            quantity = -quantity
+
+        with transaction.atomic():
+            if quantity < 0:
+                # Bloquea el producto (en bases que lo soportan) para que dos ventas
+                # simultáneas no dejen el stock en negativo.
+                stock = Product.objects.select_for_update().with_stock().get(pk=product.pk).stock
+                if stock + quantity < 0:
+                    return False, {"quantity": f"Stock insuficiente (disponible: {stock})"}
+
+            client_id = int(data.get("client")) if kind == cls.SALE else None
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        product=product,
+                        kind=kind,
+                        quantity=quantity,
+                        provider_id=product.provider_id if kind == cls.PURCHASE else None,
+                        client_id=client_id,
+                    )
+                    if client_id is not None:
+                        product.client_set.add(client_id)
+            except IntegrityError:
+                return False, {"client": "Por favor seleccione un cliente valido"}
+
+        return True, None
+
+
+class StockSnapshot(models.Model):
+    """
+    Saldo de stock de un producto hasta un movimiento del libro.
+
+    Las fotos se actualizan periódicamente con el comando `snapshot_stock`; el
+    stock actual se calcula como el saldo de la foto más los movimientos con id
+    mayor que `last_movement_id` (ver `ProductQuerySet.with_stock`).
+
+    Atributos:
+    ----------
+    product : OneToOneField
+        Producto de la foto.
+    quantity : int
+        Stock del producto hasta `last_movement_id` inclusive.
+    last_movement_id : int
+        Id del último movimiento incluido en el saldo.
+    taken_at : DateTimeField
+        Momento de la foto.
+
+    Métodos:
+    --------
+    take():
+        Actualiza las fotos de todos los productos con movimientos nuevos.
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name="stock_snapshot")
+    quantity = models.IntegerField(default=0)
+    last_movement_id = models.BigIntegerField(default=0)
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def take(cls):
+        """
+        Suma a cada foto los movimientos nuevos con una consulta agrupada por producto.
+
+        Todos los productos con movimientos nuevos se actualizan hasta el mismo
+        movimiento (el último al empezar), de modo que los movimientos registrados
+        durante la foto quedan para la próxima.
+
+        Supone que los movimientos se confirman en el orden de sus ids, es decir,
+        que las escrituras están serializadas, como en SQLite, donde cada
+        transacción de escritura bloquea la base. Con escritores concurrentes, un
+        movimiento con id menor que la marca que se confirme después de la foto
+        quedaría fuera de todas las fotos siguientes.
+
+        Returns:
+            int: Cantidad de productos actualizados.
+        """
+        watermark = StockMovement.objects.order_by("-pk").values_list("pk", flat=True).first()
+        if watermark is None:
+            return 0
+
+        # Cada foto alcanza al último movimiento de la foto anterior, así que los
+        # movimientos nuevos son un rango de ids que se recorre por la clave primaria.
+        previous_watermark = cls.objects.aggregate(models.Max("last_movement_id"))["last_movement_id__max"] or 0
+        snapshot = cls.objects.filter(product=OuterRef("product"))
+        deltas = (
+            StockMovement.objects.filter(pk__gt=previous_watermark, pk__lte=watermark)
+            .order_by()
+            .values("product")
+            .annotate(
+                delta=Sum("quantity"),
+                previous=Coalesce(Subquery(snapshot.values("quantity")[:1]), 0),
+            )
+            .values_list("product", "previous", "delta")
+        )
+
+        now = timezone.now()
+        snapshots = [
+            cls(
+                product_id=product_id,
+                quantity=previous + delta,
+                last_movement_id=watermark,
+                taken_at=now,
+            )
+            for product_id, previous, delta in deltas
+        ]
+
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                snapshots,
+                update_conflicts=True,
+                unique_fields=["product"],
+                update_fields=["quantity", "last_movement_id", "taken_at"],
+            )
+
+        return len(snapshots)
+
+
+class Invoice(models.Model):
+    """
+    Modelo para representar la factura mensual de un cliente.
+
+    Atributos:
+    ----------
+    client : ForeignKey
+        Cliente facturado. Las facturas no se pierden al borrar el cliente (PROTECT).
+    month : DateField
+        Primer día del mes facturado.
+    total : float
+        Importe total de la factura.
+    issued_at : DateTimeField
+        Momento de emisión.
+
+    Métodos:
+    --------
+    number:
+        Número de factura con el formato "AAAAMM-000001".
+    generate_month(month, batch_size=500):
+        Crea las facturas del mes a partir de las ventas del libro de stock.
+    """
+    client = models.ForeignKey(Client, on_delete=models.PROTECT, related_name="invoices", db_index=False)
+    month = models.DateField()
+    total = models.FloatField(default=0)
+    issued_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["client", "month"], name="app_invoice_unique_client_month"),
+        ]
+        indexes = [
+            models.Index(fields=["month"]),
+        ]
+
+    def __str__(self):
+        return self.number
+
+    @property
+    def number(self):
+        return f"{self.month:%Y%m}-{self.pk:06d}"
+
+    @classmethod
+    def generate_month(cls, month, batch_size=500):
+        """
+        Crea las facturas de un mes para los clientes con ventas y sin factura.
+
+        Las ventas del mes se leen con una única consulta agrupada por cliente y
+        producto, ordenada por cliente y recorrida con `iterator()`; las facturas
+        y sus líneas se insertan por lotes de `batch_size` clientes, por lo que la
+        memoria no depende de la cantidad de clientes. Los precios salen de
+        `Product.price` al momento de facturar.
+
+        Solo se facturan las ventas de productos: los tratamientos (medicinas
+        asignadas o administradas) no tienen precio en el modelo y quedan fuera
+        de la factura a propósito.
+
+        Args:
+            month (date): Primer día del mes a facturar.
+            batch_size (int): Cantidad de clientes por lote de inserción.
+
+        Returns:
+            int: Cantidad de facturas creadas.
+        """
+        start = timezone.make_aware(datetime.combine(month, time.min))
+        end = timezone.make_aware(datetime.combine((month + timedelta(days=32)).replace(day=1), time.min))
+
+        sales = (
+            StockMovement.objects.filter(
+                kind=StockMovement.SALE,
+                created_at__gte=start,
+                created_at__lt=end,
+                client__isnull=False,
+            )
+            .exclude(client__invoices__month=month)
+            .order_by()
+            .values("client_id", "product_id", "product__name", "product__price")
+            .annotate(quantity=-Sum("quantity"))
+            .order_by("client_id", "product_id")
+        )
+
+        created = 0
+        batch = {}
+        for sale in sales.iterator(chunk_size=2000):
+            if sale["client_id"] not in batch and len(batch) >= batch_size:
+                created += cls._create_batch(month, batch)
+                batch = {}
+            batch.setdefault(sale["client_id"], []).append(sale)
+        created += cls._create_batch(month, batch)
+
+        return created
+
+    @classmethod
+    def _create_batch(cls, month, batch):
+        if not batch:
+            return 0
+
+        with transaction.atomic():
+            invoices = cls.objects.bulk_create(
+                [
+                    cls(
+                        client_id=client_id,
+                        month=month,
+                        total=round(sum(sale["quantity"] * sale["product__price"] for sale in sales), 2),
+                    )
+                    for client_id, sales in batch.items()
+                ],
+            )
+            InvoiceLine.objects.bulk_create(
+                [
+                    InvoiceLine(
+                        invoice=invoice,
+                        product_id=sale["product_id"],
+                        description=sale["product__name"],
+                        quantity=sale["quantity"],
+                        unit_price=sale["product__price"],
+                    )
+                    for invoice in invoices
+                    for sale in batch[invoice.client_id]
+                ],
+            )
+
+        return len(invoices)
+
+
+class InvoiceLine(models.Model):
+    """
+    Línea de una factura.
+
+    Atributos:
+    ----------
+    invoice : ForeignKey
+        Factura a la que pertenece.
+    product : ForeignKey
+        Producto facturado (nulo si el producto se eliminó).
+    description : str
+        Nombre del producto al momento de facturar.
+    quantity : int
+        Cantidad facturada.
+    unit_price : float
+        Precio unitario al momento de facturar.
+    """
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="lines")
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, db_index=False)
+    description = models.CharField(max_length=100)
+    quantity = models.IntegerField()
+    unit_price = models.FloatField()
+
+    @property
+    def amount(self):
+        return round(self.quantity * self.unit_price, 2)
+
+
+class Job(models.Model):
+    """
+    Trabajo en segundo plano guardado en la base de datos del proyecto.
+
+    Los trabajos se encolan con `app.jobs.enqueue` y los ejecuta el comando
+    `run_worker`, que los reclama por lotes con un único UPDATE condicional, de
+    modo que dos procesos nunca ejecutan el mismo trabajo.
+
+    Atributos:
+    ----------
+    clinic : ForeignKey
+        Clínica que encoló el trabajo; la API de estado solo lo muestra a esa
+        clínica. El worker reclama los trabajos de todas.
+    name : str
+        Nombre de la tarea registrada en `app.jobs`.
+    payload : JSONField
+        Argumentos de la tarea.
+    status : str
+        Estado: "queued", "running", "done" o "failed".
+    attempts : int
+        Cantidad de intentos realizados.
+    max_attempts : int
+        Cantidad máxima de intentos antes de marcarlo como fallido.
+    run_at : DateTimeField
+        Momento a partir del cual puede ejecutarse.
+    locked_by : str
+        Identificador del proceso que lo reclamó.
+    locked_at : DateTimeField
+        Momento en que se reclamó.
+    last_error : str
+        Último error producido.
+    result : JSONField
+        Resultado devuelto por la tarea.
+    created_at : DateTimeField
+        Momento de creación.
+    finished_at : DateTimeField
+        Momento de finalización.
+
+    Métodos:
+    --------
+    claim(worker, limit):
+        Reclama hasta `limit` trabajos listos para ejecutarse.
+    start():
+        Renueva el plazo del trabajo reclamado justo antes de ejecutarlo.
+    mark_done(result):
+        Marca el trabajo como terminado.
+    mark_failed(error):
+        Reprograma el trabajo con espera exponencial o lo marca como fallido.
+
+    `start`, `mark_done` y `mark_failed` solo escriben si el trabajo sigue
+    reclamado por el mismo proceso: si su plazo venció y otro proceso lo
+    reclamó, el proceso anterior no pisa el estado.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (QUEUED, RUNNING, DONE, FAILED)
+
+    # Un trabajo "running" sin terminar después de este tiempo se considera
+    # abandonado (el proceso murió) y vuelve a poder reclamarse. El plazo corre
+    # desde que empieza a ejecutarse (`start`), no desde que se reclamó el lote.
+    LEASE = timedelta(minutes=10)
+    BACKOFF_BASE = timedelta(seconds=10)
+    BACKOFF_MAX = timedelta(hours=1)
+
+    clinic = models.ForeignKey(
+        Clinic,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        default=tenancy.clinic_for_new_rows,
+        related_name="+",
+        db_index=False,
+    )
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=[(value, value) for value in STATUSES], default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @classmethod
+    def claim(cls, worker, limit):
+        """
+        Reclama un lote de trabajos listos para ejecutarse.
+
+        El reclamo es un único `UPDATE ... WHERE id IN (SELECT ... LIMIT n) AND
+        status = <estado leído>`: en SQLite las escrituras se serializan, y en
+        bases con bloqueo por fila la condición se vuelve a evaluar al bloquear,
+        así que un trabajo reclamado por otro proceso no se actualiza dos veces.
+
+        Args:
+            worker (str): Identificador del proceso que reclama.
+            limit (int): Cantidad máxima de trabajos.
+
+        Returns:
+            list: Trabajos reclamados, en estado "running".
+        """
+        now = timezone.now()
+        ready = Q(status=cls.QUEUED, run_at__lte=now) | Q(status=cls.RUNNING, locked_at__lt=now - cls.LEASE)
+        ids = cls.objects.filter(ready).order_by("run_at", "pk").values("pk")[:limit]
+
+        claimed = cls.objects.filter(ready, pk__in=ids).update(
+            status=cls.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if not claimed:
+            return []
+
+        return list(cls.objects.filter(status=cls.RUNNING, locked_by=worker, locked_at=now).order_by("run_at", "pk"))
+
+    def _update_if_owned(self, **fields):
+        """
+        Actualiza el trabajo solo si sigue en ejecución y reclamado por este proceso.
+
+        Args:
+            **fields: Campos a actualizar.
+
+        Returns:
+            bool: True si se actualizó; False si el trabajo ya no es de este proceso.
+        """
+        updated = Job.objects.filter(pk=self.pk, status=self.RUNNING, locked_by=self.locked_by).update(**fields)
+        if not updated:
+            return False
+        for name, value in fields.items():
+            setattr(self, name, value)
+        return True
+
+    def start(self):
+        """
+        Renueva el plazo del trabajo antes de ejecutarlo.
+
+        Los trabajos se reclaman por lotes y se ejecutan uno tras otro: sin
+        renovar el plazo, los últimos del lote podrían vencer mientras esperan y
+        ser reclamados y ejecutados por otro proceso.
+
+        Returns:
+            bool: True si el trabajo sigue siendo de este proceso.
+        """
+        return self._update_if_owned(locked_at=timezone.now())
+
+    def mark_done(self, result=None):
+        """
+        Marca el trabajo como terminado.
+
+        Args:
+            result: Resultado de la tarea (serializable en JSON).
+
+        Returns:
+            bool: True si se guardó; False si el trabajo ya no es de este proceso.
+        """
+        return self._update_if_owned(status=self.DONE, result=result, finished_at=timezone.now())
+
+    def mark_failed(self, error):
+        """
+        Registra un error y reprograma el trabajo con espera exponencial.
+
+        La espera es `BACKOFF_BASE * 2 ** (intentos - 1)`, con un máximo de
+        `BACKOFF_MAX` y hasta un 10 % de variación aleatoria para que los
+        reintentos no coincidan.
+
+        Args:
+            error (str): Descripción del error.
+
+        Returns:
+            bool: True si se guardó; False si el trabajo ya no es de este proceso.
+        """
+        if self.attempts >= self.max_attempts:
+            return self._update_if_owned(last_error=error, status=self.FAILED, finished_at=timezone.now())
+
+        delay = min(self.BACKOFF_BASE * 2 ** (self.attempts - 1), self.BACKOFF_MAX)
+        return self._update_if_owned(
+            last_error=error, status=self.QUEUED, run_at=timezone.now() + delay * random.uniform(1, 1.1),
+        )
+
+
+class Reminder(models.Model):
+    """
+    Recordatorio de vacunación o de reposición de una medicina para un cliente.
+
+    `schedule` calcula los recordatorios del día con consultas por conjuntos
+    (nunca recorre las mascotas una por una) y los inserta con `key` único: volver
+    a ejecutarlo el mismo día no crea duplicados. `claim` reserva lotes
+    pendientes para enviarlos (ver `app.reminders.send_batch`), de modo que un
+    recordatorio enviado no vuelve a enviarse.
+
+    Atributos:
+    ----------
+    key : str
+        Clave de idempotencia: tipo, mascota, medicina y fecha de vencimiento.
+    kind : str
+        Tipo: "vaccination" o "refill".
+    pet : ForeignKey
+        Mascota del recordatorio.
+    medicine : ForeignKey
+        Medicina a reponer (solo en los recordatorios de reposición).
+    channel : str
+        Canal de envío: "email" o "sms".
+    recipient : str
+        Correo electrónico o teléfono del cliente.
+    message : str
+        Texto del recordatorio.
+    due_date : DateField
+        Fecha de vencimiento (cumpleaños o fin del tratamiento).
+    status : str
+        Estado: "pending", "sending" o "sent".
+    created_at : DateTimeField
+        Momento en que se programó.
+    locked_at : DateTimeField
+        Momento en que se reservó para enviarlo.
+    sent_at : DateTimeField
+        Momento en que se envió.
+
+    Métodos:
+    --------
+    schedule(day=None, lead_days=LEAD_DAYS):
+        Programa los recordatorios que vencen `lead_days` días después de `day`.
+    claim(limit):
+        Reserva hasta `limit` recordatorios pendientes.
+    """
+    VACCINATION = "vaccination"
+    REFILL = "refill"
+    KINDS = {VACCINATION: "Vacunación", REFILL: "Reposición"}
+
+    EMAIL = "email"
+    SMS = "sms"
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    STATUSES = (PENDING, SENDING, SENT)
+
+    # Anticipación con la que se avisa al cliente.
+    LEAD_DAYS = 7
+    # Un lote "sending" sin confirmar después de este tiempo vuelve a enviarse.
+    LEASE = timedelta(minutes=10)
+    BATCH_SIZE = 500
+
+    key = models.CharField(max_length=100, unique=True)
+    kind = models.CharField(max_length=20, choices=list(KINDS.items()))
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="reminders")
+    medicine = models.ForeignKey(Medicine, on_delete=models.SET_NULL, null=True, blank=True)
+    channel = models.CharField(max_length=10, choices=[(EMAIL, "Email"), (SMS, "SMS")])
+    recipient = models.CharField(max_length=254)
+    message = models.TextField()
+    due_date = models.DateField()
+    status = models.CharField(max_length=10, choices=[(value, value) for value in STATUSES], default=PENDING)
+    created_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "locked_at"]),
+            models.Index(fields=["due_date", "created_at"]),
+        ]
+
+    def __str__(self):
+        return self.key
+
+    @staticmethod
+    def _anniversaries(target, first_year):
+        """
+        Fechas de nacimiento cuyo cumpleaños cae en `target`.
+
+        Se compara `birthday IN (...)` contra el índice de `birthday` en lugar de
+        extraer mes y día de cada fila. Los nacidos un 29 de febrero se avisan el
+        28 en los años no bisiestos.
+        """
+        dates = []
+        for year in range(first_year, target.year):
+            try:
+                dates.append(target.replace(year=year))
+            except ValueError:
+                continue
+            if target.month == 2 and target.day == 28 and not calendar.isleap(target.year):
+                try:
+                    dates.append(date(year, 2, 29))
+                except ValueError:
+                    pass
+        return dates
+
+    @classmethod
+    def vaccinations_due(cls, target):
+        """
+        Mascotas cuyo refuerzo anual de vacunas (el cumpleaños) cae en `target`.
+
+        Args:
+            target (date): Fecha de vencimiento.
+
+        Returns:
+            QuerySet: Filas con los datos de la mascota y su cliente.
+        """
+        first = Pet.objects.order_by("birthday").values_list("birthday", flat=True).first()
+        if first is None:
+            return Pet.objects.none().values()
+
+        return Pet.objects.filter(
+            birthday__in=cls._anniversaries(target, first.year),
+            client__isnull=False,
+        ).values("id", "name", "client__name", "client__email", "client__phone")
+
+    @classmethod
+    def refills_due(cls, target):
+        """
+        Tratamientos que terminan en `target`.
+
+        Un tratamiento termina `refill_days` días después de la última
+        administración de la medicina a la mascota. Hay una ventana por cada
+        valor distinto de `refill_days` (pocos), todas en una sola consulta sobre
+        el índice de `administered_at`; la última administración se comprueba
+        con un NOT EXISTS sobre el índice (pet, administered_at).
+
+        Args:
+            target (date): Fecha de vencimiento.
+
+        Returns:
+            QuerySet: Filas con los datos de la mascota, la medicina y el cliente.
+        """
+        intervals = (
+            Medicine.objects.filter(refill_days__isnull=False)
+            .order_by().values_list("refill_days", flat=True).distinct()
+        )
+        start = timezone.make_aware(datetime.combine(target, time.min))
+        windows = Q()
+        for days in intervals:
+            windows |= Q(
+                medicine__refill_days=days,
+                administered_at__gte=start - timedelta(days=days),
+                administered_at__lt=start - timedelta(days=days - 1),
+            )
+        if not windows:
+            return MedicationAdministration.objects.none().values()
+
+        later = MedicationAdministration.objects.filter(
+            pet=OuterRef("pet"),
+            medicine=OuterRef("medicine"),
+            administered_at__gt=OuterRef("administered_at"),
+        )
+        administrations = MedicationAdministration.objects.filter(
+            windows, pet__deleted_at__isnull=True, pet__client__isnull=False,
+        )
+        if tenancy.current_clinic_id() is not None:
+            administrations = administrations.filter(pet__clinic_id=tenancy.current_clinic_id())
+        return (
+            administrations
+            .exclude(Exists(later))
+            .values(
+                "pet_id", "pet__name", "medicine_id", "medicine__name",
+                "pet__client__name", "pet__client__email", "pet__client__phone",
+            )
+            .order_by()
+            .distinct()
+        )
+
+    @classmethod
+    def _build(cls, kind, key, pet_id, medicine_id, client, message, due_date, created_at):
+        """Crea (sin guardar) un recordatorio eligiendo el canal del cliente."""
+        name, email, phone = client
+        channel, recipient = (cls.EMAIL, email) if email else (cls.SMS, str(phone))
+        return cls(
+            key=key,
+            kind=kind,
+            pet_id=pet_id,
+            medicine_id=medicine_id,
+            channel=channel,
+            recipient=recipient,
+            message=f"Hola {name}: {message}",
+            due_date=due_date,
+            created_at=created_at,
+        )
+
+    @classmethod
+    def _pending_for(cls, target, created_at):
+        # Una consulta por clínica: los índices de `Pet` empiezan por clinic_id.
+        for clinic_id in list(Clinic.objects.values_list("id", flat=True)) or [None]:
+            with tenancy.activate(clinic_id):
+                rows = list(cls.vaccinations_due(target))
+            for row in rows:
+                yield cls._build(
+                    cls.VACCINATION,
+                    f"{cls.VACCINATION}:{row['id']}:{target}",
+                    row["id"],
+                    None,
+                    (row["client__name"], row["client__email"], row["client__phone"]),
+                    f"el {target:%d/%m/%Y} {row['name']} cumple años y le corresponde el refuerzo de vacunas.",
+                    target,
+                    created_at,
+                )
+
+        for row in cls.refills_due(target).iterator(chunk_size=cls.BATCH_SIZE):
+            yield cls._build(
+                cls.REFILL,
+                f"{cls.REFILL}:{row['pet_id']}:{row['medicine_id']}:{target}",
+                row["pet_id"],
+                row["medicine_id"],
+                (row["pet__client__name"], row["pet__client__email"], row["pet__client__phone"]),
+                f"el {target:%d/%m/%Y} se termina {row['medicine__name']} de {row['pet__name']}.",
+                target,
+                created_at,
+            )
+
+    @classmethod
+    def schedule(cls, day=None, lead_days=LEAD_DAYS):
+        """
+        Programa los recordatorios que vencen `lead_days` días después de `day`.
+
+        Los candidatos salen de dos consultas (vacunas y reposiciones) que se
+        leen por bloques y se insertan con `bulk_create(ignore_conflicts=True)`:
+        la clave única descarta los recordatorios ya programados.
+
+        Args:
+            day (date, opcional): Día de la ejecución; por defecto hoy.
+            lead_days (int): Anticipación en días.
+
+        Returns:
+            int: Cantidad de recordatorios nuevos.
+        """
+        day = day or timezone.localdate()
+        target = day + timedelta(days=lead_days)
+        created_at = timezone.now()
+
+        batch = []
+        for reminder in cls._pending_for(target, created_at):
+            batch.append(reminder)
+            if len(batch) == cls.BATCH_SIZE:
+                cls.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            cls.objects.bulk_create(batch, ignore_conflicts=True)
+
+        # Los duplicados conservan su `created_at` original.
+        return cls.objects.filter(due_date=target, created_at=created_at).count()
+
+    @classmethod
+    def claim(cls, limit):
+        """
+        Reserva un lote de recordatorios pendientes con un UPDATE condicional.
+
+        Sigue el mismo esquema que `Job.claim`: dos procesos nunca reservan el
+        mismo recordatorio, y un lote reservado por un proceso que murió antes de
+        confirmarlo vuelve a estar disponible después de `LEASE`.
+
+        Args:
+            limit (int): Cantidad máxima de recordatorios.
+
+        Returns:
+            list: Recordatorios reservados, en estado "sending".
+        """
+        now = timezone.now()
+        ready = Q(status=cls.PENDING) | Q(status=cls.SENDING, locked_at__lt=now - cls.LEASE)
+        ids = cls.objects.filter(ready).order_by("pk").values("pk")[:limit]
+
+        if not cls.objects.filter(ready, pk__in=ids).update(status=cls.SENDING, locked_at=now):
+            return []
+
+        return list(cls.objects.filter(status=cls.SENDING, locked_at=now).order_by("pk"))
+
+
+class AuditEntry(models.Model):
+    """
+    Cambio registrado en un cliente, una mascota o un producto.
+
+    Las entradas no tienen FK al registro modificado, de modo que la historia
+    (incluida una foto de los valores al eliminarlo) se conserva después de
+    borrarlo. Ver `app.audit` para cómo se capturan.
+
+    Atributos:
+    ----------
+    model : str
+        Nombre del modelo modificado ("client", "pet" o "product").
+    object_id : int
+        Id del registro modificado.
+    action : str
+        Acción: "create", "update", "delete" o "m2m".
+    changes : JSONField
+        Cambios por campo como [valor anterior, valor nuevo].
+    actor : str
+        Usuario que hizo el cambio (vacío si no había sesión).
+    created_at : DateTimeField
+        Momento del cambio.
+
+    Métodos:
+    --------
+    history(model, object_id, limit):
+        Devuelve las últimas entradas de un registro.
+    """
+    # Modelos auditados y su nombre para mostrar.
+    MODELS = {"client": "Cliente", "pet": "Mascota", "product": "Producto"}
+    ACTIONS = {
+        audit.CREATE: "Alta",
+        audit.UPDATE: "Modificación",
+        audit.DELETE: "Baja",
+        audit.M2M: "Relación",
+    }
+
+    model = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    action = models.CharField(max_length=10, choices=list(ACTIONS.items()))
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    actor = models.CharField(max_length=150, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "object_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} {self.action}"
+
+    @classmethod
+    def history(cls, model, object_id, limit):
+        """
+        Devuelve las últimas entradas de un registro, de la más reciente a la más antigua.
+
+        Args:
+            model (str): Nombre del modelo.
+            object_id (int): Id del registro.
+            limit (int): Cantidad máxima de entradas.
+
+        Returns:
+            QuerySet: Entradas del registro.
+        """
+        return cls.objects.filter(model=model, object_id=object_id).order_by("-pk")[:limit]
+
+
+class ArchivedRow(models.Model):
+    """
+    Copia de una fila eliminada definitivamente por el comando `purge_archived`.
+
+    Guarda los valores de la fila (por nombre de columna) de cualquier tabla: el
+    registro con borrado lógico y las filas que su eliminación arrastró en
+    cascada (historial de pesos, turnos, facturas, tablas intermedias, ...).
+
+    Atributos:
+    ----------
+    model : str
+        Modelo de la fila ("app.pet", "app.pet_medicines", ...).
+    object_id : int
+        Id de la fila en su tabla original.
+    data : JSONField
+        Valores de los campos de la fila.
+    deleted_at : DateTimeField
+        Momento del borrado lógico (nulo en las filas arrastradas en cascada).
+    archived_at : DateTimeField
+        Momento en que se archivó.
+
+    Métodos:
+    --------
+    archive(instances, archived_at):
+        Copia un conjunto de instancias con un único INSERT por lote.
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "object_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
+
+    @classmethod
+    def archive(cls, instances, archived_at):
+        """
+        Copia las instancias indicadas a la tabla de archivo.
+
+        Args:
+            instances (iterable): Instancias de cualquier modelo.
+            archived_at (datetime): Momento del archivado.
+
+        Returns:
+            int: Cantidad de filas archivadas.
+        """
+        rows = [
+            cls(
+                model=instance._meta.label_lower,
+                object_id=instance.pk,
+                data={field.attname: field.value_from_object(instance) for field in instance._meta.concrete_fields},
+                deleted_at=getattr(instance, "deleted_at", None),
+                archived_at=archived_at,
+            )
+            for instance in instances
+        ]
+        cls.objects.bulk_create(rows, batch_size=500)
+        return len(rows)
@@ -0,0 +1,189 @@
+"""
+Perfiles de solicitudes bajo demanda.
+
+`ProfilingMiddleware` perfila una solicitud cuando trae la cabecera
+`X-Profile` con `settings.PROFILING_TOKEN` o cuando la elige el muestreo
+(`settings.PROFILING_SAMPLE_RATE`). El perfil se guarda en
+`settings.PROFILING_DIR` con la vista y la fecha en el nombre, y
+`python manage.py profiles` los agrupa por función.
+
+Hay dos perfiladores: "cprofile" (determinista, de la biblioteca estándar) y
+"pyinstrument" (por muestreo, con menos sobrecarga; requiere el paquete
+`pyinstrument`, que es opcional).
+"""
+import cProfile
+import hmac
+import pstats
+import random
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    from pyinstrument.session import Session as SamplingSession
+except ImportError:  # pragma: no cover - pyinstrument es opcional
+    SamplingProfiler = SamplingSession = None
+
+EXTENSIONS = {
+    "cprofile": ".prof",
+    "pyinstrument": ".pyisession",
+}
+
+# Intervalo de muestreo de pyinstrument, en segundos.
+SAMPLING_INTERVAL = 0.001
+
+
+class CProfileCapture:
+    """
+    Perfil determinista con `cProfile`, guardado en formato `pstats`.
+
+    Métodos:
+    --------
+    start():
+        Empieza a perfilar el hilo actual.
+    stop():
+        Deja de perfilar.
+    save(path):
+        Guarda el perfil en un archivo.
+    """
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def save(self, path):
+        self.profiler.dump_stats(path)
+
+
+class SamplingCapture:
+    """
+    Perfil por muestreo con `pyinstrument`, guardado como sesión JSON.
+
+    Métodos:
+    --------
+    start():
+        Empieza a muestrear el hilo actual.
+    stop():
+        Deja de muestrear.
+    save(path):
+        Guarda la sesión en un archivo.
+    """
+    def __init__(self):
+        if SamplingProfiler is None:
+            raise RuntimeError("PROFILER = 'pyinstrument' requiere instalar pyinstrument.")
+        self.profiler = SamplingProfiler(interval=SAMPLING_INTERVAL, async_mode="disabled")
+        self.session = None
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.session = self.profiler.stop()
+
+    def save(self, path):
+        self.session.save(path)
+
+
+CAPTURES = {
+    "cprofile": CProfileCapture,
+    "pyinstrument": SamplingCapture,
+}
+
+
+def should_profile(request):
+    """
+    Decide si se perfila una solicitud.
+
+    Args:
+        request: El objeto HttpRequest.
+
+    Returns:
+        bool: True si la solicitud trae el token de perfilado o si la eligió el
+        muestreo.
+    """
+    token = settings.PROFILING_TOKEN
+    header = request.headers.get("X-Profile", "")
+    if token and header and hmac.compare_digest(header, token):
+        return True
+    return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def profile_path(view_name, kind=None, now=None):
+    """
+    Ruta del archivo para el perfil de una solicitud.
+
+    Args:
+        view_name (str): Nombre de la vista (o "unresolved").
+        kind (str, opcional): "cprofile" o "pyinstrument"; por defecto `settings.PROFILER`.
+        now (datetime, opcional): Fecha del perfil; por defecto la actual.
+
+    Returns:
+        Path: `<PROFILING_DIR>/<vista>/<fecha>-<microsegundos><extensión>`.
+    """
+    kind = kind or settings.PROFILER
+    now = now or timezone.now()
+    safe_name = re.sub(r"[^\w.-]", "_", view_name)
+    directory = Path(settings.PROFILING_DIR) / safe_name
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{now:%Y%m%d-%H%M%S-%f}{EXTENSIONS[kind]}"
+
+
+def _add_cprofile(totals, path):
+    for (file_path, line_no, function), (_, calls, self_time, total_time, _) in pstats.Stats(str(path)).stats.items():
+        row = totals[(function, file_path, line_no)]
+        row["calls"] += calls
+        row["self_time"] += self_time
+        row["total_time"] += total_time
+
+
+def _add_sampling(totals, path):
+    if SamplingSession is None:
+        raise RuntimeError(f"{path}: leer perfiles de pyinstrument requiere instalar pyinstrument.")
+
+    frames = [SamplingSession.load(str(path)).root_frame()]
+    while frames:
+        frame = frames.pop()
+        if frame is None:
+            continue
+        row = totals[(frame.function, frame.file_path, frame.line_no)]
+        row["self_time"] += frame.total_self_time
+        row["total_time"] += frame.time
+        frames.extend(frame.children)
+
+
+def aggregate(paths):
+    """
+    Suma los tiempos por función de varios perfiles.
+
+    Args:
+        paths (list[Path]): Archivos `.prof` (cProfile) o `.pyisession` (pyinstrument).
+
+    Returns:
+        dict: (función, archivo, línea) -> {"calls", "self_time", "total_time",
+        "profiles"}. Los perfiles de pyinstrument no cuentan llamadas.
+    """
+    totals = defaultdict(lambda: {"calls": 0, "self_time": 0.0, "total_time": 0.0, "profiles": 0})
+
+    for path in paths:
+        profile_totals = defaultdict(lambda: {"calls": 0, "self_time": 0.0, "total_time": 0.0})
+        if path.suffix == EXTENSIONS["cprofile"]:
+            _add_cprofile(profile_totals, path)
+        else:
+            _add_sampling(profile_totals, path)
+
+        for key, row in profile_totals.items():
+            total = totals[key]
+            total["calls"] += row["calls"]
+            total["self_time"] += row["self_time"]
+            total["total_time"] += row["total_time"]
+            total["profiles"] += 1
+
+    return dict(totals)
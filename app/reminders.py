@@ -0,0 +1,105 @@
+import logging
+
+from django.core import mail
+from django.db.models import Q
+from django.utils import timezone
+
+from . import sms
+from .jobs import enqueue
+from .models import Reminder
+
+logger = logging.getLogger(__name__)
+
+
+def build_messages(reminders):
+    """
+    Arma los mensajes de correo y de SMS de un lote de recordatorios.
+
+    Args:
+        reminders (list): Recordatorios reservados con `Reminder.claim`.
+
+    Returns:
+        tuple: (lista de EmailMessage, lista de SmsMessage).
+    """
+    emails, texts = [], []
+    for reminder in reminders:
+        if reminder.channel == Reminder.EMAIL:
+            emails.append(mail.EmailMessage(
+                subject=f"Recordatorio de {Reminder.KINDS[reminder.kind].lower()}",
+                body=reminder.message,
+                to=[reminder.recipient],
+            ))
+        else:
+            texts.append(sms.SmsMessage(reminder.recipient, reminder.message))
+    return emails, texts
+
+
+def send_batch(limit=Reminder.BATCH_SIZE):
+    """
+    Envía un lote de recordatorios pendientes.
+
+    Los correos salen por una única conexión del backend de Django y los SMS por
+    el backend de `app.sms`. Cada mensaje se envía por separado y su recordatorio
+    se marca como enviado apenas sale; si un envío falla, solo los recordatorios
+    de ese canal que todavía no salieron vuelven a "pending" y el error se
+    propaga (después de intentar el otro canal) para que la cola reintente el
+    trabajo sin repetir lo ya enviado.
+
+    Args:
+        limit (int): Cantidad máxima de recordatorios del lote.
+
+    Returns:
+        dict: Cantidad de recordatorios enviados.
+    """
+    reminders = Reminder.claim(limit)
+    if not reminders:
+        return {"sent": 0}
+
+    email_ids = [reminder.pk for reminder in reminders if reminder.channel == Reminder.EMAIL]
+    text_ids = [reminder.pk for reminder in reminders if reminder.channel != Reminder.EMAIL]
+    emails, texts = build_messages(reminders)
+
+    sent = 0
+    error = None
+    for ids, messages, get_connection in (
+        (email_ids, emails, mail.get_connection),
+        (text_ids, texts, sms.get_connection),
+    ):
+        if not ids:
+            continue
+        delivered = 0
+        try:
+            with get_connection() as connection:
+                for pk, message in zip(ids, messages):
+                    connection.send_messages([message])
+                    Reminder.objects.filter(pk=pk).update(status=Reminder.SENT, sent_at=timezone.now())
+                    delivered += 1
+        except Exception as exc:
+            Reminder.objects.filter(pk__in=ids[delivered:]).update(status=Reminder.PENDING, locked_at=None)
+            error = error or exc
+        sent += delivered
+
+    logger.info("Enviados %s recordatorios", sent)
+    if error is not None:
+        raise error
+    return {"sent": sent}
+
+
+def enqueue_sends(batch_size=Reminder.BATCH_SIZE):
+    """
+    Encola un trabajo "reminders.send" por cada lote de recordatorios pendientes.
+
+    Args:
+        batch_size (int): Recordatorios por trabajo.
+
+    Returns:
+        int: Cantidad de trabajos encolados.
+    """
+    now = timezone.now()
+    pending = Reminder.objects.filter(
+        Q(status=Reminder.PENDING) | Q(status=Reminder.SENDING, locked_at__lt=now - Reminder.LEASE),
+    ).count()
+    jobs = -(-pending // batch_size)
+    for _ in range(jobs):
+        enqueue("reminders.send", {"limit": batch_size})
+    return jobs
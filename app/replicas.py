@@ -0,0 +1,92 @@
+"""
+Lecturas en réplicas de la base de datos.
+
+Las vistas marcadas con `reads_from_replica` (listados y páginas de selección)
+leen de una de las réplicas de `settings.DATABASE_REPLICAS` cuando la solicitud
+es GET; todo lo demás, y toda escritura, usa la base principal ("default").
+
+Después de una escritura (cualquier solicitud POST) el navegador recibe la
+cookie `STICKY_COOKIE` durante `settings.REPLICA_STICKY_SECONDS`: mientras
+exista, la sesión lee de la principal y ve sus propios cambios aunque las
+réplicas todavía no los hayan recibido.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+STICKY_COOKIE = "vetsoft_primary"
+
+_replica = ContextVar("replica_alias", default=None)
+
+
+def reads_from_replica(view):
+    """
+    Marca una vista de solo lectura que puede leer de una réplica.
+
+    Args:
+        view (function): La vista.
+
+    Returns:
+        function: La misma vista, marcada.
+    """
+    view.reads_from_replica = True
+    return view
+
+
+def choose_replica(request):
+    """
+    Elige la réplica para una solicitud.
+
+    Args:
+        request: El objeto HttpRequest.
+
+    Returns:
+        str | None: Alias de la réplica o None si la solicitud debe leer de la
+        base principal (método no seguro, escritura reciente o sin réplicas).
+    """
+    if request.method not in ("GET", "HEAD") or STICKY_COOKIE in request.COOKIES:
+        return None
+    if not settings.DATABASE_REPLICAS:
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def use_replica(alias):
+    """
+    Lee de una réplica dentro de un bloque.
+
+    Args:
+        alias (str | None): Alias de la réplica (None lee de la principal).
+    """
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Router que envía las lecturas a la réplica activa y las escrituras a la principal.
+
+    Métodos:
+    --------
+    db_for_read(model, **hints):
+        Devuelve la réplica activa (ver `use_replica`) o None (la principal).
+    db_for_write(model, **hints):
+        Devuelve siempre "default".
+    allow_relation(obj1, obj2, **hints):
+        Permite relacionar objetos leídos de la principal y de una réplica.
+    """
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Todas las bases contienen los mismos datos.
+        return True
@@ -0,0 +1,242 @@
+"""
+Registro de consultas SQL lentas.
+
+`install` agrega `record_slow_query` a los `execute_wrappers` de cada conexión
+nueva (se llama en `AppConfig.ready`). Las consultas que tardan al menos
+`settings.SLOW_QUERY_MS` se guardan con su SQL, parámetros, duración, vista,
+línea de la aplicación que la ejecutó y el plan (`EXPLAIN QUERY PLAN` en
+SQLite), en un buffer circular en memoria (`recent()`) y, si
+`settings.SLOW_QUERY_LOG` tiene una ruta, en un archivo JSON por línea que
+`python manage.py slow_queries` agrupa por consulta.
+"""
+import json
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+THIS_FILE = str(Path(__file__).resolve())
+APP_DIR = str(Path(THIS_FILE).parent)
+
+# Las listas IN de largo variable se agrupan como una sola consulta.
+IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+
+_request = ContextVar("slow_query_request", default=None)
+_explaining = ContextVar("slow_query_explaining", default=False)
+
+# Se reemplaza en `install` por uno de `settings.SLOW_QUERY_BUFFER` entradas.
+_buffer = deque(maxlen=500)
+_file_lock = threading.Lock()
+
+
+def recent():
+    """
+    Consultas lentas registradas por este proceso.
+
+    Returns:
+        list[dict]: Las últimas entradas, de la más antigua a la más reciente.
+    """
+    return list(_buffer)
+
+
+def clear():
+    """Vacía el buffer de consultas lentas del proceso."""
+    _buffer.clear()
+
+
+@contextmanager
+def for_request(request):
+    """
+    Atribuye a una solicitud las consultas ejecutadas dentro de un bloque.
+
+    Args:
+        request: El objeto HttpRequest.
+    """
+    token = _request.set(request)
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+def _current_view():
+    """
+    Vista de la solicitud en curso.
+
+    Returns:
+        str: Nombre de la vista, la ruta si la URL no se resolvió todavía, o
+        cadena vacía fuera de una solicitud.
+    """
+    request = _request.get()
+    if request is None:
+        return ""
+    match = request.resolver_match
+    return match.view_name if match else request.path
+
+
+def _call_site():
+    """
+    Línea de la aplicación más cercana a la consulta.
+
+    Returns:
+        str: "archivo:línea en función", o cadena vacía si la consulta no se
+        ejecutó desde el código de la aplicación.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != THIS_FILE:
+            relative = Path(filename).relative_to(Path(APP_DIR).parent)
+            return f"{relative}:{frame.f_lineno} en {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ""
+
+
+def _explain(connection, sql, params):
+    """
+    Obtiene el plan de una consulta.
+
+    Args:
+        connection: Conexión de Django que ejecutó la consulta.
+        sql (str): SQL con marcadores de parámetros.
+        params: Parámetros de la consulta.
+
+    Returns:
+        list[str] | None: Filas del plan, o None si la base no pudo explicarla.
+    """
+    token = _explaining.set(True)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            # La última columna tiene el detalle (en SQLite las anteriores son ids del árbol).
+            return [str(row[-1]) for row in cursor.fetchall()]
+    except DatabaseError:
+        return None
+    finally:
+        _explaining.reset(token)
+
+
+def _write(entry):
+    path = settings.SLOW_QUERY_LOG
+    if not path:
+        return
+    line = json.dumps(entry, default=str)
+    with _file_lock:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as stream:
+            stream.write(line + "\n")
+
+
+def record_slow_query(execute, sql, params, many, context):
+    """
+    Envoltorio de ejecución que registra las consultas lentas.
+
+    Args:
+        execute: Función que ejecuta la consulta (ver `connection.execute_wrapper`).
+        sql (str): SQL con marcadores de parámetros.
+        params: Parámetros (una lista de ellos si `many`).
+        many (bool): True para `executemany`.
+        context (dict): Contexto de Django, con la conexión en "connection".
+
+    Returns:
+        El resultado de `execute`.
+    """
+    if _explaining.get():
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    if duration_ms >= settings.SLOW_QUERY_MS:
+        # En executemany los parámetros pueden ser un iterador ya consumido:
+        # no se guardan ni se explica la consulta.
+        entry = {
+            "time": timezone.now().isoformat(),
+            "sql": sql,
+            "params": None if many else params,
+            "many": many,
+            "duration_ms": round(duration_ms, 3),
+            "view": _current_view(),
+            "site": _call_site(),
+            "plan": None if many else _explain(context["connection"], sql, params),
+        }
+        _buffer.append(entry)
+        _write(entry)
+
+    return result
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    if record_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_slow_query)
+
+
+def install():
+    """
+    Registra las consultas lentas de todas las conexiones.
+
+    El envoltorio se agrega a cada conexión al abrirse (y a las ya abiertas);
+    no hace nada si `settings.SLOW_QUERY_MS` es None.
+    """
+    global _buffer
+    if settings.SLOW_QUERY_MS is None:
+        return
+    _buffer = deque(maxlen=settings.SLOW_QUERY_BUFFER)
+    connection_created.connect(_on_connection_created, dispatch_uid="slow_query_log")
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            _on_connection_created(None, connection)
+
+
+def normalize(sql):
+    """
+    Forma de una consulta para agruparla con sus repeticiones.
+
+    Args:
+        sql (str): SQL con marcadores de parámetros.
+
+    Returns:
+        str: El SQL con las listas IN reducidas a "IN (...)".
+    """
+    return IN_LIST.sub("IN (...)", sql)
+
+
+def top_offenders(entries, limit=20):
+    """
+    Agrupa las consultas lentas y las ordena por tiempo total.
+
+    Args:
+        entries (iterable[dict]): Entradas del registro.
+        limit (int): Cantidad de grupos devueltos.
+
+    Returns:
+        list[dict]: Por consulta: "sql", "count", "total_ms", "max_ms", las
+        vistas y líneas que la ejecutaron y el plan de la ejecución más lenta.
+    """
+    groups = {}
+    for entry in entries:
+        key = normalize(entry["sql"])
+        group = groups.setdefault(
+            key, {"sql": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "views": set(), "sites": set(), "plan": None},
+        )
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        if entry["view"]:
+            group["views"].add(entry["view"])
+        if entry["site"]:
+            group["sites"].add(entry["site"])
+        if entry["duration_ms"] >= group["max_ms"]:
+            group["max_ms"] = entry["duration_ms"]
+            group["plan"] = entry["plan"]
+
+    return sorted(groups.values(), key=lambda group: group["total_ms"], reverse=True)[:limit]
@@ -0,0 +1,131 @@
+"""
+Backends de envío de SMS con la misma interfaz que los de correo de Django.
+
+El backend se elige con `settings.SMS_BACKEND`. Los incluidos son sustitutos
+locales (consola, archivo y memoria); un proveedor real solo necesita otra
+clase con `send_messages(messages)`.
+"""
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Mensajes enviados con `LocmemBackend` (lo usan los tests, como `mail.outbox`).
+outbox = []
+
+
+class SmsMessage:
+    """
+    Mensaje de texto a un número de teléfono.
+
+    Atributos:
+    ----------
+    to : str
+        Número de destino.
+    body : str
+        Texto del mensaje.
+    """
+    def __init__(self, to, body):
+        self.to = str(to)
+        self.body = body
+
+    def __str__(self):
+        return f"{self.to}: {self.body}"
+
+
+class BaseSmsBackend:
+    """
+    Clase base de los backends de SMS.
+
+    Como los backends de correo, se pueden usar como administrador de contexto
+    para abrir la conexión una vez y enviar varios lotes por ella.
+
+    Métodos:
+    --------
+    open():
+        Abre la conexión con el proveedor; por defecto no hace nada.
+    close():
+        Cierra la conexión con el proveedor; por defecto no hace nada.
+    send_messages(messages):
+        Envía una lista de `SmsMessage` y devuelve la cantidad enviada.
+    """
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        try:
+            self.open()
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send_messages(self, messages):
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseSmsBackend):
+    """Escribe los mensajes en la salida estándar (o en `stream`)."""
+    def __init__(self, stream=None, **kwargs):
+        super().__init__(**kwargs)
+        self.stream = stream or sys.stdout
+        self._lock = threading.RLock()
+
+    def write_message(self, message):
+        self.stream.write(f"SMS {message}\n")
+
+    def send_messages(self, messages):
+        with self._lock:
+            for message in messages:
+                self.write_message(message)
+            self.stream.flush()
+        return len(messages)
+
+
+class FileBackend(ConsoleBackend):
+    """
+    Agrega los mensajes a un archivo por proceso dentro de `SMS_FILE_PATH`.
+    """
+    def __init__(self, file_path=None, **kwargs):
+        super().__init__(stream=None, **kwargs)
+        self.file_path = Path(file_path or settings.SMS_FILE_PATH)
+        self.file_path.mkdir(parents=True, exist_ok=True)
+        self.filename = self.file_path / f"{datetime.now():%Y%m%d-%H%M%S}-{id(self)}.log"
+
+    def send_messages(self, messages):
+        with self.filename.open("a", encoding="utf-8") as stream:
+            self.stream = stream
+            return super().send_messages(messages)
+
+
+class LocmemBackend(BaseSmsBackend):
+    """Guarda los mensajes en `app.sms.outbox`."""
+    def send_messages(self, messages):
+        outbox.extend(messages)
+        return len(messages)
+
+
+def get_connection(backend=None, **kwargs):
+    """
+    Crea una instancia del backend de SMS configurado.
+
+    Args:
+        backend (str, opcional): Ruta de la clase; por defecto `settings.SMS_BACKEND`.
+        **kwargs: Argumentos para el constructor del backend.
+
+    Returns:
+        BaseSmsBackend: El backend listo para enviar mensajes.
+    """
+    return import_string(backend or settings.SMS_BACKEND)(**kwargs)
@@ -0,0 +1,64 @@
+// Widget de búsqueda incremental para los selectores de clientes, medicinas,
+// veterinarios y productos. Consulta el endpoint JSON indicado en
+// data-autocomplete-url y guarda el id elegido en el input oculto.
+(function () {
+    const DEBOUNCE_MS = 200;
+
+    function setup(widget) {
+        const hidden = widget.querySelector("input[type=hidden]");
+        const input = widget.querySelector("input[type=search]");
+        const list = widget.querySelector("[role=listbox]");
+        let timer = null;
+        let controller = null;
+
+        function render(results) {
+            list.replaceChildren();
+            for (const item of results) {
+                const option = document.createElement("li");
+                option.setAttribute("role", "option");
+                option.className = "list-group-item list-group-item-action";
+                option.textContent = item.name;
+                option.addEventListener("mousedown", (event) => {
+                    event.preventDefault();
+                    hidden.value = item.id;
+                    input.value = item.name;
+                    list.replaceChildren();
+                });
+                list.appendChild(option);
+            }
+        }
+
+        async function search(term) {
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            const url = new URL(widget.dataset.autocompleteUrl, window.location.origin);
+            url.searchParams.set("q", term);
+            try {
+                const response = await fetch(url, { signal: controller.signal });
+                const data = await response.json();
+                render(data.results);
+            } catch (error) {
+                if (error.name !== "AbortError") {
+                    throw error;
+                }
+            }
+        }
+
+        input.addEventListener("input", () => {
+            hidden.value = "";
+            clearTimeout(timer);
+            const term = input.value.trim();
+            if (term === "") {
+                list.replaceChildren();
+                return;
+            }
+            timer = setTimeout(() => search(term), DEBOUNCE_MS);
+        });
+
+        input.addEventListener("blur", () => list.replaceChildren());
+    }
+
+    document.querySelectorAll("[data-autocomplete-url]").forEach(setup);
+})();
@@ -0,0 +1,59 @@
+from datetime import date
+
+from .jobs import task
+from .models import Invoice, Reminder, StockSnapshot
+from .reminders import enqueue_sends, send_batch
+
+
+@task("stock.snapshot")
+def snapshot_stock():
+    """
+    Actualiza las fotos de stock (ver `StockSnapshot.take`).
+
+    Returns:
+        dict: Cantidad de productos actualizados.
+    """
+    return {"updated": StockSnapshot.take()}
+
+
+@task("invoices.generate")
+def generate_invoices(month):
+    """
+    Genera las facturas de un mes (ver `Invoice.generate_month`).
+
+    Args:
+        month (str): Mes con el formato "YYYY-MM".
+
+    Returns:
+        dict: Cantidad de facturas creadas.
+    """
+    return {"created": Invoice.generate_month(date.fromisoformat(f"{month}-01"))}
+
+
+@task("reminders.schedule")
+def schedule_reminders(day=None):
+    """
+    Programa los recordatorios del día y encola su envío por lotes.
+
+    Args:
+        day (str, opcional): Día con el formato "YYYY-MM-DD"; por defecto hoy.
+
+    Returns:
+        dict: Recordatorios nuevos y trabajos de envío encolados.
+    """
+    created = Reminder.schedule(date.fromisoformat(day) if day else None)
+    return {"created": created, "jobs": enqueue_sends()}
+
+
+@task("reminders.send")
+def send_reminders(limit=Reminder.BATCH_SIZE):
+    """
+    Envía un lote de recordatorios pendientes (ver `app.reminders.send_batch`).
+
+    Args:
+        limit (int): Cantidad máxima de recordatorios.
+
+    Returns:
+        dict: Cantidad de recordatorios enviados.
+    """
+    return send_batch(limit)
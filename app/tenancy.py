@@ -0,0 +1,124 @@
+"""
+Clínica (tenant) activa durante una solicitud o un bloque de código.
+
+`ClinicMiddleware` resuelve la clínica por el dominio de la solicitud y la
+activa; los managers de los modelos con clínica (`TenantManager`) filtran por
+ella y las altas la toman como valor por defecto. Sin clínica activa (comandos,
+migraciones, instalaciones sin clínicas) las consultas no se filtran.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+_clinic = ContextVar("clinic_id", default=None)
+
+# Clave de la caché de Django con la versión de los dominios; cambia cada vez
+# que cambia una clínica (ver `clear_cache`).
+VERSION_KEY = "tenancy:domains-version"
+
+# Dominio -> id de clínica de este proceso, con la versión y el momento en que
+# se cargó (ver `resolve`).
+_domains = None
+_version = None
+_loaded_at = 0.0
+
+
+def current_clinic_id():
+    """
+    Obtiene la clínica activa.
+
+    Returns:
+        int | None: Id de la clínica activa o None si no hay ninguna.
+    """
+    return _clinic.get()
+
+
+@contextmanager
+def activate(clinic_id):
+    """
+    Activa una clínica dentro de un bloque.
+
+    Args:
+        clinic_id (int | None): Id de la clínica (None desactiva el filtro).
+    """
+    token = _clinic.set(clinic_id)
+    try:
+        yield
+    finally:
+        _clinic.reset(token)
+
+
+def scope(queryset):
+    """
+    Filtra un queryset por la clínica activa, si hay una.
+
+    Args:
+        queryset (QuerySet): Queryset de un modelo con clínica.
+
+    Returns:
+        QuerySet: El queryset filtrado o el mismo queryset.
+    """
+    clinic_id = _clinic.get()
+    if clinic_id is None:
+        return queryset
+    return queryset.filter(clinic_id=clinic_id)
+
+
+def resolve(host):
+    """
+    Obtiene la clínica que atiende un dominio.
+
+    Los dominios se guardan en memoria del proceso y se vuelven a cargar de la
+    base cuando cambia la versión publicada en la caché de Django (otro proceso
+    modificó una clínica) o pasaron `settings.CLINIC_DOMAINS_TTL` segundos desde
+    la última carga; esto último cubre una caché que no es compartida entre
+    procesos, como la LocMemCache por defecto.
+
+    Args:
+        host (str): Dominio de la solicitud (con o sin puerto).
+
+    Returns:
+        int | None: Id de la clínica del dominio, o de la clínica sin dominio
+        (la clínica por defecto); None si no hay ninguna.
+    """
+    global _domains, _version, _loaded_at
+    version = cache.get(VERSION_KEY)
+    if _domains is None or version != _version or time.monotonic() - _loaded_at >= settings.CLINIC_DOMAINS_TTL:
+        from .models import Clinic
+
+        _domains = dict(Clinic.objects.values_list("domain", "id"))
+        _version = version
+        _loaded_at = time.monotonic()
+
+    domain = host.split(":", 1)[0].lower()
+    return _domains.get(domain, _domains.get(""))
+
+
+def clinic_for_new_rows():
+    """
+    Clínica que se asigna a los registros nuevos.
+
+    Returns:
+        int | None: La clínica activa o, fuera de una solicitud (comandos,
+        tareas), la clínica por defecto; None si no hay clínicas.
+    """
+    clinic_id = _clinic.get()
+    if clinic_id is None:
+        clinic_id = resolve("")
+    return clinic_id
+
+
+def clear_cache():
+    """
+    Descarta los dominios cargados por `resolve`.
+
+    Además publica una versión nueva en la caché de Django, para que los demás
+    procesos que la comparten vuelvan a cargarlos en su próxima solicitud.
+    """
+    global _domains
+    _domains = None
+    cache.set(VERSION_KEY, uuid4().hex, None)
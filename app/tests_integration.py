@@ -1,9 +1,106 @@
-from datetime import date
-
+import shutil
+import tempfile
+import unittest
+import zipfile
+from datetime import date, datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError
+from django.db.models.signals import pre_delete
+from django.http import StreamingHttpResponse
 from django.shortcuts import reverse
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+
+from app import profiling, tenancy, warmup
+from app.management.commands.archive_administrations import read_partition
+from app.management.commands.sync_replicas import copy_database
+from app.middleware import CompressionMiddleware
+from app.models import (
+    INVALID_VALUE_ERROR,
+    Appointment,
+    ArchivedRow,
+    AuditEntry,
+    Client,
+    Clinic,
+    Invoice,
+    Job,
+    MedicationAdministration,
+    Medicine,
+    Pet,
+    Product,
+    Provider,
+    Reminder,
+    Specialty,
+    StockMovement,
+    Vet,
+    WeightRecord,
+)
+from app.replicas import STICKY_COOKIE
+
+
+class MetricsTest(TestCase):
+    """
+    Pruebas para el endpoint de métricas.
+
+    Métodos:
+    --------
+    test_metrics_use_prometheus_format_without_queries():
+        Verifica que las métricas se publiquen en texto sin consultar la base.
+    """
+    def test_metrics_use_prometheus_format_without_queries(self):
+        self.client.get(reverse("home"))  # carga los dominios de las clínicas
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4")
+        self.assertContains(response, "# TYPE vetsoft_requests_total counter")
+        self.assertContains(response, "vetsoft_workers_busy ")
+
+
+class HealthTest(TestCase):
+    """
+    Pruebas para los endpoints de salud y el precalentamiento.
+
+    Métodos:
+    --------
+    test_healthz_skips_database_and_host_validation():
+        Verifica que `/healthz` responda sin consultas y con cualquier dominio.
+    test_readyz_warms_worker_before_ready():
+        Verifica que `/readyz` precaliente el worker y responda con cada verificación.
+    test_readyz_fails_when_cache_is_unreachable():
+        Verifica que una cache que no guarda valores haga fallar la readiness.
+    """
+    def test_healthz_skips_database_and_host_validation(self):
+        with self.assertNumQueries(0):
+            response = self.client.get("/healthz", HTTP_HOST="10.0.0.5")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"ok")
+
+    def test_readyz_warms_worker_before_ready(self):
+        Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+        warmup._ready.clear()
+
+        response = self.client.get("/readyz", HTTP_HOST="10.0.0.5")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {"status": "ok", "checks": {"database": True, "migrations": True, "caches": True, "warmup": True}},
+        )
+        self.assertTrue(warmup.is_ready())
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+    def test_readyz_fails_when_cache_is_unreachable(self):
+        response = self.client.get("/readyz")
 
-from app.models import Client, Medicine, Pet, Provider, Specialty, Vet
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "unavailable")
+        self.assertFalse(response.json()["checks"]["caches"])
 
 
 class HomePageTest(TestCase):
@@ -359,6 +456,23 @@ class VetTest(TestCase):
         self.assertEqual(editedVet.email, vet.email)
         self.assertEqual(editedVet.specialty, Specialty.SURGERY.value)
 
+    def test_edit_vet_with_stale_version_shows_conflict(self):
+        vet = Vet.objects.create(
+            name="Carlos Chaplin",
+            phone="2284563542",
+            email="carlix@gmail.com",
+            specialty=Specialty.GENERAL.value,
+        )
+        vet.update_vet({"name": "Diogenes Sinope"})
+
+        response = self.client.post(
+            reverse("vets_form"),
+            data={"id": vet.id, "version": 1, "name": "Carlos Chaplin"},
+        )
+
+        self.assertContains(response, "Los datos fueron modificados por otro usuario")
+        self.assertEqual(Vet.objects.get(pk=vet.id).name, "Diogenes Sinope")
+
     def test_404_if_vet_doesnt_exists(self):
         response = self.client.get(reverse("vets_edit", kwargs={"id": 100}))
         self.assertEqual(response.status_code, 404)
@@ -475,7 +589,42 @@ class PetsTest(TestCase):
         Verifica si se muestran correctamente los errores de validación al intentar crear una mascota con datos inválidos.
     test_validation_invalid_weight():
         Verifica si se muestra correctamente el error al ingresar un peso inválido al crear una mascota.
+    test_repo_renders_single_delete_form():
+        Verifica que el listado use un único formulario de eliminación con un solo token CSRF.
+    test_can_delete_pet_from_shared_form():
+        Verifica que se pueda eliminar una mascota enviando su id al formulario compartido.
+    test_add_vet_and_medicine_without_selection():
+        Verifica que agregar un veterinario o una medicina sin elegirlos muestre un error en lugar de fallar.
+    test_edit_with_unparseable_values_shows_errors():
+        Verifica que editar una mascota con un peso o una fecha inválidos muestre errores en lugar de fallar.
     """
+    def test_repo_renders_single_delete_form(self):
+        client = Client.objects.create(
+            name="Juan Sebastian Veron",
+            phone="54221555232",
+            city="La Plata",
+            email="brujita75@hotmail.com",
+        )
+        for name in ["Loki", "Thor", "Odin"]:
+            Pet.objects.create(
+                name=name, breed="Border Collie", birthday=date(2024,5,5), weight=10, client=client,
+            )
+
+        response = self.client.get(reverse("pets_repo"))
+
+        self.assertContains(response, 'id="delete-form"', count=1)
+        self.assertContains(response, "csrfmiddlewaretoken", count=1)
+        self.assertContains(response, 'form="delete-form" name="pet_id"', count=3)
+        self.assertTemplateUsed(response, "pets/row.html")
+
+    def test_can_delete_pet_from_shared_form(self):
+        pet = Pet.objects.create(name="Loki", breed="Border Collie", birthday=date(2024,5,5), weight=10)
+
+        response = self.client.post(reverse("pets_delete"), data={"pet_id": pet.id})
+
+        self.assertRedirects(response, reverse("pets_repo"))
+        self.assertFalse(Pet.objects.filter(pk=pet.id).exists())
+
     def test_can_create_pet(self):
 
         Client.save_client(
@@ -539,4 +688,1091 @@ class PetsTest(TestCase):
                 "client":1,
             },
         )
-        self.assertContains(response, "Por favor ingrese un peso mayor que 0")
\ No newline at end of file
+        self.assertContains(response, "Por favor ingrese un peso mayor que 0")
+
+    def test_edit_with_unparseable_values_shows_errors(self):
+        client = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+        pet = Pet.objects.create(name="Loki", breed="Collie", birthday=date(2020,1,1), weight=10, client=client)
+
+        response = self.client.post(
+            reverse("pets_form"),
+            data={"id": pet.id, "version": pet.version, "weight": "abc", "birthday": "2020-13-45", "client": client.id},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["errors"], {"weight": INVALID_VALUE_ERROR, "birthday": INVALID_VALUE_ERROR},
+        )
+        pet.refresh_from_db()
+        self.assertEqual((pet.weight, pet.version), (10, 1))
+
+    def test_add_vet_and_medicine_without_selection(self):
+        client = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+        pet = Pet.objects.create(name="Loki", breed="Collie", birthday=date(2020,1,1), weight=10, client=client)
+        product = Product.objects.create(name="Alimento", type="Comida", price=10)
+
+        vet = self.client.post(reverse("pets_add_vet", kwargs={"id": pet.id}), data={"vet_id": ""})
+        medicine = self.client.post(reverse("pets_add_medicine", kwargs={"id": pet.id}), data={"medicine_id": "999"})
+        products = self.client.post(reverse("clients_add_product", kwargs={"id": client.id}), data={})
+
+        self.assertContains(vet, "Seleccione un veterinario de la lista")
+        self.assertContains(medicine, "Seleccione una medicina de la lista")
+        self.assertContains(products, "Seleccione un producto de la lista")
+        self.assertFalse(pet.vets.exists())
+        self.assertFalse(pet.medicines.exists())
+
+        self.client.post(reverse("clients_add_product", kwargs={"id": client.id}), data={"product_id": product.id})
+        self.assertTrue(client.products.filter(pk=product.pk).exists())
+
+
+class CompressionMiddlewareTest(TestCase):
+    """
+    Pruebas para el middleware de compresión de respuestas.
+
+    Métodos:
+    --------
+    test_uses_brotli_when_accepted():
+        Verifica que se use brotli si el cliente lo acepta y no hay token CSRF.
+    test_uses_gzip_for_pages_with_csrf_token():
+        Verifica que las páginas con token CSRF se compriman con gzip.
+    test_skips_when_encoding_not_accepted():
+        Verifica que no se comprima si el cliente no acepta ninguna codificación.
+    test_skips_streaming_responses():
+        Verifica que las respuestas en streaming no se compriman.
+    """
+    def test_uses_brotli_when_accepted(self):
+        response = self.client.get(reverse("home"), HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+
+    def test_uses_gzip_for_pages_with_csrf_token(self):
+        response = self.client.get(reverse("clients_form"), HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+
+    def test_skips_when_encoding_not_accepted(self):
+        response = self.client.get(reverse("home"), HTTP_ACCEPT_ENCODING="gzip;q=0")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_skips_streaming_responses(self):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip, br")
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter([b"a" * 4096])),
+        )
+
+        response = middleware(request)
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class RepositoryFilterTest(TestCase):
+    """
+    Pruebas para el filtrado, ordenamiento y paginación de los listados.
+
+    Métodos:
+    --------
+    test_filters_pets_by_client_and_birthday_range():
+        Verifica que se filtren las mascotas por cliente y rango de cumpleaños.
+    test_sorts_products_by_price_descending():
+        Verifica que se ordenen los productos por precio en forma descendente.
+    test_ignores_unknown_and_invalid_params():
+        Verifica que se ignoren parámetros no permitidos o con valores inválidos.
+    test_ignores_out_of_range_ids():
+        Verifica que se ignore un id de cliente o proveedor mayor que un entero de 64 bits.
+    test_paginates_repository():
+        Verifica que el listado se pagine y conserve los filtros en los enlaces.
+    """
+    def setUp(self):
+        self.juan = Client.objects.create(name="Juan", phone="54221555232", city="La Plata", email="juan@gmail.com")
+        self.ana = Client.objects.create(name="Ana", phone="54221555233", city="Berisso", email="ana@gmail.com")
+
+    def test_filters_pets_by_client_and_birthday_range(self):
+        Pet.objects.create(name="Loki", breed="Collie", birthday=date(2020,1,1), weight=10, client=self.juan)
+        Pet.objects.create(name="Thor", breed="Collie", birthday=date(2023,1,1), weight=10, client=self.juan)
+        Pet.objects.create(name="Odin", breed="Collie", birthday=date(2020,6,1), weight=10, client=self.ana)
+
+        response = self.client.get(
+            reverse("pets_repo"),
+            {"client": self.juan.id, "birthday_from": "2019-01-01", "birthday_to": "2021-12-31"},
+        )
+
+        self.assertEqual([pet.name for pet in response.context["pets"]], ["Loki"])
+
+    def test_sorts_products_by_price_descending(self):
+        provider = Provider.objects.create(name="Proveedor", email="p@gmail.com")
+        for name, price in [("A", 10), ("B", 30), ("C", 20)]:
+            Product.objects.create(name=name, type="Alimento", price=price, provider=provider)
+
+        response = self.client.get(reverse("products_repo"), {"sort": "-price", "price_min": "15"})
+
+        self.assertEqual([product.name for product in response.context["products"]], ["B", "C"])
+
+    def test_ignores_unknown_and_invalid_params(self):
+        Vet.objects.create(name="Carlos", phone="2284563542", email="c@gmail.com", specialty=Specialty.GENERAL.value)
+
+        response = self.client.get(
+            reverse("vets_repo"), {"specialty": "Astrología", "sort": "email", "phone": "1"},
+        )
+
+        self.assertEqual(len(response.context["vets"]), 1)
+        self.assertEqual(response.context["query"]["filters"], {})
+        self.assertEqual(response.context["query"]["sort"], "")
+
+    def test_ignores_out_of_range_ids(self):
+        Pet.objects.create(name="Loki", breed="Collie", birthday=date(2020,1,1), weight=10, client=self.juan)
+
+        pets = self.client.get(reverse("pets_repo"), {"client": str(2**63)})
+        products = self.client.get(reverse("products_repo"), {"provider": "9" * 30})
+
+        self.assertEqual(pets.status_code, 200)
+        self.assertEqual(len(pets.context["pets"]), 1)
+        self.assertEqual(pets.context["query"]["filters"], {})
+        self.assertEqual(products.status_code, 200)
+        self.assertEqual(products.context["query"]["filters"], {})
+
+    def test_paginates_repository(self):
+        Client.objects.bulk_create(
+            [Client(name=f"Cliente {i}", phone="54221", city="La Plata", email="c@gmail.com") for i in range(60)],
+        )
+
+        response = self.client.get(reverse("clients_repo"), {"city": "La Plata", "page": 2})
+
+        self.assertEqual(response.context["page_obj"].number, 2)
+        self.assertEqual(len(response.context["clients"]), 11)
+        self.assertContains(response, "?city=La+Plata&page=1")
+
+
+class AutocompleteTest(TestCase):
+    """
+    Pruebas para los endpoints JSON de autocompletado.
+
+    Métodos:
+    --------
+    test_returns_prefix_matches_ignoring_case():
+        Verifica que se devuelvan los registros cuyo nombre empieza con el texto buscado.
+    test_matches_accented_capitals():
+        Verifica que la búsqueda ignore mayúsculas y tildes fuera de ASCII, también al renombrar.
+    test_limits_number_of_results():
+        Verifica que se devuelvan como máximo AUTOCOMPLETE_LIMIT resultados.
+    test_empty_query_returns_no_results():
+        Verifica que una búsqueda vacía no devuelva resultados.
+    test_unknown_source_returns_404():
+        Verifica que un origen desconocido responda con 404.
+    """
+    def test_returns_prefix_matches_ignoring_case(self):
+        for name in ["Juan Veron", "juana Perez", "Ana Juarez"]:
+            Client.objects.create(name=name, phone="54221555232", email="c@gmail.com")
+
+        response = self.client.get(reverse("autocomplete", kwargs={"source": "clients"}), {"q": "JUAN"})
+
+        self.assertEqual(
+            [item["name"] for item in response.json()["results"]], ["Juan Veron", "juana Perez"],
+        )
+
+    def test_matches_accented_capitals(self):
+        for name in ["Ángel Díaz", "Ñandú", "Andrea", "Érica"]:
+            Client.objects.create(name=name, phone="54221555232", email="c@gmail.com")
+        url = reverse("autocomplete", kwargs={"source": "clients"})
+
+        self.assertEqual([item["name"] for item in self.client.get(url, {"q": "ÁNG"}).json()["results"]], ["Ángel Díaz"])
+        self.assertEqual([item["name"] for item in self.client.get(url, {"q": "angel"}).json()["results"]], ["Ángel Díaz"])
+        self.assertEqual([item["name"] for item in self.client.get(url, {"q": "ÉRI"}).json()["results"]], ["Érica"])
+        self.assertEqual([item["name"] for item in self.client.get(url, {"q": "ñan"}).json()["results"]], ["Ñandú"])
+
+        andrea = Client.objects.get(name="Andrea")
+        andrea.update_client({"name": "Ángela"})
+        self.assertEqual(
+            [item["name"] for item in self.client.get(url, {"q": "án"}).json()["results"]], ["Ángel Díaz", "Ángela"],
+        )
+
+    def test_limits_number_of_results(self):
+        for i in range(15):
+            Vet.objects.create(name=f"Vet {i:02d}", phone="1", email="v@gmail.com")
+
+        response = self.client.get(reverse("autocomplete", kwargs={"source": "vets"}), {"q": "vet"})
+
+        self.assertEqual(len(response.json()["results"]), 10)
+        self.assertEqual(response.json()["results"][0]["name"], "Vet 00")
+
+    def test_empty_query_returns_no_results(self):
+        Medicine.objects.create(name="ibuprofeno", description="analgesico", dose=4)
+
+        response = self.client.get(reverse("autocomplete", kwargs={"source": "medicines"}), {"q": " "})
+
+        self.assertEqual(response.json(), {"results": []})
+
+    def test_unknown_source_returns_404(self):
+        response = self.client.get(reverse("autocomplete", kwargs={"source": "pets"}), {"q": "a"})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class WriteQueryCountTest(TestCase):
+    """
+    Pruebas de la cantidad de consultas de los formularios de alta y de las vistas de eliminación.
+
+    Métodos:
+    --------
+    setUp():
+        Crea un proveedor y un cliente para las claves foráneas.
+    test_create_forms_query_count():
+        Verifica la cantidad de consultas de cada formulario de alta.
+    test_create_product_with_unknown_provider():
+        Verifica que un proveedor inexistente devuelva un error de validación.
+    test_delete_views_query_count():
+        Verifica la cantidad de consultas de cada vista de eliminación.
+    test_delete_unknown_id_returns_404():
+        Verifica que eliminar un id inexistente o inválido responda con 404.
+    """
+    def setUp(self):
+        self.provider = Provider.objects.create(name="Pedro", email="pedro@gmail.com", address="Calle 1")
+        self.owner = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+
+    def test_create_forms_query_count(self):
+        # Un INSERT por alta; la mascota además registra su primer peso y sus
+        # intervalos de peso dentro de una transacción (SAVEPOINT/RELEASE en los tests).
+        # Clientes, productos y mascotas suman el INSERT de la auditoría, que se
+        # agrega al confirmarse la transacción (en los tests, al ejecutar los
+        # callbacks de `on_commit`).
+        cases = [
+            ("clients_form", {"name": "Ana", "phone": "54221555232", "email": "ana@vetsoft.com", "city": "La Plata"}, 2),
+            ("providers_form", {"name": "Luis", "email": "luis@gmail.com", "address": "Calle 2"}, 1),
+            ("products_form", {"name": "Alimento", "type": "Comida", "price": "10", "provider": self.provider.id}, 2),
+            ("vets_form", {"name": "Maria", "phone": "221555232", "email": "maria@gmail.com", "specialty": "General"}, 1),
+            ("medicine_form", {"name": "ibuprofeno", "description": "analgesico", "dose": "4"}, 1),
+            ("pets_form", {
+                "name": "Firulais", "breed": "Labrador", "birthday": "2020-01-01", "weight": "10",
+                "client": self.owner.id,
+            }, 6),
+        ]
+
+        for url_name, data, queries in cases:
+            with self.subTest(url_name), self.assertNumQueries(queries), self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse(url_name), data=data)
+            self.assertEqual(response.status_code, 302)
+
+    def test_create_product_with_unknown_provider(self):
+        response = self.client.post(
+            reverse("products_form"),
+            data={"name": "Alimento", "type": "Comida", "price": "10", "provider": "abc"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Por favor seleccione un proveedor valido")
+        self.assertFalse(Product.objects.exists())
+
+    def test_delete_views_query_count(self):
+        pet = Pet.objects.create(
+            name="Firulais", breed="Labrador", birthday=date(2020, 1, 1), weight=10, client=self.owner,
+        )
+        product = Product.objects.create(name="Alimento", type="Comida", price=10, provider=self.provider)
+        vet = Vet.objects.create(name="Maria", phone="221555232", email="maria@gmail.com")
+        medicine = Medicine.objects.create(name="ibuprofeno", description="analgesico", dose=4)
+
+        # Vets y medicinas: un SELECT para el colector de cascadas, un DELETE por
+        # tabla intermedia o relación en cascada (un UPDATE si es SET_NULL) y el
+        # DELETE de la fila. El resto tiene borrado lógico: un UPDATE dentro de una
+        # transacción (SAVEPOINT/RELEASE en los tests), un SELECT de los
+        # dependientes (mascotas del cliente, productos del proveedor) o el borrado
+        # de los turnos futuros y recordatorios pendientes de la mascota, y el
+        # INSERT de la auditoría en los modelos auditados.
+        cases = [
+            ("pets_delete", "pet_id", pet, 6),
+            ("products_delete", "product_id", product, 4),
+            ("vets_delete", "vet_id", vet, 5),
+            ("medicine_delete", "medicine_id", medicine, 5),
+            ("clients_delete", "client_id", self.owner, 5),
+            ("providers_delete", "provider_id", self.provider, 4),
+        ]
+
+        for url_name, field, instance, queries in cases:
+            with self.subTest(url_name), self.assertNumQueries(queries), self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse(url_name), data={field: instance.id})
+            self.assertEqual(response.status_code, 302)
+            self.assertFalse(type(instance).objects.filter(pk=instance.pk).exists())
+
+    def test_delete_unknown_id_returns_404(self):
+        for value in ["999", "abc", ""]:
+            with self.subTest(value):
+                response = self.client.post(reverse("clients_delete"), data={"client_id": value})
+            self.assertEqual(response.status_code, 404)
+
+
+class MedicationTimelineTest(TestCase):
+    """
+    Pruebas para la línea de tiempo de medicaciones y su archivado.
+
+    Métodos:
+    --------
+    setUp():
+        Crea una mascota, una medicina y un veterinario.
+    test_can_record_administration():
+        Verifica que se registre una administración y se muestre en la línea de tiempo.
+    test_timeline_paginates_with_cursor():
+        Verifica que la línea de tiempo muestre el enlace a la página siguiente.
+    test_archive_moves_old_rows_to_monthly_partitions():
+        Verifica que el comando archive_administrations mueva las filas antiguas a archivos mensuales.
+    test_archive_failed_batch_is_not_duplicated():
+        Verifica que un lote cuya eliminación falla no quede en la partición ni se duplique al reintentar.
+    test_archive_reads_rows_repeated_after_a_crash_once():
+        Verifica que una fila escrita en dos partes por una ejecución interrumpida se lea una sola vez.
+    """
+    def setUp(self):
+        self.pet = Pet.objects.create(name="Loki", breed="Border Collie", birthday=date(2020, 1, 1), weight=10)
+        self.medicine = Medicine.objects.create(name="ibuprofeno", description="analgesico", dose=4)
+        self.vet = Vet.objects.create(name="Maria", phone="221555232", email="maria@gmail.com")
+
+    def test_can_record_administration(self):
+        url = reverse("pets_timeline", kwargs={"id": self.pet.id})
+        response = self.client.post(
+            url,
+            data={
+                "medicine": self.medicine.id,
+                "vet": self.vet.id,
+                "dose": "2.5",
+                "administered_at": "2024-03-01T10:30",
+            },
+        )
+
+        self.assertRedirects(response, url)
+        administration = MedicationAdministration.objects.get()
+        self.assertEqual(administration.vet, self.vet)
+        self.assertEqual(administration.administered_at, datetime(2024, 3, 1, 10, 30, tzinfo=timezone.utc))
+
+        response = self.client.get(url)
+        self.assertContains(response, "2024-03-01 10:30")
+        self.assertContains(response, "ibuprofeno")
+
+    def test_timeline_paginates_with_cursor(self):
+        MedicationAdministration.objects.bulk_create(
+            [
+                MedicationAdministration(
+                    pet=self.pet, medicine=self.medicine, dose=1,
+                    administered_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                )
+                for _ in range(MedicationAdministration.TIMELINE_PAGE_SIZE + 1)
+            ],
+        )
+        url = reverse("pets_timeline", kwargs={"id": self.pet.id})
+
+        response = self.client.get(url)
+        self.assertEqual(len(response.context["administrations"]), MedicationAdministration.TIMELINE_PAGE_SIZE)
+
+        response = self.client.get(url, {"cursor": response.context["next_cursor"]})
+        self.assertEqual(len(response.context["administrations"]), 1)
+        self.assertIsNone(response.context["next_cursor"])
+
+    def test_archive_moves_old_rows_to_monthly_partitions(self):
+        for day in [datetime(2024, 1, 5), datetime(2024, 1, 20), datetime(2024, 2, 3), datetime(2024, 3, 1)]:
+            MedicationAdministration.objects.create(
+                pet=self.pet, medicine=self.medicine, dose=1, administered_at=day.replace(tzinfo=timezone.utc),
+            )
+
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "archive_administrations", before="2024-03-01", output=directory, batch_size=1, stdout=StringIO(),
+            )
+
+            self.assertEqual(len(read_partition(directory, "2024-01")), 2)
+            self.assertEqual(len(read_partition(directory, "2024-02")), 1)
+            self.assertEqual(read_partition(directory, "2024-03"), [])
+
+        self.assertEqual(MedicationAdministration.objects.count(), 1)
+
+    def test_archive_failed_batch_is_not_duplicated(self):
+        first, second = [
+            MedicationAdministration.objects.create(
+                pet=self.pet, medicine=self.medicine, dose=1, administered_at=day.replace(tzinfo=timezone.utc),
+            )
+            for day in [datetime(2024, 1, 5), datetime(2024, 1, 20)]
+        ]
+
+        def fail_second(sender, instance, **kwargs):
+            if instance.pk == second.pk:
+                raise DatabaseError("fallo simulado")
+
+        pre_delete.connect(fail_second, sender=MedicationAdministration)
+        self.addCleanup(pre_delete.disconnect, fail_second, sender=MedicationAdministration)
+
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(DatabaseError):
+                call_command(
+                    "archive_administrations", before="2024-03-01", output=directory, batch_size=1, stdout=StringIO(),
+                )
+            self.assertEqual([row["id"] for row in read_partition(directory, "2024-01")], [first.pk])
+            self.assertEqual(
+                [path.name for path in Path(directory).iterdir()], ["administrations-2024-01.part00001.jsonl.gz"],
+            )
+
+            pre_delete.disconnect(fail_second, sender=MedicationAdministration)
+            call_command(
+                "archive_administrations", before="2024-03-01", output=directory, batch_size=1, stdout=StringIO(),
+            )
+            self.assertEqual([row["id"] for row in read_partition(directory, "2024-01")], [first.pk, second.pk])
+
+        self.assertFalse(MedicationAdministration.objects.exists())
+
+    def test_archive_reads_rows_repeated_after_a_crash_once(self):
+        administration = MedicationAdministration.objects.create(
+            pet=self.pet, medicine=self.medicine, dose=1, administered_at=datetime(2024, 1, 5, tzinfo=timezone.utc),
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "archive_administrations", before="2024-03-01", output=directory, batch_size=1, stdout=StringIO(),
+            )
+            # Una ejecución interrumpida después de escribir la parte y antes de
+            # confirmar la eliminación deja la misma fila en una segunda parte.
+            first_part = Path(directory) / "administrations-2024-01.part00001.jsonl.gz"
+            shutil.copyfile(first_part, Path(directory) / "administrations-2024-01.part00002.jsonl.gz")
+
+            self.assertEqual([row["id"] for row in read_partition(directory, "2024-01")], [administration.pk])
+
+
+class WeightChartTest(TestCase):
+    """
+    Pruebas para el endpoint de curvas de peso.
+
+    Métodos:
+    --------
+    setUp():
+        Crea dos mascotas de un cliente con pesos registrados.
+    test_returns_series_for_requested_pets():
+        Verifica que se devuelvan las series de las mascotas pedidas.
+    test_returns_series_for_client_pets():
+        Verifica que se devuelvan las series de todas las mascotas de un cliente.
+    test_accepts_ids_in_post_body():
+        Verifica que los ids puedan enviarse en el cuerpo de un POST.
+    test_invalid_params_return_400():
+        Verifica que los parámetros inválidos respondan con 400.
+    """
+    def setUp(self):
+        self.owner = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+        self.pets = [
+            Pet.objects.create(name=name, breed="Labrador", birthday=date(2020, 1, 1), weight=10, client=self.owner)
+            for name in ["Loki", "Thor"]
+        ]
+        for pet in self.pets:
+            WeightRecord.record(pet.id, 10, datetime(2024, 1, 1, tzinfo=timezone.utc), new_pet=True)
+            WeightRecord.record(pet.id, 12, datetime(2024, 1, 20, tzinfo=timezone.utc))
+
+    def test_returns_series_for_requested_pets(self):
+        response = self.client.get(
+            reverse("pets_weight_chart"), {"pets": str(self.pets[0].id), "resolution": "month"},
+        )
+
+        self.assertEqual(
+            response.json(),
+            {"resolution": "month", "series": {str(self.pets[0].id): [["2024-01-01", 11, 10, 12]]}},
+        )
+
+    def test_returns_series_for_client_pets(self):
+        response = self.client.get(
+            reverse("pets_weight_chart"), {"client": self.owner.id, "resolution": "day", "desde": "2024-01-10"},
+        )
+
+        series = response.json()["series"]
+        self.assertEqual(set(series), {str(pet.id) for pet in self.pets})
+        self.assertEqual(series[str(self.pets[1].id)], [["2024-01-20", 12, 12, 12]])
+
+    def test_accepts_ids_in_post_body(self):
+        ids = ",".join(str(pet.id) for pet in self.pets)
+
+        response = self.client.post(reverse("pets_weight_chart"), {"pets": ids})
+
+        self.assertEqual(response.json()["resolution"], "week")
+        self.assertEqual(len(response.json()["series"]), 2)
+
+    def test_invalid_params_return_400(self):
+        for params in [{"pets": "1", "resolution": "year"}, {"pets": "a,b"}, {"pets": "1", "desde": "ayer"}]:
+            with self.subTest(params):
+                response = self.client.get(reverse("pets_weight_chart"), params)
+            self.assertEqual(response.status_code, 400)
+
+
+class AppointmentViewsTest(TestCase):
+    """
+    Pruebas para el alta de turnos y la agenda diaria de los veterinarios.
+
+    Métodos:
+    --------
+    setUp():
+        Crea una mascota y un veterinario.
+    test_can_create_appointment():
+        Verifica que se cree un turno y se redirija a la agenda del día.
+    test_form_suggests_next_free_slot():
+        Verifica que la búsqueda por especialidad proponga veterinario y horario.
+    test_agenda_lists_day_appointments():
+        Verifica que la agenda muestre solo los turnos del día pedido.
+    """
+    def setUp(self):
+        self.owner = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+        self.pet = Pet.objects.create(
+            name="Loki", breed="Border Collie", birthday=date(2020, 1, 1), weight=10, client=self.owner,
+        )
+        self.vet = Vet.objects.create(
+            name="Maria", phone="221555232", email="maria@gmail.com", specialty=Specialty.CARDIOLOGY.value,
+        )
+
+    def test_can_create_appointment(self):
+        response = self.client.post(
+            reverse("pets_appointment", kwargs={"id": self.pet.id}),
+            data={"vet": self.vet.id, "start": "2024-05-06T10:00", "duration": "45"},
+        )
+
+        self.assertRedirects(response, reverse("vets_agenda", kwargs={"id": self.vet.id}) + "?fecha=2024-05-06")
+        appointment = Appointment.objects.get()
+        self.assertEqual(appointment.end, datetime(2024, 5, 6, 10, 45, tzinfo=timezone.utc))
+
+    def test_form_suggests_next_free_slot(self):
+        response = self.client.get(
+            reverse("pets_appointment", kwargs={"id": self.pet.id}),
+            {"specialty": Specialty.CARDIOLOGY.value, "duration": "30"},
+        )
+
+        self.assertEqual(response.context["selected_vet"], self.vet)
+        self.assertIn("start", response.context["data"])
+
+    def test_agenda_lists_day_appointments(self):
+        for day in [6, 7]:
+            Appointment.objects.create(
+                pet=self.pet, vet=self.vet,
+                start=datetime(2024, 5, day, 10, tzinfo=timezone.utc), end=datetime(2024, 5, day, 11, tzinfo=timezone.utc),
+            )
+
+        response = self.client.get(reverse("vets_agenda", kwargs={"id": self.vet.id}), {"fecha": "2024-05-06"})
+
+        self.assertTemplateUsed(response, "vets/agenda.html")
+        self.assertEqual(len(response.context["appointments"]), 1)
+        self.assertContains(response, "Loki")
+        self.assertContains(response, "Juan")
+
+
+class StockViewsTest(TestCase):
+    """
+    Pruebas para la página de stock de un producto y el reporte de faltantes.
+
+    Métodos:
+    --------
+    setUp():
+        Crea un producto sin stock con stock mínimo 3.
+    test_can_register_purchase():
+        Verifica que se registre una compra y se muestre el stock.
+    test_sale_requires_client():
+        Verifica que una venta sin cliente muestre un error.
+    test_low_stock_report():
+        Verifica que el reporte muestre solo los productos por debajo del mínimo.
+    """
+    def setUp(self):
+        self.provider = Provider.objects.create(name="Pedro", email="pedro@gmail.com", address="Calle 1")
+        self.product = Product.objects.create(
+            name="Alimento", type="Comida", price=10, provider=self.provider, reorder_level=3,
+        )
+
+    def test_can_register_purchase(self):
+        url = reverse("products_stock", kwargs={"id": self.product.id})
+
+        response = self.client.post(url, data={"kind": "purchase", "quantity": "4"})
+
+        self.assertRedirects(response, url)
+        response = self.client.get(url)
+        self.assertEqual(response.context["product"].stock, 4)
+        self.assertContains(response, "Compra")
+
+    def test_sale_requires_client(self):
+        response = self.client.post(
+            reverse("products_stock", kwargs={"id": self.product.id}), data={"kind": "sale", "quantity": "1"},
+        )
+
+        self.assertContains(response, "Por favor seleccione un cliente")
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_low_stock_report(self):
+        stocked = Product.objects.create(name="Correa", type="Accesorio", price=5, provider=self.provider)
+        StockMovement.objects.create(product=stocked, kind="purchase", quantity=10)
+
+        response = self.client.get(reverse("products_low_stock"))
+
+        self.assertEqual([product.name for product in response.context["products"]], ["Alimento"])
+
+
+class RenderInvoicesCommandTest(TestCase):
+    """
+    Pruebas para el comando render_invoices.
+
+    Métodos:
+    --------
+    test_renders_month_invoices_into_zip():
+        Verifica que se genere y renderice una factura por cliente dentro del zip.
+    test_invalid_month():
+        Verifica que un mes con formato inválido produzca un error.
+    """
+    def test_renders_month_invoices_into_zip(self):
+        product = Product.objects.create(name="Alimento", type="Comida", price=10)
+        for index in range(5):
+            client = Client.objects.create(name=f"Cliente {index}", phone="54221555232", email="c@gmail.com")
+            StockMovement.objects.create(
+                product=product, kind="sale", quantity=-(index + 1), client=client,
+                created_at=datetime(2024, 3, 10, tzinfo=timezone.utc),
+            )
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = f"{directory}/facturas.zip"
+            call_command(
+                "render_invoices", month="2024-03", output=output, workers=1, chunk_size=2, stdout=StringIO(),
+            )
+
+            with zipfile.ZipFile(output) as archive:
+                names = archive.namelist()
+                first = Invoice.objects.order_by("pk").first()
+                html = archive.read(f"factura-{first.number}.html").decode()
+
+        self.assertEqual(len(names), 5)
+        self.assertIn("Cliente 0", html)
+        self.assertIn("10.00", html)
+
+    def test_invalid_month(self):
+        with self.assertRaises(CommandError):
+            call_command("render_invoices", month="marzo", stdout=StringIO())
+
+
+class JobStatusTest(TestCase):
+    """
+    Pruebas para la API de estado de trabajos y el comando run_worker.
+
+    Métodos:
+    --------
+    test_worker_runs_queued_jobs():
+        Verifica que run_worker --once ejecute los trabajos y la API informe su resultado.
+    test_unknown_job_returns_404():
+        Verifica que un trabajo inexistente responda con 404.
+    """
+    def test_worker_runs_queued_jobs(self):
+        job = Job.objects.create(name="stock.snapshot")
+
+        response = self.client.get(reverse("job_status", kwargs={"id": job.id}))
+        self.assertEqual(response.json()["status"], "queued")
+
+        call_command("run_worker", once=True, stdout=StringIO())
+
+        response = self.client.get(reverse("job_status", kwargs={"id": job.id}))
+        self.assertEqual(response.json()["status"], "done")
+        self.assertEqual(response.json()["result"], {"updated": 0})
+        self.assertEqual(response.json()["attempts"], 1)
+
+    def test_unknown_job_returns_404(self):
+        response = self.client.get(reverse("job_status", kwargs={"id": 999}))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ScheduleRemindersCommandTest(TestCase):
+    """
+    Pruebas para el comando schedule_reminders.
+
+    Métodos:
+    --------
+    test_send_inline():
+        Verifica que --send programe y envíe los recordatorios una sola vez.
+    test_enqueue_sends_for_worker():
+        Verifica que sin --send se encolen lotes que envía run_worker.
+    """
+    def setUp(self):
+        client = Client.objects.create(name="Ana", phone=54221555232, email="ana@gmail.com")
+        for index in range(3):
+            Pet.objects.create(name=f"Toby {index}", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=client)
+
+    def test_send_inline(self):
+        for _ in range(2):
+            call_command("schedule_reminders", date=date(2025, 3, 1), send=True, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(Reminder.objects.filter(status=Reminder.SENT).count(), 3)
+
+    def test_enqueue_sends_for_worker(self):
+        call_command("schedule_reminders", date=date(2025, 3, 1), batch_size=2, stdout=StringIO())
+
+        self.assertEqual(Job.objects.filter(name="reminders.send").count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command("run_worker", once=True, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+
+
+class AuditHistoryTest(TransactionTestCase):
+    """
+    Pruebas para la auditoría de las vistas y la vista de historial.
+
+    Usa TransactionTestCase para que las transacciones de las vistas se
+    confirmen (o se reviertan) como en producción.
+
+    Métodos:
+    --------
+    test_edit_is_recorded_and_listed():
+        Verifica que una edición desde el formulario aparezca en el historial.
+    test_history_survives_delete():
+        Verifica que el historial siga disponible después de eliminar el registro.
+    test_unknown_model_returns_404():
+        Verifica que un modelo no auditado responda con 404.
+    test_failed_create_is_not_recorded():
+        Verifica que un alta revertida (cliente inexistente) no deje una entrada de auditoría.
+    """
+    def setUp(self):
+        self.owner = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+
+    def test_edit_is_recorded_and_listed(self):
+        self.client.post(
+            reverse("clients_form"),
+            data={"id": self.owner.id, "name": "Juan", "phone": "54221555232", "email": "juan@gmail.com", "city": "Berisso"},
+        )
+
+        entry = AuditEntry.objects.get(action="update")
+        self.assertEqual(entry.changes, {"city": ["", "Berisso"]})
+
+        response = self.client.get(reverse("audit_history", kwargs={"model": "client", "id": self.owner.id}))
+        self.assertTemplateUsed(response, "audit/history.html")
+        self.assertContains(response, "Berisso")
+        self.assertContains(response, "Modificación")
+
+    def test_history_survives_delete(self):
+        self.client.post(reverse("clients_delete"), data={"client_id": self.owner.id})
+
+        response = self.client.get(reverse("audit_history", kwargs={"model": "client", "id": self.owner.id}))
+        self.assertContains(response, "Baja")
+        self.assertContains(response, "juan@gmail.com")
+
+    def test_unknown_model_returns_404(self):
+        response = self.client.get(reverse("audit_history", kwargs={"model": "vet", "id": 1}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_failed_create_is_not_recorded(self):
+        self.client.post(
+            reverse("pets_form"),
+            data={"name": "Loki", "breed": "Collie", "birthday": "2020-01-01", "weight": "10", "client": 999},
+        )
+
+        self.assertFalse(Pet.all_objects.exists())
+        self.assertFalse(AuditEntry.objects.filter(model="pet").exists())
+
+
+@override_settings(ALLOWED_HOSTS=["norte.example", "sur.example"])
+class ClinicMiddlewareTest(TestCase):
+    """
+    Pruebas para la clínica activa según el dominio de la solicitud.
+
+    Métodos:
+    --------
+    setUp():
+        Crea dos clínicas con un cliente cada una.
+    test_repository_lists_only_own_clinic():
+        Verifica que el listado muestre solo los clientes de la clínica del dominio.
+    test_other_clinic_records_return_404():
+        Verifica que editar o ver el historial de un registro de otra clínica responda con 404.
+    test_new_records_belong_to_request_clinic():
+        Verifica que las altas desde el formulario queden en la clínica del dominio.
+    test_weight_chart_excludes_other_clinic_and_deleted_pets():
+        Verifica que las curvas de peso omitan las mascotas de otra clínica y las eliminadas.
+    test_other_clinic_jobs_return_404():
+        Verifica que la API de estado no muestre los trabajos encolados por otra clínica.
+    """
+    def setUp(self):
+        self.addCleanup(tenancy.clear_cache)
+        self.north = Clinic.objects.create(name="Norte", domain="norte.example")
+        self.south = Clinic.objects.create(name="Sur", domain="sur.example")
+        self.juan = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com", clinic=self.north)
+        self.ana = Client.objects.create(name="Ana", phone="54221555233", email="ana@gmail.com", clinic=self.south)
+
+    def test_repository_lists_only_own_clinic(self):
+        response = self.client.get(reverse("clients_repo"), HTTP_HOST="norte.example")
+
+        self.assertEqual(list(response.context["page_obj"]), [self.juan])
+
+    def test_other_clinic_records_return_404(self):
+        edit = self.client.get(reverse("clients_edit", kwargs={"id": self.ana.id}), HTTP_HOST="norte.example")
+        history = self.client.get(
+            reverse("audit_history", kwargs={"model": "client", "id": self.ana.id}), HTTP_HOST="norte.example",
+        )
+
+        self.assertEqual(edit.status_code, 404)
+        self.assertEqual(history.status_code, 404)
+
+    def test_other_clinic_jobs_return_404(self):
+        with tenancy.activate(self.south.id):
+            job = Job.objects.create(name="stock.snapshot")
+        url = reverse("job_status", kwargs={"id": job.id})
+
+        self.assertEqual(self.client.get(url, HTTP_HOST="norte.example").status_code, 404)
+        self.assertEqual(self.client.get(url, HTTP_HOST="sur.example").json()["id"], job.id)
+
+    def test_new_records_belong_to_request_clinic(self):
+        self.client.post(
+            reverse("clients_form"),
+            data={"name": "Luis", "phone": "54221555234", "email": "luis@gmail.com", "city": "La Plata"},
+            HTTP_HOST="sur.example",
+        )
+
+        self.assertEqual(Client.objects.get(name="Luis").clinic_id, self.south.id)
+
+    def test_weight_chart_excludes_other_clinic_and_deleted_pets(self):
+        pets = [
+            Pet.objects.create(name=name, breed="Labrador", birthday=date(2020, 1, 1), weight=10, clinic=clinic)
+            for name, clinic in [("Loki", self.north), ("Thor", self.north), ("Odin", self.south)]
+        ]
+        for pet in pets:
+            WeightRecord.record(pet.id, 10, datetime(2024, 1, 1, tzinfo=timezone.utc), new_pet=True)
+        Pet.soft_delete(pets[1].id)
+
+        response = self.client.get(
+            reverse("pets_weight_chart"), {"pets": ",".join(str(pet.id) for pet in pets)}, HTTP_HOST="norte.example",
+        )
+
+        self.assertEqual(list(response.json()["series"]), [str(pets[0].id)])
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTest(TransactionTestCase):
+    """
+    Pruebas para las lecturas en la réplica con dos bases SQLite.
+
+    Usa `TransactionTestCase` porque la copia de SQLite no puede escribir en
+    una base con una transacción abierta.
+
+    Métodos:
+    --------
+    test_repository_reads_from_replica():
+        Verifica que el listado lea de la réplica y vea los cambios al sincronizarla.
+    test_write_makes_session_read_primary():
+        Verifica que después de escribir la sesión lea de la base principal.
+    test_forms_read_from_primary():
+        Verifica que los formularios de edición lean de la base principal.
+    """
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.juan = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+
+    def test_repository_reads_from_replica(self):
+        response = self.client.get(reverse("clients_repo"))
+        self.assertEqual(list(response.context["page_obj"]), [])
+
+        copy_database("default", "replica")
+
+        response = self.client.get(reverse("clients_repo"))
+        self.assertEqual(list(response.context["page_obj"]), [self.juan])
+
+    def test_write_makes_session_read_primary(self):
+        response = self.client.post(
+            reverse("clients_form"),
+            data={"name": "Ana", "phone": "54221555233", "email": "ana@gmail.com", "city": "La Plata"},
+            follow=True,
+        )
+
+        self.assertIn(STICKY_COOKIE, self.client.cookies)
+        self.assertEqual(
+            [client.name for client in response.context["page_obj"]], ["Juan", "Ana"],
+        )
+
+    def test_forms_read_from_primary(self):
+        response = self.client.get(reverse("clients_edit", kwargs={"id": self.juan.id}))
+
+        self.assertEqual(response.status_code, 200)
+
+
+class ProfilingTest(TestCase):
+    """
+    Pruebas para los perfiles de solicitudes y el comando `profiles`.
+
+    Métodos:
+    --------
+    setUp():
+        Usa un directorio temporal para los perfiles.
+    test_header_token_profiles_request():
+        Verifica que solo las solicitudes con el token correcto se perfilen.
+    test_sampled_requests_are_profiled():
+        Verifica que el muestreo perfile solicitudes sin cabecera.
+    test_profiles_command_ranks_functions():
+        Verifica que el comando agrupe los perfiles por función.
+    test_sampling_profiler():
+        Verifica que los perfiles de pyinstrument se guarden y se agrupen.
+    """
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = self.settings(PROFILING_DIR=self.directory, PROFILING_TOKEN="secreto", PROFILING_SAMPLE_RATE=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def profiles(self):
+        return sorted(path.parent.name for path in self.directory.glob("*/*"))
+
+    def test_header_token_profiles_request(self):
+        self.client.get(reverse("clients_repo"))
+        self.client.get(reverse("clients_repo"), HTTP_X_PROFILE="otro")
+        self.assertEqual(self.profiles(), [])
+
+        self.client.get(reverse("clients_repo"), HTTP_X_PROFILE="secreto")
+        self.assertEqual(self.profiles(), ["clients_repo"])
+
+    def test_sampled_requests_are_profiled(self):
+        with self.settings(PROFILING_SAMPLE_RATE=1):
+            self.client.get(reverse("home"))
+            self.client.get("/no-existe/")
+
+        self.assertEqual(self.profiles(), ["home", "unresolved"])
+
+    def test_profiles_command_ranks_functions(self):
+        self.client.get(reverse("clients_repo"), HTTP_X_PROFILE="secreto")
+        self.client.get(reverse("pets_repo"), HTTP_X_PROFILE="secreto")
+
+        out = StringIO()
+        call_command("profiles", view="pets_repo", sort="total", limit=500, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("1 perfiles", output)
+        self.assertIn("pets_repository", output)
+        self.assertNotIn("clients_repository", output)
+
+    @unittest.skipIf(profiling.SamplingProfiler is None, "pyinstrument no está instalado")
+    def test_sampling_profiler(self):
+        with self.settings(PROFILER="pyinstrument"):
+            self.client.get(reverse("pets_repo"), HTTP_X_PROFILE="secreto")
+
+        [path] = self.directory.glob("pets_repo/*")
+        self.assertEqual(path.suffix, ".pyisession")
+        self.assertTrue(profiling.aggregate([path]))
+
+
+class SlowQueriesCommandTest(TestCase):
+    """
+    Pruebas para el comando `slow_queries`.
+
+    Métodos:
+    --------
+    test_ranks_queries_of_view():
+        Verifica que el comando liste las consultas de una vista con su plan.
+    test_missing_log_raises_error():
+        Verifica que sin registro el comando termine con un error.
+    """
+    def test_ranks_queries_of_view(self):
+        owner = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+        Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=owner)
+
+        with tempfile.TemporaryDirectory() as directory:
+            log = f"{directory}/slow_queries.jsonl"
+            with self.settings(SLOW_QUERY_MS=0, SLOW_QUERY_LOG=log):
+                self.client.get(reverse("pets_repo"))
+            out = StringIO()
+            call_command("slow_queries", file=log, view="pets_repo", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('FROM "app_pet"', output)
+        self.assertIn("vistas: pets_repo", output)
+        self.assertIn("desde: app/views.py", output)
+        self.assertIn("plan: ", output)
+
+    def test_missing_log_raises_error(self):
+        with self.assertRaises(CommandError):
+            call_command("slow_queries", file="/no/existe.jsonl", stdout=StringIO())
+
+
+class ImportProfileCommandTest(TestCase):
+    """
+    Pruebas para el comando `import_profile`.
+
+    Métodos:
+    --------
+    test_reports_and_compares_with_baseline():
+        Verifica que el informe se guarde como referencia y se compare sin error.
+    test_regression_raises_error():
+        Verifica que un total mayor que la tolerancia termine con un error.
+    """
+    def test_reports_and_compares_with_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = f"{directory}/imports.json"
+            out = StringIO()
+            call_command("import_profile", module="json", save=baseline, stdout=out)
+            call_command("import_profile", module="json", baseline=baseline, tolerance=1000, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("json.decoder", output)
+        self.assertIn("Total:", output)
+
+    def test_regression_raises_error(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = f"{directory}/imports.json"
+            with open(baseline, "w") as stream:
+                stream.write('{"(total)": 1}')
+
+            with self.assertRaisesMessage(CommandError, "supera la tolerancia"):
+                call_command("import_profile", module="json", baseline=baseline, stdout=StringIO())
+
+
+class PurgeArchivedCommandTest(TestCase):
+    """
+    Pruebas para el comando purge_archived.
+
+    Métodos:
+    --------
+    test_moves_old_deleted_rows_and_cascades_to_archive():
+        Verifica que los registros eliminados hace tiempo y sus dependientes se archiven.
+    test_keeps_recent_and_live_rows():
+        Verifica que no se purguen registros vivos ni eliminados recientemente.
+    test_keeps_invoices_and_stock_ledger():
+        Verifica que los clientes con facturas y los productos con movimientos se conserven y se informen.
+    """
+    def setUp(self):
+        self.owner = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+        self.pet = Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=self.owner)
+        WeightRecord.record(self.pet.pk, 10)
+
+    def test_moves_old_deleted_rows_and_cascades_to_archive(self):
+        Client.soft_delete(self.owner.pk)
+        Client.all_objects.update(deleted_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+        Pet.all_objects.update(deleted_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+        call_command("purge_archived", older_than=365, batch_size=1, stdout=StringIO())
+
+        self.assertFalse(Client.all_objects.exists())
+        self.assertFalse(Pet.all_objects.exists())
+        self.assertFalse(WeightRecord.objects.exists())
+        archived = set(ArchivedRow.objects.values_list("model", flat=True))
+        self.assertTrue({"app.client", "app.pet", "app.weightrecord", "app.weightseries"} <= archived)
+        self.assertEqual(ArchivedRow.objects.get(model="app.pet").data["name"], "Toby")
+
+    def test_keeps_recent_and_live_rows(self):
+        other = Client.objects.create(name="Ana", phone="54221555233", email="ana@gmail.com")
+        Client.soft_delete(self.owner.pk)
+
+        call_command("purge_archived", older_than=365, stdout=StringIO())
+
+        self.assertEqual(Client.all_objects.count(), 2)
+        self.assertTrue(Client.objects.filter(pk=other.pk).exists())
+        self.assertFalse(ArchivedRow.objects.exists())
+
+    def test_keeps_invoices_and_stock_ledger(self):
+        other = Client.objects.create(name="Ana", phone="54221555233", email="ana@gmail.com")
+        invoice = Invoice.objects.create(client=self.owner, month=date(2019, 12, 1), total=10)
+        product = Product.objects.create(name="Collar", type="Accesorio", price=5)
+        movement = StockMovement.objects.create(product=product, kind=StockMovement.PURCHASE, quantity=3)
+        Client.soft_delete(self.owner.pk)
+        Client.soft_delete(other.pk)
+        Product.soft_delete(product.pk)
+        old = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        for model in (Client, Pet, Product):
+            model.all_objects.update(deleted_at=old)
+        output = StringIO()
+
+        call_command("purge_archived", older_than=365, batch_size=1, stdout=output)
+
+        self.assertTrue(Invoice.objects.filter(pk=invoice.pk, client=self.owner).exists())
+        self.assertTrue(StockMovement.objects.filter(pk=movement.pk, product=product).exists())
+        self.assertEqual(list(Client.all_objects.values_list("pk", flat=True)), [self.owner.pk])
+        self.assertFalse(Pet.all_objects.exists())
+        self.assertIn(f"protegidos: {self.owner.pk}", output.getvalue())
+        self.assertIn(f"protegidos: {product.pk}", output.getvalue())
@@ -1,8 +1,38 @@
-from datetime import date
+import gc
+from datetime import date, datetime, timedelta, timezone
 
-from django.test import TestCase
+from django.core import mail
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
 
-from app.models import Client, Medicine, Pet, Provider, Specialty, Vet
+from app import audit, slow_queries, sms, tenancy, warmup, worker_metrics
+from app.context_processors import navbar, resolve_active_link
+from app.jobs import TASKS, enqueue, run_batch, run_job, task
+from app.models import (
+    CONFLICT_ERROR,
+    Appointment,
+    AuditEntry,
+    Client,
+    Clinic,
+    Invoice,
+    Job,
+    MedicationAdministration,
+    Medicine,
+    Pet,
+    Product,
+    Provider,
+    Reminder,
+    Specialty,
+    StockMovement,
+    StockSnapshot,
+    Vet,
+    WeightRecord,
+    WeightSeries,
+)
+from app.reminders import send_batch
 
 
 class ClientModelTest(TestCase):
@@ -310,4 +340,1149 @@ class MedicineModelTest(TestCase):
 
         medicine_updated = Medicine.objects.get(pk=1)
 
-        self.assertEqual(medicine_updated.description, "analgesico")
\ No newline at end of file
+        self.assertEqual(medicine_updated.description, "analgesico")
+
+    def test_refill_days_must_be_positive(self):
+        saved, errors = Medicine.save_medicine(
+            {
+                "name": "ibuprofeno",
+                "description": "analgesico",
+                "dose": "4",
+                "refill_days": "0",
+            },
+        )
+
+        self.assertFalse(saved)
+        self.assertIn("refill_days", errors)
+
+
+class NavbarContextProcessorTest(TestCase):
+    """
+    Pruebas para el context processor del navbar.
+
+    Métodos:
+    --------
+    test_navbar_includes_all_sections():
+        Verifica que el navbar contenga enlaces a todas las secciones.
+    test_active_link_uses_longest_prefix():
+        Verifica que el enlace activo se resuelva por el prefijo de la ruta.
+    test_home_is_active_only_on_root():
+        Verifica que Home solo se active en la ruta raíz.
+    test_navbar_is_memoized_per_request():
+        Verifica que el contexto se calcule una sola vez por solicitud.
+    """
+    def test_navbar_includes_all_sections(self):
+        request = RequestFactory().get("/")
+        labels = [link["label"] for link in navbar(request)["links"]]
+
+        self.assertEqual(
+            labels,
+            ["Home", "Clientes", "Proveedores", "Productos", "Vets", "Mascotas", "Medicinas"],
+        )
+
+    def test_active_link_uses_longest_prefix(self):
+        request = RequestFactory().get("/mascotas/editar/1/")
+        active = [link["label"] for link in navbar(request)["links"] if link["active"]]
+
+        self.assertEqual(active, ["Mascotas"])
+
+    def test_home_is_active_only_on_root(self):
+        self.assertEqual(resolve_active_link("/"), 0)
+        self.assertIsNone(resolve_active_link("/inexistente/"))
+
+    def test_navbar_is_memoized_per_request(self):
+        request = RequestFactory().get("/clientes/")
+
+        self.assertIs(navbar(request), navbar(request))
+
+
+class OptimisticConcurrencyTest(TestCase):
+    """
+    Pruebas para la actualización condicional por versión.
+
+    Métodos:
+    --------
+    test_update_increments_version():
+        Verifica que cada actualización incremente la versión.
+    test_stale_update_is_rejected():
+        Verifica que una edición con una versión vieja no pise los cambios de otro usuario.
+    test_update_writes_only_changed_fields():
+        Verifica que el UPDATE incluya solo los campos modificados.
+    test_update_without_changes_skips_write():
+        Verifica que no se escriba en la base si no hay cambios.
+    """
+    def setUp(self):
+        self.client_record = Client.objects.create(
+            name="Juan Sebastian Veron", phone="54221555232", city="La Plata", email="brujita75@hotmail.com",
+        )
+
+    def test_update_increments_version(self):
+        saved, errors = self.client_record.update_client({"city": "Berisso"})
+
+        self.assertTrue(saved)
+        self.assertIsNone(errors)
+        self.assertEqual(Client.objects.get(pk=self.client_record.pk).version, 2)
+
+    def test_stale_update_is_rejected(self):
+        first = Client.objects.get(pk=self.client_record.pk)
+        second = Client.objects.get(pk=self.client_record.pk)
+
+        first.update_client({"city": "Berisso"})
+        saved, errors = second.update_client({"city": "Ensenada"})
+
+        self.assertFalse(saved)
+        self.assertEqual(errors, {"version": CONFLICT_ERROR})
+        self.assertEqual(Client.objects.get(pk=self.client_record.pk).city, "Berisso")
+
+    def test_update_writes_only_changed_fields(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            self.client_record.update_client({"city": "Berisso", "name": "Juan Sebastian Veron"})
+
+        # El UPDATE y, fuera de una solicitud, el INSERT de la auditoría (al
+        # confirmarse la transacción, que en los tests es la del TestCase).
+        self.assertEqual(len(queries), 2)
+        sql = queries[0]["sql"]
+        self.assertIn('"city"', sql)
+        self.assertNotIn('"name"', sql)
+        self.assertIn('"version" =', sql)
+        self.assertIn('INSERT INTO "app_auditentry"', queries[1]["sql"])
+
+    def test_update_without_changes_skips_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            saved, _ = self.client_record.update_client({"phone": "54221555232"})
+
+        self.assertTrue(saved)
+        self.assertEqual(len(queries), 0)
+
+
+class MedicationAdministrationTest(TestCase):
+    """
+    Pruebas para el registro de administraciones de medicinas.
+
+    Métodos:
+    --------
+    setUp():
+        Crea una mascota, una medicina y 5 administraciones en días consecutivos.
+    test_between_uses_half_open_range():
+        Verifica que el rango incluya el inicio y excluya el fin.
+    test_timeline_pages_by_key():
+        Verifica que la línea de tiempo se recorra completa con cursores sin repetir filas.
+    test_timeline_ignores_invalid_cursor():
+        Verifica que un cursor inválido devuelva la primera página.
+    test_save_administration_with_errors():
+        Verifica que no se registre una administración con datos inválidos.
+    test_administrations_cannot_be_updated():
+        Verifica que una administración guardada no pueda modificarse.
+    """
+    def setUp(self):
+        self.pet = Pet.objects.create(name="Loki", breed="Border Collie", birthday=date(2020, 1, 1), weight=10)
+        self.medicine = Medicine.objects.create(name="ibuprofeno", description="analgesico", dose=4)
+        self.start = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+        MedicationAdministration.objects.bulk_create(
+            [
+                MedicationAdministration(
+                    pet=self.pet, medicine=self.medicine, dose=i + 1, administered_at=self.start + timedelta(days=i),
+                )
+                for i in range(5)
+            ],
+        )
+
+    def test_between_uses_half_open_range(self):
+        administrations = MedicationAdministration.objects.for_pet(self.pet.id).between(
+            self.start + timedelta(days=1), self.start + timedelta(days=3),
+        )
+
+        self.assertEqual(sorted(administrations.values_list("dose", flat=True)), [2, 3])
+
+    def test_timeline_pages_by_key(self):
+        doses = []
+        cursor = None
+        while True:
+            page, cursor = MedicationAdministration.objects.timeline(self.pet.id, cursor, limit=2)
+            doses.extend(administration.dose for administration in page)
+            if cursor is None:
+                break
+
+        self.assertEqual(doses, [5, 4, 3, 2, 1])
+
+    def test_timeline_ignores_invalid_cursor(self):
+        page, cursor = MedicationAdministration.objects.timeline(self.pet.id, "abc", limit=2)
+
+        self.assertEqual([administration.dose for administration in page], [5, 4])
+        self.assertIsNotNone(cursor)
+
+    def test_save_administration_with_errors(self):
+        saved, errors = MedicationAdministration.save_administration(
+            self.pet, {"medicine": "", "dose": "-1", "administered_at": "ayer"},
+        )
+
+        self.assertFalse(saved)
+        self.assertEqual(set(errors), {"medicine", "dose", "administered_at"})
+        self.assertEqual(MedicationAdministration.objects.count(), 5)
+
+    def test_administrations_cannot_be_updated(self):
+        administration = MedicationAdministration.objects.first()
+        administration.dose = 100
+
+        with self.assertRaises(ValueError):
+            administration.save()
+
+
+class WeightHistoryTest(TestCase):
+    """
+    Pruebas para el historial de pesos y sus series reducidas.
+
+    Métodos:
+    --------
+    setUp():
+        Crea una mascota con su primer peso registrado.
+    test_record_accumulates_buckets():
+        Verifica que los pesos se acumulen en los intervalos diario, semanal y mensual.
+    test_update_pet_records_weight_changes_only():
+        Verifica que update_pet registre el peso solo cuando cambia.
+    test_chart_data_groups_series_by_pet():
+        Verifica que chart_data devuelva las series de varias mascotas en orden.
+    """
+    def setUp(self):
+        self.pet = Pet.objects.create(name="Loki", breed="Border Collie", birthday=date(2020, 1, 1), weight=10)
+        WeightRecord.record(self.pet.id, 10, datetime(2024, 1, 1, 9, tzinfo=timezone.utc), new_pet=True)
+
+    def test_record_accumulates_buckets(self):
+        WeightRecord.record(self.pet.id, 12, datetime(2024, 1, 1, 18, tzinfo=timezone.utc))
+        WeightRecord.record(self.pet.id, 14, datetime(2024, 1, 3, 9, tzinfo=timezone.utc))
+
+        day = WeightSeries.objects.get(pet=self.pet, resolution=WeightSeries.DAY, bucket=date(2024, 1, 1))
+        week = WeightSeries.objects.get(pet=self.pet, resolution=WeightSeries.WEEK)
+        month = WeightSeries.objects.get(pet=self.pet, resolution=WeightSeries.MONTH)
+
+        self.assertEqual((day.count, day.average, day.minimum, day.maximum), (2, 11, 10, 12))
+        self.assertEqual((week.bucket, week.count, week.average), (date(2024, 1, 1), 3, 12))
+        self.assertEqual((month.bucket, month.minimum, month.maximum), (date(2024, 1, 1), 10, 14))
+        self.assertEqual(WeightSeries.objects.filter(resolution=WeightSeries.DAY).count(), 2)
+
+    def test_update_pet_records_weight_changes_only(self):
+        self.pet.update_pet({"name": "Thor"})
+        self.assertEqual(WeightRecord.objects.count(), 1)
+
+        self.pet.update_pet({"weight": "11.5"})
+        self.assertEqual(
+            list(WeightRecord.objects.order_by("recorded_at").values_list("weight", flat=True)), [10, 11.5],
+        )
+
+    def test_chart_data_groups_series_by_pet(self):
+        other = Pet.objects.create(name="Thor", breed="Labrador", birthday=date(2020, 1, 1), weight=20)
+        WeightRecord.record(other.id, 20, datetime(2024, 2, 1, tzinfo=timezone.utc), new_pet=True)
+        WeightRecord.record(self.pet.id, 12, datetime(2024, 2, 10, tzinfo=timezone.utc))
+
+        with self.assertNumQueries(1):
+            series = WeightSeries.chart_data([self.pet.id, other.id, 999], WeightSeries.MONTH)
+
+        self.assertEqual(series[self.pet.id], [["2024-01-01", 10, 10, 10], ["2024-02-01", 12, 12, 12]])
+        self.assertEqual(series[other.id], [["2024-02-01", 20, 20, 20]])
+        self.assertEqual(series[999], [])
+
+
+class AppointmentTest(TestCase):
+    """
+    Pruebas para los turnos y la búsqueda de horarios libres.
+
+    Métodos:
+    --------
+    setUp():
+        Crea una mascota y dos veterinarios cirujanos, uno con un turno de 9 a 12.
+    test_overlapping_finds_intersecting_intervals():
+        Verifica que solo se encuentren los turnos que se superponen con el intervalo.
+    test_save_appointment_rejects_overlap():
+        Verifica que no se pueda dar un turno superpuesto al mismo veterinario.
+    test_next_free_slot_across_vets():
+        Verifica que se proponga el primer horario libre entre todos los veterinarios de la especialidad.
+    test_next_free_slot_skips_to_next_day():
+        Verifica que la búsqueda continúe al día siguiente cuando el día está completo.
+    test_next_free_slot_without_vets():
+        Verifica que no se proponga horario si no hay veterinarios de la especialidad.
+    """
+    def setUp(self):
+        self.pet = Pet.objects.create(name="Loki", breed="Border Collie", birthday=date(2020, 1, 1), weight=10)
+        self.busy_vet = Vet.objects.create(
+            name="Maria", phone="221555232", email="maria@gmail.com", specialty=Specialty.SURGERY.value,
+        )
+        self.free_vet = Vet.objects.create(
+            name="Pedro", phone="221555233", email="pedro@gmail.com", specialty=Specialty.SURGERY.value,
+        )
+        self.day = date(2024, 5, 6)
+        self.opening, _ = Appointment.opening_hours(self.day)
+        Appointment.objects.create(
+            pet=self.pet, vet=self.busy_vet, start=self.opening, end=self.opening + timedelta(hours=3),
+        )
+
+    def test_overlapping_finds_intersecting_intervals(self):
+        overlapping = Appointment.objects.filter(vet=self.busy_vet)
+
+        self.assertTrue(overlapping.overlapping(
+            self.opening + timedelta(hours=2), self.opening + timedelta(hours=4),
+        ).exists())
+        self.assertFalse(overlapping.overlapping(
+            self.opening + timedelta(hours=3), self.opening + timedelta(hours=4),
+        ).exists())
+
+    def test_save_appointment_rejects_overlap(self):
+        saved, errors = Appointment.save_appointment(
+            self.pet, {"vet": str(self.busy_vet.id), "start": "2024-05-06T11:30", "duration": "30"},
+        )
+        self.assertFalse(saved)
+        self.assertIn("start", errors)
+
+        saved, errors = Appointment.save_appointment(
+            self.pet, {"vet": str(self.busy_vet.id), "start": "2024-05-06T12:00", "duration": "30"},
+        )
+        self.assertTrue(saved)
+        self.assertEqual(Appointment.objects.filter(vet=self.busy_vet).count(), 2)
+
+    def test_next_free_slot_across_vets(self):
+        Appointment.objects.create(
+            pet=self.pet, vet=self.free_vet, start=self.opening, end=self.opening + timedelta(hours=1, minutes=10),
+        )
+
+        vet, start = Appointment.next_free_slot(
+            Specialty.SURGERY.value, self.opening - timedelta(hours=2), timedelta(minutes=30),
+        )
+
+        self.assertEqual(vet, self.free_vet)
+        self.assertEqual(start, self.opening + timedelta(hours=1, minutes=15))
+
+    def test_next_free_slot_skips_to_next_day(self):
+        closing = self.opening + timedelta(hours=9)
+        Appointment.objects.create(
+            pet=self.pet, vet=self.free_vet, start=self.opening, end=self.opening + timedelta(hours=4),
+        )
+        Appointment.objects.create(
+            pet=self.pet, vet=self.free_vet, start=self.opening + timedelta(hours=4), end=closing,
+        )
+        Appointment.objects.create(
+            pet=self.pet, vet=self.busy_vet, start=self.opening + timedelta(hours=3), end=closing,
+        )
+
+        vet, start = Appointment.next_free_slot(Specialty.SURGERY.value, self.opening, timedelta(minutes=30))
+
+        self.assertEqual(vet, self.busy_vet)
+        self.assertEqual(start, self.opening + timedelta(days=1))
+
+    def test_next_free_slot_without_vets(self):
+        self.assertIsNone(
+            Appointment.next_free_slot(Specialty.NEUROLOGY.value, self.opening, timedelta(minutes=30)),
+        )
+
+
+class StockLedgerTest(TestCase):
+    """
+    Pruebas para el libro de movimientos de stock y sus fotos.
+
+    Métodos:
+    --------
+    setUp():
+        Crea un producto con stock mínimo 5 y un cliente.
+    test_stock_is_snapshot_plus_delta():
+        Verifica que el stock sume la foto y los movimientos posteriores.
+    test_take_only_adds_new_movements():
+        Verifica que una nueva foto sume solo los movimientos posteriores a la anterior.
+    test_sale_rejects_insufficient_stock():
+        Verifica que no se pueda vender más que el stock disponible.
+    test_sale_links_client_and_product():
+        Verifica que una venta asocie el producto al cliente.
+    test_low_stock_uses_single_query():
+        Verifica que el reporte de faltantes se resuelva con una única consulta.
+    """
+    def setUp(self):
+        self.provider = Provider.objects.create(name="Pedro", email="pedro@gmail.com", address="Calle 1")
+        self.product = Product.objects.create(
+            name="Alimento", type="Comida", price=10, provider=self.provider, reorder_level=5,
+        )
+        self.owner = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+
+    def stock(self):
+        return Product.objects.with_stock().get(pk=self.product.pk).stock
+
+    def test_stock_is_snapshot_plus_delta(self):
+        StockMovement.save_movement(self.product, {"kind": "purchase", "quantity": "10"})
+        StockSnapshot.take()
+        StockMovement.save_movement(self.product, {"kind": "adjustment", "quantity": "-2"})
+
+        self.assertEqual(StockSnapshot.objects.get(product=self.product).quantity, 10)
+        self.assertEqual(self.stock(), 8)
+
+    def test_take_only_adds_new_movements(self):
+        StockMovement.save_movement(self.product, {"kind": "purchase", "quantity": "10"})
+        self.assertEqual(StockSnapshot.take(), 1)
+        self.assertEqual(StockSnapshot.take(), 0)
+
+        StockMovement.save_movement(self.product, {"kind": "sale", "quantity": "3", "client": str(self.owner.id)})
+        StockSnapshot.take()
+
+        snapshot = StockSnapshot.objects.get(product=self.product)
+        self.assertEqual(snapshot.quantity, 7)
+        self.assertEqual(snapshot.last_movement_id, StockMovement.objects.latest("pk").pk)
+        self.assertEqual(self.stock(), 7)
+
+    def test_sale_rejects_insufficient_stock(self):
+        StockMovement.save_movement(self.product, {"kind": "purchase", "quantity": "2"})
+
+        saved, errors = StockMovement.save_movement(
+            self.product, {"kind": "sale", "quantity": "3", "client": str(self.owner.id)},
+        )
+
+        self.assertFalse(saved)
+        self.assertIn("quantity", errors)
+        self.assertEqual(self.stock(), 2)
+
+    def test_sale_links_client_and_product(self):
+        StockMovement.save_movement(self.product, {"kind": "purchase", "quantity": "2"})
+        StockMovement.save_movement(self.product, {"kind": "sale", "quantity": "1", "client": str(self.owner.id)})
+
+        self.assertEqual(list(self.owner.products.all()), [self.product])
+        self.assertEqual(StockMovement.objects.get(kind="purchase").provider, self.provider)
+
+    def test_low_stock_uses_single_query(self):
+        stocked = Product.objects.create(name="Correa", type="Accesorio", price=5, provider=self.provider, reorder_level=1)
+        StockMovement.save_movement(stocked, {"kind": "purchase", "quantity": "10"})
+        StockMovement.save_movement(self.product, {"kind": "purchase", "quantity": "5"})
+
+        with self.assertNumQueries(1):
+            low = [(product.name, product.stock) for product in Product.objects.low_stock()]
+
+        self.assertEqual(low, [("Alimento", 5)])
+
+
+class InvoiceGenerationTest(TestCase):
+    """
+    Pruebas para la generación mensual de facturas.
+
+    Métodos:
+    --------
+    setUp():
+        Crea dos productos con stock y ventas a un cliente en enero y febrero.
+    test_generates_lines_priced_from_products():
+        Verifica que las líneas agrupen las ventas del mes con el precio del producto.
+    test_generation_is_idempotent():
+        Verifica que no se facture dos veces al mismo cliente en el mismo mes.
+    test_batches_do_not_mix_clients():
+        Verifica que cada factura reciba solo las líneas de su cliente al procesar por lotes.
+    """
+    def setUp(self):
+        self.owner = Client.objects.create(name="Juan", phone="54221555232", email="juan@gmail.com")
+        self.food = Product.objects.create(name="Alimento", type="Comida", price=10.5)
+        self.collar = Product.objects.create(name="Correa", type="Accesorio", price=4)
+        january = datetime(2024, 1, 15, tzinfo=timezone.utc)
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(product=self.food, kind="sale", quantity=-2, client=self.owner, created_at=january),
+                StockMovement(product=self.food, kind="sale", quantity=-1, client=self.owner, created_at=january),
+                StockMovement(product=self.collar, kind="sale", quantity=-1, client=self.owner, created_at=january),
+                StockMovement(product=self.food, kind="purchase", quantity=50, created_at=january),
+                StockMovement(
+                    product=self.collar, kind="sale", quantity=-5, client=self.owner,
+                    created_at=datetime(2024, 2, 1, tzinfo=timezone.utc),
+                ),
+            ],
+        )
+
+    def test_generates_lines_priced_from_products(self):
+        self.assertEqual(Invoice.generate_month(date(2024, 1, 1)), 1)
+
+        invoice = Invoice.objects.get()
+        lines = sorted((line.description, line.quantity, line.unit_price) for line in invoice.lines.all())
+        self.assertEqual(lines, [("Alimento", 3, 10.5), ("Correa", 1, 4)])
+        self.assertEqual(invoice.total, 35.5)
+        self.assertEqual(invoice.number, f"202401-{invoice.pk:06d}")
+
+    def test_generation_is_idempotent(self):
+        Invoice.generate_month(date(2024, 1, 1))
+
+        self.assertEqual(Invoice.generate_month(date(2024, 1, 1)), 0)
+        self.assertEqual(Invoice.objects.count(), 1)
+
+    def test_batches_do_not_mix_clients(self):
+        other = Client.objects.create(name="Ana", phone="54221555233", email="ana@gmail.com")
+        StockMovement.objects.create(
+            product=self.collar, kind="sale", quantity=-2, client=other,
+            created_at=datetime(2024, 1, 20, tzinfo=timezone.utc),
+        )
+
+        self.assertEqual(Invoice.generate_month(date(2024, 1, 1), batch_size=1), 2)
+
+        self.assertEqual(Invoice.objects.get(client=other).total, 8)
+        self.assertEqual(Invoice.objects.get(client=self.owner).lines.count(), 2)
+
+
+@task("tests.echo")
+def echo(value):
+    """Tarea de prueba que devuelve su argumento."""
+    return {"value": value}
+
+
+@task("tests.fail")
+def fail():
+    """Tarea de prueba que siempre falla."""
+    raise RuntimeError("falla")
+
+
+class JobQueueTest(TestCase):
+    """
+    Pruebas para la cola de trabajos en segundo plano.
+
+    Métodos:
+    --------
+    test_claim_is_exclusive():
+        Verifica que un trabajo reclamado no pueda reclamarlo otro proceso.
+    test_claim_respects_run_at_and_limit():
+        Verifica que solo se reclamen trabajos listos y como máximo `limit`.
+    test_run_batch_stores_result():
+        Verifica que el resultado de la tarea se guarde en el trabajo.
+    test_failed_job_is_retried_with_backoff():
+        Verifica que un error reprograme el trabajo con espera exponencial.
+    test_job_fails_after_max_attempts():
+        Verifica que el trabajo quede fallido al agotar los intentos.
+    test_abandoned_job_is_reclaimed():
+        Verifica que un trabajo abandonado vuelva a reclamarse al vencer su plazo.
+    test_start_renews_lease():
+        Verifica que el plazo de un trabajo corra desde que empieza y no desde que se reclamó el lote.
+    test_stale_worker_cannot_overwrite():
+        Verifica que un proceso cuyo trabajo reclamó otro no lo ejecute ni pise su estado.
+    test_enqueue_unknown_task():
+        Verifica que no se pueda encolar una tarea no registrada.
+    """
+    def test_claim_is_exclusive(self):
+        enqueue("tests.echo", {"value": 1})
+
+        self.assertEqual(len(Job.claim("a", 10)), 1)
+        self.assertEqual(Job.claim("b", 10), [])
+
+    def test_claim_respects_run_at_and_limit(self):
+        for value in range(3):
+            enqueue("tests.echo", {"value": value})
+        enqueue("tests.echo", {"value": 9}, run_at=now() + timedelta(hours=1))
+
+        with self.assertNumQueries(2):
+            claimed = Job.claim("a", 2)
+
+        self.assertEqual([job.payload["value"] for job in claimed], [0, 1])
+        self.assertEqual(len(Job.claim("a", 10)), 1)
+
+    def test_run_batch_stores_result(self):
+        job = enqueue("tests.echo", {"value": "hola"})
+
+        self.assertEqual(run_batch("a", 10), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.DONE, 1, {"value": "hola"}))
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = enqueue("tests.fail")
+
+        with self.assertLogs("app.jobs", "ERROR"):
+            run_batch("a", 10)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn("RuntimeError", job.last_error)
+        self.assertGreaterEqual(job.run_at - now(), Job.BACKOFF_BASE * 0.9)
+        self.assertEqual(Job.claim("a", 10), [])
+
+    def test_job_fails_after_max_attempts(self):
+        job = enqueue("tests.fail", max_attempts=1)
+
+        with self.assertLogs("app.jobs", "ERROR"):
+            run_batch("a", 10)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_abandoned_job_is_reclaimed(self):
+        enqueue("tests.echo", {"value": 1})
+        Job.claim("a", 10)
+        Job.objects.update(locked_at=now() - Job.LEASE - timedelta(seconds=1))
+
+        claimed = Job.claim("b", 10)
+
+        self.assertEqual([(job.locked_by, job.attempts) for job in claimed], [("b", 2)])
+
+    def test_start_renews_lease(self):
+        for value in range(2):
+            enqueue("tests.echo", {"value": value})
+        first, _ = Job.claim("a", 10)
+        Job.objects.update(locked_at=now() - Job.LEASE - timedelta(seconds=1))
+
+        self.assertTrue(first.start())
+
+        self.assertEqual([job.payload["value"] for job in Job.claim("b", 10)], [1])
+
+    def test_stale_worker_cannot_overwrite(self):
+        enqueue("tests.echo", {"value": 1})
+        stale = Job.claim("a", 10)[0]
+        Job.objects.update(locked_at=now() - Job.LEASE - timedelta(seconds=1))
+        Job.claim("b", 10)
+
+        with self.assertLogs("app.jobs", "WARNING"):
+            self.assertFalse(run_job(stale))
+        self.assertFalse(stale.mark_done({"value": 1}))
+        self.assertFalse(stale.mark_failed("error"))
+
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.locked_by, job.result), (Job.RUNNING, "b", None))
+
+    def test_enqueue_unknown_task(self):
+        self.assertNotIn("tests.missing", TASKS)
+        with self.assertRaises(KeyError):
+            enqueue("tests.missing")
+
+
+class FailingSmsBackend(sms.BaseSmsBackend):
+    """Backend de SMS de prueba que siempre falla."""
+    def send_messages(self, messages):
+        raise ConnectionError("sin señal")
+
+
+class FlakySmsBackend(sms.LocmemBackend):
+    """Backend de SMS de prueba que se corta después de enviar un mensaje."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.remaining = 1
+
+    def send_messages(self, messages):
+        if len(messages) > self.remaining:
+            raise ConnectionError("sin señal")
+        self.remaining -= len(messages)
+        return super().send_messages(messages)
+
+
+class ReminderTest(TestCase):
+    """
+    Pruebas para la programación y el envío de recordatorios.
+
+    Métodos:
+    --------
+    test_vaccination_reminders_use_client_channel():
+        Verifica que se avise del cumpleaños por correo, o por SMS si no hay correo.
+    test_schedule_is_idempotent():
+        Verifica que volver a programar el mismo día no duplique recordatorios.
+    test_leap_day_birthday_reminded_on_february_28():
+        Verifica que los nacidos un 29 de febrero se avisen el 28 en años no bisiestos.
+    test_refill_uses_last_administration():
+        Verifica que la reposición se calcule desde la última administración.
+    test_send_batch_sends_once():
+        Verifica que cada recordatorio se envíe una sola vez por su canal.
+    test_failed_send_is_released():
+        Verifica que un envío fallido devuelva a pendiente solo los recordatorios de su canal.
+    test_partially_failed_send_keeps_sent_reminders():
+        Verifica que un corte a mitad del envío devuelva a pendiente solo los recordatorios no enviados.
+    """
+    def setUp(self):
+        self.ana = Client.objects.create(name="Ana", phone=54221555232, email="ana@gmail.com")
+        self.juan = Client.objects.create(name="Juan", phone=54221555233, email="")
+
+    def test_vaccination_reminders_use_client_channel(self):
+        Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=self.ana)
+        Pet.objects.create(name="Luna", breed="Siames", birthday=date(2019, 3, 8), weight=4, client=self.juan)
+        Pet.objects.create(name="Max", breed="Mestizo", birthday=date(2020, 3, 9), weight=10, client=self.ana)
+        Pet.objects.create(name="Sol", breed="Mestizo", birthday=date(2025, 3, 8), weight=1, client=self.ana)
+
+        self.assertEqual(Reminder.schedule(date(2025, 3, 1), lead_days=7), 2)
+
+        reminders = {reminder.pet.name: reminder for reminder in Reminder.objects.all()}
+        self.assertEqual(set(reminders), {"Toby", "Luna"})
+        self.assertEqual((reminders["Toby"].channel, reminders["Toby"].recipient), (Reminder.EMAIL, "ana@gmail.com"))
+        self.assertEqual((reminders["Luna"].channel, reminders["Luna"].recipient), (Reminder.SMS, "54221555233"))
+        self.assertEqual(reminders["Toby"].due_date, date(2025, 3, 8))
+        self.assertIn("08/03/2025", reminders["Toby"].message)
+
+    def test_schedule_is_idempotent(self):
+        Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=self.ana)
+
+        Reminder.schedule(date(2025, 3, 1), lead_days=7)
+
+        self.assertEqual(Reminder.schedule(date(2025, 3, 1), lead_days=7), 0)
+        self.assertEqual(Reminder.objects.count(), 1)
+
+    def test_leap_day_birthday_reminded_on_february_28(self):
+        Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 2, 29), weight=10, client=self.ana)
+
+        self.assertEqual(Reminder.schedule(date(2025, 2, 21), lead_days=7), 1)
+        self.assertEqual(Reminder.schedule(date(2028, 2, 21), lead_days=7), 0)
+        self.assertEqual(Reminder.schedule(date(2028, 2, 22), lead_days=7), 1)
+
+    def test_refill_uses_last_administration(self):
+        medicine = Medicine.objects.create(name="Antiparasitario", description="Oral", dose=2, refill_days=30)
+        other = Medicine.objects.create(name="Vitaminas", description="Oral", dose=2)
+        toby = Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 5, 1), weight=10, client=self.ana)
+        luna = Pet.objects.create(name="Luna", breed="Siames", birthday=date(2020, 5, 1), weight=4, client=self.juan)
+        start = datetime(2025, 2, 6, 10, tzinfo=timezone.utc)
+        for pet, medicine_, administered_at in (
+            (toby, medicine, start),
+            (toby, other, start),
+            (luna, medicine, start),
+            (luna, medicine, start + timedelta(days=20)),
+        ):
+            MedicationAdministration.objects.create(
+                pet=pet, medicine=medicine_, dose=2, administered_at=administered_at,
+            )
+
+        self.assertEqual(Reminder.schedule(date(2025, 3, 1), lead_days=7), 1)
+
+        reminder = Reminder.objects.get()
+        self.assertEqual((reminder.kind, reminder.pet, reminder.medicine), (Reminder.REFILL, toby, medicine))
+        self.assertEqual(reminder.due_date, date(2025, 3, 8))
+
+    def test_send_batch_sends_once(self):
+        sms.outbox.clear()
+        Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=self.ana)
+        Pet.objects.create(name="Luna", breed="Siames", birthday=date(2019, 3, 8), weight=4, client=self.juan)
+        Reminder.schedule(date(2025, 3, 1), lead_days=7)
+
+        self.assertEqual(send_batch(10), {"sent": 2})
+        self.assertEqual(send_batch(10), {"sent": 0})
+
+        self.assertEqual([message.to for message in mail.outbox], [["ana@gmail.com"]])
+        self.assertEqual([message.to for message in sms.outbox], ["54221555233"])
+        self.assertFalse(Reminder.objects.exclude(status=Reminder.SENT).exists())
+
+    @override_settings(SMS_BACKEND="app.tests_unit.FailingSmsBackend")
+    def test_failed_send_is_released(self):
+        Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=self.ana)
+        Pet.objects.create(name="Luna", breed="Siames", birthday=date(2019, 3, 8), weight=4, client=self.juan)
+        Reminder.schedule(date(2025, 3, 1), lead_days=7)
+
+        with self.assertRaises(ConnectionError):
+            send_batch(10)
+
+        statuses = dict(Reminder.objects.values_list("channel", "status"))
+        self.assertEqual(statuses, {Reminder.EMAIL: Reminder.SENT, Reminder.SMS: Reminder.PENDING})
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(SMS_BACKEND="app.tests_unit.FlakySmsBackend")
+    def test_partially_failed_send_keeps_sent_reminders(self):
+        sms.outbox.clear()
+        pedro = Client.objects.create(name="Pedro", phone=54221555234, email="")
+        Pet.objects.create(name="Luna", breed="Siames", birthday=date(2019, 3, 8), weight=4, client=self.juan)
+        Pet.objects.create(name="Kira", breed="Mestizo", birthday=date(2018, 3, 8), weight=8, client=pedro)
+        Reminder.schedule(date(2025, 3, 1), lead_days=7)
+
+        with self.assertRaises(ConnectionError):
+            send_batch(10)
+
+        self.assertEqual(len(sms.outbox), 1)
+        sent = Reminder.objects.get(status=Reminder.SENT)
+        self.assertEqual(sent.recipient, sms.outbox[0].to)
+        self.assertEqual(Reminder.objects.filter(status=Reminder.PENDING).count(), 1)
+
+
+class AuditTrailTest(TransactionTestCase):
+    """
+    Pruebas para el registro de auditoría.
+
+    Usa TransactionTestCase: las entradas de los cambios hechos dentro de una
+    transacción se agregan al confirmarla, lo que no ocurre dentro de un TestCase.
+
+    Métodos:
+    --------
+    test_create_records_initial_values():
+        Verifica que un alta registre los valores iniciales.
+    test_update_records_field_diff():
+        Verifica que una modificación registre solo los campos cambiados.
+    test_delete_keeps_snapshot():
+        Verifica que una baja conserve los valores del registro eliminado.
+    test_m2m_changes_are_recorded_on_owner():
+        Verifica que los cambios de relaciones se registren en el dueño de la relación.
+    test_m2m_clear_records_removed_ids():
+        Verifica que vaciar una relación (`clear`, `set`) registre los ids quitados.
+    test_buffered_entries_are_written_together():
+        Verifica que las entradas acumuladas se guarden con una sola consulta.
+    test_unaudited_models_are_ignored():
+        Verifica que los modelos no auditados no generen entradas.
+    test_rolled_back_changes_are_not_recorded():
+        Verifica que los cambios de una transacción revertida no dejen entradas.
+    test_exception_discards_buffer():
+        Verifica que un bloque `buffered` que termina con una excepción no guarde entradas.
+    """
+    def setUp(self):
+        self.owner = Client.objects.create(name="Juan", phone=54221555232, email="juan@gmail.com")
+
+    def test_create_records_initial_values(self):
+        entry = AuditEntry.objects.get()
+
+        self.assertEqual((entry.model, entry.object_id, entry.action), ("client", self.owner.pk, audit.CREATE))
+        self.assertEqual(entry.changes["name"], [None, "Juan"])
+        self.assertNotIn("version", entry.changes)
+
+    def test_update_records_field_diff(self):
+        self.owner.update_client({"city": "Berisso", "name": "Juan"})
+
+        entry = AuditEntry.objects.get(action=audit.UPDATE)
+        self.assertEqual(entry.changes, {"city": ["", "Berisso"]})
+
+    def test_delete_keeps_snapshot(self):
+        pet = Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=self.owner)
+
+        self.owner.delete()
+
+        deleted = AuditEntry.objects.filter(action=audit.DELETE)
+        self.assertEqual(sorted(deleted.values_list("model", flat=True)), ["client", "pet"])
+        pet_entry = deleted.get(model="pet")
+        self.assertEqual(pet_entry.object_id, pet.pk)
+        self.assertEqual(pet_entry.changes["birthday"], ["2020-03-08", None])
+
+    def test_m2m_changes_are_recorded_on_owner(self):
+        product = Product.objects.create(name="Collar", type="Accesorio", price=5)
+
+        self.owner.products.add(product)
+        self.owner.products.remove(product)
+        product.client_set.add(self.owner)
+
+        changes = list(
+            AuditEntry.objects.filter(action=audit.M2M).order_by("pk").values_list("object_id", "changes"),
+        )
+        self.assertEqual(changes, [
+            (self.owner.pk, {"products": [None, [product.pk]]}),
+            (self.owner.pk, {"products": [[product.pk], None]}),
+            (self.owner.pk, {"products": [None, [product.pk]]}),
+        ])
+
+    def test_m2m_clear_records_removed_ids(self):
+        collar, correa = [
+            Product.objects.create(name=name, type="Accesorio", price=5) for name in ("Collar", "Correa")
+        ]
+        other = Client.objects.create(name="Ana", phone=54221555233, email="ana@gmail.com")
+        self.owner.products.add(collar, correa)
+        other.products.add(collar)
+        AuditEntry.objects.all().delete()
+
+        self.owner.products.clear()
+        other.products.set([correa], clear=True)
+        collar.client_set.add(self.owner)
+        collar.client_set.clear()
+        correa.client_set.set([])
+
+        changes = list(
+            AuditEntry.objects.filter(action=audit.M2M).order_by("pk").values_list("object_id", "changes"),
+        )
+        self.assertEqual(changes, [
+            (self.owner.pk, {"products": [[collar.pk, correa.pk], None]}),
+            (other.pk, {"products": [[collar.pk], None]}),
+            (other.pk, {"products": [None, [correa.pk]]}),
+            (self.owner.pk, {"products": [None, [collar.pk]]}),
+            (self.owner.pk, {"products": [[collar.pk], None]}),
+            (other.pk, {"products": [[correa.pk], None]}),
+        ])
+
+    def test_buffered_entries_are_written_together(self):
+        with CaptureQueriesContext(connection) as queries, audit.buffered(actor="admin") as entries:
+            audit.record("client", 1, audit.UPDATE, {"name": ["a", "b"]})
+            audit.record("pet", 2, audit.DELETE, {})
+            self.assertEqual(len(entries), 2)
+
+        # Un único INSERT (fuera de un TestCase, `bulk_create` lo envuelve en BEGIN/COMMIT).
+        self.assertEqual([query["sql"].split()[0] for query in queries], ["BEGIN", "INSERT", "COMMIT"])
+        self.assertEqual(AuditEntry.objects.filter(actor="admin").count(), 2)
+
+    def test_unaudited_models_are_ignored(self):
+        vet = Vet.objects.create(name="Maria", phone=221555232, email="maria@gmail.com")
+        vet.delete()
+
+        self.assertFalse(AuditEntry.objects.filter(model="vet").exists())
+
+    def test_rolled_back_changes_are_not_recorded(self):
+        with audit.buffered(actor="admin"):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10)
+                raise IntegrityError("fallo simulado")
+            with transaction.atomic():
+                self.owner.update_client({"city": "Berisso"})
+
+        self.assertEqual(list(AuditEntry.objects.values_list("action", "actor")), [
+            (audit.CREATE, ""), (audit.UPDATE, "admin"),
+        ])
+
+    def test_exception_discards_buffer(self):
+        with self.assertRaises(RuntimeError), audit.buffered(actor="admin"):
+            audit.record("client", 1, audit.UPDATE, {"name": ["a", "b"]})
+            raise RuntimeError("falla")
+
+        self.assertFalse(AuditEntry.objects.filter(actor="admin").exists())
+
+
+class SlowQueryLogTest(TestCase):
+    """
+    Pruebas para el registro de consultas lentas.
+
+    Métodos:
+    --------
+    test_slow_query_is_recorded_with_plan():
+        Verifica que se registren el SQL, la línea que lo ejecutó y el plan.
+    test_fast_queries_are_not_recorded():
+        Verifica que las consultas bajo el umbral no se registren.
+    test_top_offenders_groups_in_lists():
+        Verifica que las listas IN de distinto largo se agrupen como una consulta.
+    """
+    def setUp(self):
+        slow_queries.clear()
+        self.addCleanup(slow_queries.clear)
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_query_is_recorded_with_plan(self):
+        list(Client.objects.filter(name="Juan"))
+
+        [entry] = slow_queries.recent()
+        self.assertIn('FROM "app_client"', entry["sql"])
+        self.assertIn("Juan", entry["params"])
+        self.assertIn("app/tests_unit.py", entry["site"])
+        self.assertIn("test_slow_query_is_recorded_with_plan", entry["site"])
+        self.assertTrue(any("app_client" in row for row in entry["plan"]))
+
+    @override_settings(SLOW_QUERY_MS=10_000)
+    def test_fast_queries_are_not_recorded(self):
+        list(Client.objects.all())
+
+        self.assertEqual(slow_queries.recent(), [])
+
+    def test_top_offenders_groups_in_lists(self):
+        entry = {"view": "pets_repo", "site": "", "plan": None}
+        entries = [
+            dict(entry, sql='SELECT * FROM "app_client" WHERE "id" IN (%s, %s)', duration_ms=5),
+            dict(entry, sql='SELECT * FROM "app_client" WHERE "id" IN (%s)', duration_ms=7),
+            dict(entry, sql='SELECT * FROM "app_pet"', duration_ms=10),
+        ]
+
+        [first, second] = slow_queries.top_offenders(entries)
+
+        self.assertEqual(first["sql"], 'SELECT * FROM "app_client" WHERE "id" IN (...)')
+        self.assertEqual((first["count"], first["total_ms"], first["max_ms"]), (2, 12, 7))
+        self.assertEqual(second["count"], 1)
+
+
+class SoftDeleteTest(TestCase):
+    """
+    Pruebas para el borrado lógico.
+
+    Métodos:
+    --------
+    test_client_delete_hides_client_and_pets():
+        Verifica que eliminar un cliente oculte al cliente y a sus mascotas sin borrarlos.
+    test_pet_delete_cancels_future_appointments_and_reminders():
+        Verifica que eliminar una mascota cancele sus turnos futuros y recordatorios pendientes.
+    test_provider_delete_hides_products():
+        Verifica que eliminar un proveedor oculte sus productos.
+    test_live_queries_use_partial_indexes():
+        Verifica que los listados usen los índices parciales sobre las filas vivas.
+    """
+    def setUp(self):
+        self.owner = Client.objects.create(name="Juan", phone=54221555232, email="juan@gmail.com")
+        self.pet = Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=self.owner)
+
+    def test_client_delete_hides_client_and_pets(self):
+        self.assertEqual(Client.soft_delete(self.owner.pk), 1)
+        self.assertEqual(Client.soft_delete(self.owner.pk), 0)
+
+        self.assertFalse(Client.objects.exists())
+        self.assertFalse(Pet.objects.exists())
+        self.assertIsNotNone(Pet.all_objects.get(pk=self.pet.pk).deleted_at)
+        self.assertEqual(
+            Client.all_objects.get().deleted_at, Pet.all_objects.get().deleted_at,
+        )
+
+    def test_pet_delete_cancels_future_appointments_and_reminders(self):
+        vet = Vet.objects.create(name="Maria", phone=221555232, email="maria@gmail.com")
+        for start in (now() - timedelta(days=3), now() + timedelta(days=3)):
+            Appointment.objects.create(pet=self.pet, vet=vet, start=start, end=start + timedelta(minutes=30))
+        Reminder.schedule(date(2025, 3, 1), lead_days=7)
+
+        Pet.soft_delete(self.pet.pk)
+
+        self.assertEqual(Appointment.objects.count(), 1)
+        self.assertLess(Appointment.objects.get().start, now())
+        self.assertFalse(Reminder.objects.exists())
+
+    def test_provider_delete_hides_products(self):
+        provider = Provider.objects.create(name="Pedro", email="pedro@gmail.com", address="Calle 1")
+        product = Product.objects.create(name="Collar", type="Accesorio", price=5, provider=provider)
+        self.owner.products.add(product)
+
+        Provider.soft_delete(provider.pk)
+
+        self.assertFalse(Product.objects.with_stock().exists())
+        self.assertFalse(self.owner.products.exists())
+        self.assertTrue(Product.all_objects.filter(pk=product.pk).exists())
+
+    def test_live_queries_use_partial_indexes(self):
+        # Los índices de los listados empiezan por la clínica activa.
+        with tenancy.activate(1):
+            cases = (
+                (Pet.objects.filter(breed="Mestizo"), "app_pet_breed_live_idx"),
+                (Client.objects.order_by("name")[:10], "app_client_name_live_idx"),
+                (Pet.all_objects.filter(deleted_at__lt=now()), "app_pet_deleted_idx"),
+            )
+
+        for queryset, index in cases:
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+                plan = " ".join(str(row) for row in cursor.fetchall())
+            self.assertIn(index, plan)
+
+
+class TenancyTest(TestCase):
+    """
+    Pruebas para la separación de los registros por clínica.
+
+    Métodos:
+    --------
+    setUp():
+        Crea la clínica por defecto y una segunda clínica con dominio propio.
+    test_resolve_by_domain():
+        Verifica que cada dominio se resuelva a su clínica y los demás a la clínica por defecto.
+    test_resolve_reloads_changes_from_other_processes():
+        Verifica que los dominios se recarguen al cambiar la versión compartida o vencer su plazo.
+    test_managers_are_scoped_to_active_clinic():
+        Verifica que los managers filtren por la clínica activa y las altas la tomen.
+    test_save_pet_rejects_client_from_other_clinic():
+        Verifica que no se pueda asignar a una mascota un cliente de otra clínica.
+    test_reminders_are_scheduled_for_every_clinic():
+        Verifica que los recordatorios se programen para las mascotas de todas las clínicas.
+    test_scoped_queries_use_clinic_indexes():
+        Verifica que los listados de una clínica usen los índices que empiezan por la clínica.
+    """
+    def setUp(self):
+        self.addCleanup(tenancy.clear_cache)
+        self.main = Clinic.objects.create(name="Principal", domain="")
+        self.north = Clinic.objects.create(name="Norte", domain="norte.example")
+
+    def test_resolve_by_domain(self):
+        self.assertEqual(tenancy.resolve("norte.example"), self.north.id)
+        self.assertEqual(tenancy.resolve("NORTE.example:8000"), self.north.id)
+        self.assertEqual(tenancy.resolve("vetsoft.example"), self.main.id)
+
+        self.north.delete()
+        self.assertEqual(tenancy.resolve("norte.example"), self.main.id)
+
+    def test_resolve_reloads_changes_from_other_processes(self):
+        self.assertEqual(tenancy.resolve("norte.example"), self.north.id)
+
+        # Otro proceso cambia el dominio: este proceso no ejecuta `Clinic.save`.
+        Clinic.objects.filter(pk=self.north.pk).update(domain="norte2.example")
+        with self.assertNumQueries(0):
+            self.assertEqual(tenancy.resolve("norte.example"), self.north.id)
+
+        cache.set(tenancy.VERSION_KEY, "otra versión", None)
+        self.assertEqual(tenancy.resolve("norte.example"), self.main.id)
+
+        Clinic.objects.filter(pk=self.north.pk).update(domain="norte.example")
+        with override_settings(CLINIC_DOMAINS_TTL=0):
+            self.assertEqual(tenancy.resolve("norte.example"), self.north.id)
+
+    def test_managers_are_scoped_to_active_clinic(self):
+        Client.objects.create(name="Juan", phone=54221555232, email="juan@gmail.com")
+        with tenancy.activate(self.north.id):
+            Client.objects.create(name="Ana", phone=54221555233, email="ana@gmail.com")
+            self.assertEqual(list(Client.objects.values_list("name", flat=True)), ["Ana"])
+            self.assertEqual(Client.all_objects.count(), 2)
+
+        self.assertEqual(Client.objects.get(name="Juan").clinic_id, self.main.id)
+        self.assertEqual(Client.objects.get(name="Ana").clinic_id, self.north.id)
+
+    def test_save_pet_rejects_client_from_other_clinic(self):
+        owner = Client.objects.create(name="Juan", phone=54221555232, email="juan@gmail.com")
+        data = {"name": "Toby", "breed": "Mestizo", "birthday": "2020-03-08", "weight": "10", "client": owner.id}
+
+        with tenancy.activate(self.north.id):
+            saved, errors = Pet.save_pet(data)
+
+        self.assertFalse(saved)
+        self.assertIn("client", errors)
+        self.assertFalse(Pet.objects.exists())
+
+    def test_reminders_are_scheduled_for_every_clinic(self):
+        for clinic in (self.main, self.north):
+            with tenancy.activate(clinic.id):
+                owner = Client.objects.create(name="Juan", phone=54221555232, email="juan@gmail.com")
+                Pet.objects.create(name="Toby", breed="Mestizo", birthday=date(2020, 3, 8), weight=10, client=owner)
+
+        self.assertEqual(Reminder.schedule(date(2025, 3, 1), lead_days=7), 2)
+
+    def test_scoped_queries_use_clinic_indexes(self):
+        with tenancy.activate(self.north.id):
+            cases = (
+                (Pet.objects.filter(name="Toby"), "app_pet_name_live_idx"),
+                (Vet.objects.order_by("name")[:10], "app_vet_clinic_name_idx"),
+            )
+
+        for queryset, index in cases:
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+                plan = " ".join(str(row) for row in cursor.fetchall())
+            self.assertIn(index, plan)
+            self.assertIn("clinic_id=?", plan)
+
+
+class WarmupTest(TestCase):
+    """
+    Pruebas para el precalentamiento previo al fork de los workers.
+
+    Métodos:
+    --------
+    test_prefork_loads_without_database():
+        Verifica que se carguen URLs, plantillas y modelos sin consultar la base.
+    """
+    def test_prefork_loads_without_database(self):
+        self.addCleanup(gc.unfreeze)
+
+        with self.assertNumQueries(0):
+            loaded = warmup.prefork()
+
+        self.assertIn("pets/repository.html", warmup.template_names())
+        self.assertNotIn("admin/base.html", warmup.template_names())
+        self.assertEqual(loaded["templates"], len(warmup.template_names()))
+        self.assertGreater(loaded["urls"], 0)
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+
+class WorkerMetricsTest(TestCase):
+    """
+    Pruebas para las métricas compartidas de los workers.
+
+    Métodos:
+    --------
+    test_requests_are_counted_per_worker():
+        Verifica que se cuenten las solicitudes en curso, los workers ocupados y el total.
+    test_released_slot_keeps_total():
+        Verifica que liberar un lugar conserve el total y permita reutilizarlo.
+    """
+    def setUp(self):
+        worker_metrics.setup(2)
+        self.addCleanup(worker_metrics.attach, None, 0)
+        self.addCleanup(worker_metrics.setup, 0)
+
+    def test_requests_are_counted_per_worker(self):
+        worker_metrics.attach(worker_metrics.assign_slot(), threads=4)
+
+        worker_metrics.request_started()
+        worker_metrics.request_started()
+        worker_metrics.request_finished()
+
+        snapshot = worker_metrics.snapshot()
+        self.assertEqual(
+            {key: snapshot[key] for key in ("workers", "workers_busy", "threads", "requests_in_progress", "requests_total")},
+            {"workers": 1, "workers_busy": 1, "threads": 4, "requests_in_progress": 1, "requests_total": 1},
+        )
+
+    def test_released_slot_keeps_total(self):
+        slot = worker_metrics.assign_slot()
+        self.assertEqual(worker_metrics.assign_slot(), 1)
+        self.assertIsNone(worker_metrics.assign_slot())
+
+        worker_metrics.attach(slot, threads=4)
+        worker_metrics.request_started()
+        worker_metrics.request_finished()
+        worker_metrics.release_slot(slot)
+
+        self.assertEqual(worker_metrics.assign_slot(), slot)
+        snapshot = worker_metrics.snapshot()
+        self.assertEqual((snapshot["workers"], snapshot["requests_total"]), (0, 1))
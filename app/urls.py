@@ -4,6 +4,10 @@ from . import views
 
 urlpatterns = [
     path("", view=views.home, name="home"),
+    path("metrics", view=views.metrics, name="metrics"),
+    path("autocompletar/<str:source>/", view=views.autocomplete, name="autocomplete"),
+    path("trabajos/<int:id>/", view=views.job_status, name="job_status"),
+    path("historial/<str:model>/<int:id>/", view=views.audit_history, name="audit_history"),
     path("clientes/", view=views.clients_repository, name="clients_repo"),
     path("clientes/nuevo/", view=views.clients_form, name="clients_form"),
     path("clientes/editar/<int:id>/", view=views.clients_form, name="clients_edit"),
@@ -21,11 +25,14 @@ urlpatterns = [
     path("productos/nuevo/", view=views.product_form, name="products_form"),
     path("productos/editar/<int:id>/", view=views.product_form, name="products_edit"),
     path("productos/eliminar/", view=views.products_delete, name="products_delete"),
+    path("productos/<int:id>/stock/", view=views.products_stock, name="products_stock"),
+    path("productos/faltantes/", view=views.products_low_stock, name="products_low_stock"),
     
     path("vets/", view=views.vets_repository, name="vets_repo"),
     path("vets/nuevo/", view=views.vets_form, name="vets_form"),
     path("vets/editar/<int:id>/", view=views.vets_form, name="vets_edit"),
     path("vets/eliminar/", view=views.vets_delete, name="vets_delete"),
+    path("vets/<int:id>/agenda/", view=views.vets_agenda, name="vets_agenda"),
     
     path("medicine/", view=views.medicine_repository, name="medicine_repo"),
     path("medicine/nuevo/", view=views.medicine_form, name="medicine_form"),
@@ -37,6 +44,10 @@ urlpatterns = [
     path("mascotas/editar/<int:id>/", view=views.pets_form, name="pets_edit"),
     path("mascotas/eliminar", view=views.pets_delete, name="pets_delete"),
 
+    path("mascotas/pesos/", view=views.pets_weight_chart, name="pets_weight_chart"),
+    path("mascotas/<int:id>/turnos/nuevo/", view=views.pets_appointment, name="pets_appointment"),
+    path("mascotas/<int:id>/medicaciones/", view=views.pets_timeline, name="pets_timeline"),
+
     path("mascotas/agregar-medicina/<int:id>/", view=views.pets_add_medicine, name="pets_add_medicine"),
     path("mascotas/seleccionar-medicinas/", view=views.select_medicines_to_delete, name="select_medicines_to_delete"),
     path("mascotas/eliminar-medicinas/", view=views.delete_selected_medicines, name="delete_selected_medicines"),
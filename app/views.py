@@ -1,9 +1,53 @@
-from datetime import date
+from datetime import date, datetime, timedelta
 
+from django.apps import apps
+from django.contrib import messages
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render, reverse
-from pyexpat.errors import messages
-
-from .models import Client, Medicine, Pet, Product, Provider, Specialty, Vet
+from django.utils import timezone
+
+from . import tenancy, worker_metrics
+from .filters import (
+    CLIENTS_QUERY,
+    MEDICINES_QUERY,
+    PETS_QUERY,
+    PRODUCTS_QUERY,
+    PROVIDERS_QUERY,
+    VETS_QUERY,
+)
+from .models import (
+    Appointment,
+    AuditEntry,
+    Client,
+    Job,
+    MedicationAdministration,
+    Medicine,
+    Pet,
+    Product,
+    Provider,
+    SoftDeleteModel,
+    Specialty,
+    StockMovement,
+    Vet,
+    WeightSeries,
+    search_key,
+)
+from .replicas import reads_from_replica
+
+AUTOCOMPLETE_LIMIT = 10
+
+WEIGHT_CHART_MAX_PETS = 5000
+
+STOCK_MOVEMENTS_SHOWN = 50
+
+AUDIT_HISTORY_SHOWN = 100
+
+AUTOCOMPLETE_SOURCES = {
+    "clients": Client,
+    "medicines": Medicine,
+    "vets": Vet,
+    "products": Product,
+}
 
 
 def home(request):
@@ -18,9 +62,155 @@ def home(request):
     """
     return render(request, "home.html")
 
+def autocomplete(request, source):
+    """
+    Devuelve en JSON los primeros registros cuyo nombre empieza con el texto buscado.
+
+    La búsqueda es un rango sobre `name_search` (`>= q` y `< q + U+10FFFF`), el
+    nombre normalizado con `search_key` (sin mayúsculas ni tildes, igual que el
+    texto buscado), que usa el índice del modelo en lugar de recorrer toda la tabla.
+
+    Args:
+        request: El objeto de solicitud HTTP, con el texto a buscar en `q`.
+        source (str): Origen de los datos: clients, medicines, vets o products.
+
+    Returns:
+        JsonResponse: Diccionario con la lista `results` de objetos {id, name}.
+    """
+    model = AUTOCOMPLETE_SOURCES.get(source)
+    if model is None:
+        raise Http404
+
+    term = search_key(request.GET.get("q", "").strip())
+    if term == "":
+        return JsonResponse({"results": []})
+
+    results = (
+        model.objects.filter(name_search__gte=term, name_search__lt=term + "\U0010ffff")
+        .order_by("name_search", "pk")
+        .values("id", "name")[:AUTOCOMPLETE_LIMIT]
+    )
+
+    return JsonResponse({"results": list(results)})
+
+def metrics(request):
+    """
+    Publica las métricas de los workers de gunicorn en formato de texto de Prometheus.
+
+    Los valores salen de la memoria compartida entre los workers (ver
+    `app.worker_metrics`) y no consultan la base de datos.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+
+    Returns:
+        HttpResponse: Las métricas en texto plano.
+    """
+    lines = []
+    for name, value in worker_metrics.snapshot().items():
+        if value is None:
+            continue
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# TYPE vetsoft_{name} {kind}")
+        lines.append(f"vetsoft_{name} {value}")
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4")
+
+def job_status(request, id):
+    """
+    Devuelve en JSON el estado de un trabajo en segundo plano.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+        id (int): El ID del trabajo.
+
+    Returns:
+        JsonResponse: Estado, intentos, próxima ejecución, último error y resultado del trabajo.
+
+    Raises:
+        Http404: Si el trabajo no existe o es de otra clínica.
+    """
+    job = get_object_or_404(tenancy.scope(Job.objects.all()), pk=id)
+
+    return JsonResponse(
+        {
+            "id": job.id,
+            "name": job.name,
+            "status": job.status,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "run_at": job.run_at,
+            "finished_at": job.finished_at,
+            "last_error": job.last_error.strip().splitlines()[-1] if job.last_error else None,
+            "result": job.result,
+        },
+    )
+
+def audit_history(request, model, id):
+    """
+    Muestra los últimos cambios registrados de un cliente, una mascota o un producto.
+
+    La historia se conserva aunque el registro se haya eliminado. Con una
+    clínica activa solo se muestran registros de esa clínica.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+        model (str): Nombre del modelo ("client", "pet" o "product").
+        id (int): El ID del registro.
+
+    Returns:
+        HttpResponse: La respuesta HTTP renderizada con la plantilla 'audit/history.html'.
+    """
+    if model not in AuditEntry.MODELS:
+        raise Http404
+
+    if tenancy.current_clinic_id() is not None:
+        model_class = apps.get_model("app", model)
+        if not tenancy.scope(model_class.all_objects.filter(pk=id)).exists():
+            raise Http404
+
+    return render(
+        request,
+        "audit/history.html",
+        {
+            "label": AuditEntry.MODELS[model],
+            "object_id": id,
+            "entries": AuditEntry.history(model, id, AUDIT_HISTORY_SHOWN),
+        },
+    )
+
+def _delete_or_404(model, pk):
+    """
+    Elimina un registro por id sin cargarlo antes con `get_object_or_404`.
+
+    Los modelos con borrado lógico (`SoftDeleteModel`) solo se marcan como
+    eliminados junto con sus dependientes. En el resto el borrado se hace sobre
+    el queryset filtrado, por lo que Django solo consulta las relaciones en
+    cascada y elimina las filas en la misma transacción.
+
+    Args:
+        model: Modelo del registro a eliminar.
+        pk (str): Id enviado por el formulario.
+
+    Raises:
+        Http404: Si el id no es válido o no se eliminó ningún registro.
+    """
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        raise Http404 from None
+
+    if issubclass(model, SoftDeleteModel):
+        deleted = model.soft_delete(pk)
+    else:
+        deleted, _ = model.objects.filter(pk=pk).delete()
+
+    if not deleted:
+        raise Http404
+
+@reads_from_replica
 def providers_repository(request):
     """
-    Muestra la lista de todos los proveedores.
+    Muestra la lista paginada de proveedores, ordenable por columna.
 
     Args:
         request: El objeto de solicitud HTTP.
@@ -28,8 +218,8 @@ def providers_repository(request):
     Returns:
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'providers/repository.html'.
     """
-    providers = Provider.objects.all()
-    return render(request, "providers/repository.html", {"providers": providers})
+    context = PROVIDERS_QUERY.paginate(request, Provider.objects.all())
+    return render(request, "providers/repository.html", {"providers": context["page_obj"], **context})
 
 
 def providers_form(request, id=None):
@@ -52,7 +242,7 @@ def providers_form(request, id=None):
             saved, errors = Provider.save_provider(request.POST)
         else:
             provider = get_object_or_404(Provider, pk=provider_id)
-            provider.update_provider(request.POST)
+            saved, errors = provider.update_provider(request.POST)
 
         if saved:
             return redirect(reverse("providers_repo"))
@@ -77,15 +267,14 @@ def providers_delete(request):
     Returns:
         HttpResponse: Redirección a la lista de proveedores.
     """
-    provider_id = request.POST.get("provider_id")
-    provider = get_object_or_404(Provider, pk=int(provider_id))
-    provider.delete()
+    _delete_or_404(Provider, request.POST.get("provider_id"))
 
     return redirect(reverse("providers_repo"))
 
+@reads_from_replica
 def clients_repository(request):
     """
-    Muestra la lista de todos los clientes.
+    Muestra la lista paginada de clientes, filtrable por ciudad y ordenable por columna.
 
     Args:
         request: El objeto de solicitud HTTP.
@@ -93,9 +282,11 @@ def clients_repository(request):
     Returns:
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'clients/repository.html'.
     """
-    vacioP = bool(Product.objects.all())
-    clients = Client.objects.all()
-    return render(request, "clients/repository.html", {"clients": clients, "vacioP":vacioP})
+    vacioP = Product.objects.exists()
+    context = CLIENTS_QUERY.paginate(request, Client.objects.prefetch_related("products"))
+    return render(
+        request, "clients/repository.html", {"clients": context["page_obj"], "vacioP": vacioP, **context},
+    )
 
 
 def clients_form(request, id=None):
@@ -118,7 +309,7 @@ def clients_form(request, id=None):
             saved, errors = Client.save_client(request.POST)
         else:
             client = get_object_or_404(Client, pk=client_id)
-            client.update_client(request.POST)
+            saved, errors = client.update_client(request.POST)
 
         if saved:
             return redirect(reverse("clients_repo"))
@@ -144,17 +335,16 @@ def clients_delete(request):
     Returns:
         HttpResponse: Redirección a la lista de clientes.
     """
-    client_id = request.POST.get("client_id")
-    client = get_object_or_404(Client, pk=int(client_id))
-    client.delete()
+    _delete_or_404(Client, request.POST.get("client_id"))
 
     return redirect(reverse("clients_repo"))
 
 #VETERINARIO
 
+@reads_from_replica
 def vets_repository(request):
     """
-    Muestra la lista de todos los veterinarios.
+    Muestra la lista paginada de veterinarios, filtrable por especialidad y ordenable por columna.
 
     Args:
         request: El objeto de solicitud HTTP.
@@ -162,9 +352,12 @@ def vets_repository(request):
     Returns:
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'vets/repository.html'.
     """
-    vets = Vet.objects.all()
-    
-    return render(request, "vets/repository.html", {"vets": vets})
+    context = VETS_QUERY.paginate(request, Vet.objects.all())
+    return render(
+        request,
+        "vets/repository.html",
+        {"vets": context["page_obj"], "specialties": Specialty.choices(), **context},
+    )
 
 def vets_form(request, id=None):
     """
@@ -188,7 +381,7 @@ def vets_form(request, id=None):
             saved, errors = Vet.save_vet(request.POST)
         else:
             vet = get_object_or_404(Vet, pk=vet_id)
-            vet.update_vet(request.POST)
+            saved, errors = vet.update_vet(request.POST)
 
         if saved:
             return redirect(reverse("vets_repo"))
@@ -204,6 +397,35 @@ def vets_form(request, id=None):
     return render(request, "vets/form.html", {"vet": vet, "specialties": specialties})
 
 
+def vets_agenda(request, id):
+    """
+    Muestra la agenda diaria de un veterinario.
+
+    Args:
+        request: El objeto de solicitud HTTP, con el día a mostrar en `fecha` (YYYY-MM-DD).
+        id (int): El ID del veterinario.
+
+    Returns:
+        HttpResponse: La respuesta HTTP renderizada con la plantilla 'vets/agenda.html'.
+    """
+    vet = get_object_or_404(Vet.objects.only("id", "name", "specialty"), pk=id)
+    try:
+        day = date.fromisoformat(request.GET.get("fecha", ""))
+    except ValueError:
+        day = timezone.localdate()
+
+    return render(
+        request,
+        "vets/agenda.html",
+        {
+            "vet": vet,
+            "day": day,
+            "previous_day": day - timedelta(days=1),
+            "next_day": day + timedelta(days=1),
+            "appointments": Appointment.agenda(vet.id, day),
+        },
+    )
+
 def vets_delete(request):
     """
     Elimina un veterinario.
@@ -214,9 +436,7 @@ def vets_delete(request):
     Returns:
         HttpResponse: Redirección a la lista de veterinarios.
     """
-    vet_id = request.POST.get("vet_id")
-    vet = get_object_or_404(Vet, pk=int(vet_id))
-    vet.delete()
+    _delete_or_404(Vet, request.POST.get("vet_id"))
 
     return redirect(reverse("vets_repo"))
 
@@ -234,18 +454,22 @@ def clients_add_product(request, id=None):
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'clients/add_product.html' o redirección a la lista de clientes.
     """
     client = get_object_or_404(Client, pk=id)
-    products = Product.objects.all() 
     if request.method == "POST":
-        product_id = request.POST.get("product_id")
-        product = get_object_or_404(Product, pk=product_id)
-        client.products.add(product)  
+        product = _get_selected(Product, request.POST.get("product_id"))
+        if product is None:
+            return render(
+                request, "clients/add_product.html",
+                {"client": client, "errors": {"product_id": "Seleccione un producto de la lista"}},
+            )
+        client.products.add(product)
         return redirect(reverse("clients_repo"))
-    if not products:
+    if not Product.objects.exists():
         messages.error(request, "No hay productos disponibles")
         return redirect(reverse("clients_repo"))
 
-    return render(request, "clients/add_product.html", {"client": client, "products": products})
+    return render(request, "clients/add_product.html", {"client": client})
 
+@reads_from_replica
 def select_products_to_delete(request):
     """
     Selecciona productos para eliminar de un cliente.
@@ -278,9 +502,10 @@ def delete_selected_products(request):
         client.products.remove(*product_ids)
     return redirect('clients_repo')
 
+@reads_from_replica
 def products_repository(request):
     """
-    Muestra la lista de todos los productos.
+    Muestra la lista paginada de productos, filtrable por proveedor, tipo y rango de precio.
 
     Args:
         request: El objeto de solicitud HTTP.
@@ -288,8 +513,66 @@ def products_repository(request):
     Returns:
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'products/repository.html'.
     """
-    products = Product.objects.all()
-    return render(request, "products/repository.html", {"products": products})
+    context = PRODUCTS_QUERY.paginate(request, Product.objects.select_related("provider").with_stock())
+    providers = Provider.objects.only("id", "name").order_by("name")
+    return render(
+        request,
+        "products/repository.html",
+        {"products": context["page_obj"], "providers": providers, **context},
+    )
+
+def products_stock(request, id):
+    """
+    Muestra el stock y los últimos movimientos de un producto, y registra nuevos movimientos.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+        id (int): El ID del producto.
+
+    Returns:
+        HttpResponse: La respuesta HTTP renderizada con la plantilla 'products/stock.html' o redirección a la misma página.
+    """
+    product = get_object_or_404(Product.objects.select_related("provider").with_stock(), pk=id)
+    errors = {}
+
+    if request.method == "POST":
+        saved, errors = StockMovement.save_movement(product, request.POST)
+        if saved:
+            return redirect(reverse("products_stock", kwargs={"id": product.id}))
+
+    movements = (
+        product.stock_movements.select_related("provider", "client")
+        .order_by("-pk")[:STOCK_MOVEMENTS_SHOWN]
+    )
+
+    return render(
+        request,
+        "products/stock.html",
+        {
+            "product": product,
+            "movements": movements,
+            "kinds": StockMovement.KINDS.items(),
+            "errors": errors,
+            "data": request.POST,
+            "selected_client": _get_selected(Client, request.POST.get("client")),
+        },
+    )
+
+def products_low_stock(request):
+    """
+    Muestra los productos con stock menor o igual que su stock mínimo.
+
+    El reporte es una única consulta: el stock se calcula en SQL (foto más delta)
+    y se filtra contra `reorder_level` en la misma sentencia.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+
+    Returns:
+        HttpResponse: La respuesta HTTP renderizada con la plantilla 'products/low_stock.html'.
+    """
+    products = Product.objects.low_stock().select_related("provider").order_by("stock", "name")
+    return render(request, "products/low_stock.html", {"products": products})
 
 def product_form(request, id=None):
     """
@@ -312,7 +595,7 @@ def product_form(request, id=None):
             saved, errors = Product.save_product(request.POST)
         else:
             product = get_object_or_404(Product, pk=product_id)
-            product.update_product(request.POST)
+            saved, errors = product.update_product(request.POST)
 
         if saved:
             return redirect(reverse("products_repo"))
@@ -337,16 +620,15 @@ def products_delete(request):
     Returns:
         HttpResponse: Redirección a la lista de productos.
     """
-    product_id = request.POST.get("product_id")
-    product = get_object_or_404(Product, pk=int(product_id))
-    product.delete()
+    _delete_or_404(Product, request.POST.get("product_id"))
     return redirect(reverse("products_repo"))
 
 #MEDICINA
 
+@reads_from_replica
 def medicine_repository(request):
     """
-    Muestra la lista de todas las medicinas.
+    Muestra la lista paginada de medicinas, ordenable por columna.
 
     Args:
         request: El objeto de solicitud HTTP.
@@ -354,9 +636,8 @@ def medicine_repository(request):
     Returns:
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'medicine/repository.html'.
     """
-    medicine = Medicine.objects.all()
-    print(medicine)
-    return render(request, "medicine/repository.html", {"medicines": medicine})
+    context = MEDICINES_QUERY.paginate(request, Medicine.objects.all())
+    return render(request, "medicine/repository.html", {"medicines": context["page_obj"], **context})
 
 #def medicine_form(request):
 #    return render(request,"medicine/form.html",)
@@ -381,7 +662,7 @@ def medicine_form(request, id=None):
             saved, errors = Medicine.save_medicine(request.POST)
         else:
             medicine = get_object_or_404(Medicine, pk=medicine_id)
-            medicine.update_medicine(request.POST)
+            saved, errors = medicine.update_medicine(request.POST)
 
         if saved:
             return redirect(reverse("medicine_repo"))
@@ -406,9 +687,7 @@ def medicine_delete(request):
     Returns:
         HttpResponse: Redirección a la lista de medicinas.
     """
-    medicine_id = request.POST.get("medicine_id")
-    medicine = get_object_or_404(Medicine, pk=int(medicine_id))
-    medicine.delete()
+    _delete_or_404(Medicine, request.POST.get("medicine_id"))
 
     return redirect(reverse("medicine_repo"))
 
@@ -424,17 +703,20 @@ def pets_add_medicine(request, id=None):
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'pets/add_medicine.html' o redirección a la lista de mascotas.
     """
     pet = get_object_or_404(Pet, pk=id)
-    medicines = Medicine.objects.all()
     if request.method == "POST":
-        medicine_id = request.POST.get("medicine_id")
-        medicine = get_object_or_404(Medicine, pk=medicine_id)
+        medicine = _get_selected(Medicine, request.POST.get("medicine_id"))
+        if medicine is None:
+            return render(
+                request, "pets/add_medicine.html",
+                {"pet": pet, "errors": {"medicine_id": "Seleccione una medicina de la lista"}},
+            )
         pet.medicines.add(medicine)
         return redirect(reverse("pets_repo"))
-    if not medicines:
+    if not Medicine.objects.exists():
         messages.error(request, "No hay medicinas disponibles")
         return redirect(reverse("pets_repo"))
 
-    return render(request, "pets/add_medicine.html", {"pet": pet, "medicines": medicines},)
+    return render(request, "pets/add_medicine.html", {"pet": pet},)
 
 def pets_add_vets(request, id=None):
     """
@@ -450,8 +732,12 @@ def pets_add_vets(request, id=None):
     pet = get_object_or_404(Pet, pk=id)
     medicines = Medicine.objects.all()
     if request.method == "POST":
-        medicine_id = request.POST.get("medicine_id")
-        medicine = get_object_or_404(Medicine, pk=medicine_id)
+        medicine = _get_selected(Medicine, request.POST.get("medicine_id"))
+        if medicine is None:
+            return render(
+                request, "pets/add_medicine.html",
+                {"pet": pet, "medicines": medicines, "errors": {"medicine_id": "Seleccione una medicina de la lista"}},
+            )
         pet.medicines.add(medicine)
         return redirect(reverse("pets_repo"))
     if not medicines:
@@ -461,9 +747,26 @@ def pets_add_vets(request, id=None):
     return render(request, "pets/add_medicine.html", {"pet": pet, "medicines": medicines},)
 
 
+def _get_selected(model, pk):
+    """
+    Obtiene el registro elegido en un selector con autocompletado, si existe.
+
+    Args:
+        model: Modelo del registro.
+        pk (str): Id enviado por el formulario (puede ser vacío o inválido).
+
+    Returns:
+        Model | None: El registro o None si el id no es válido.
+    """
+    if not str(pk or "").isdigit():
+        return None
+    return model.objects.only("id", "name").filter(pk=pk).first()
+
+
+@reads_from_replica
 def pets_repository(request):
     """
-    Muestra la lista de todas las mascotas.
+    Muestra la lista paginada de mascotas, filtrable por cliente, raza y rango de cumpleaños.
 
     Args:
         request: El objeto de solicitud HTTP.
@@ -471,12 +774,24 @@ def pets_repository(request):
     Returns:
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'pets/repository.html'.
     """
-    pets=Pet.objects.all()
-    vacioC=bool(Client.objects.all())
-    vacioM = bool(Medicine.objects.all())
-    vacioV = bool(Vet.objects.all())
-    #vacioV 
-    return render(request,"pets/repository.html", {"pets":pets, "vacioC":vacioC,"vacioM":vacioM, "vacioV":vacioV  })
+    pets = Pet.objects.select_related("client").prefetch_related("medicines", "vets")
+    context = PETS_QUERY.paginate(request, pets)
+    selected_client = _get_selected(Client, context["query"]["filters"].get("client"))
+    vacioC = Client.objects.exists()
+    vacioM = Medicine.objects.exists()
+    vacioV = Vet.objects.exists()
+    return render(
+        request,
+        "pets/repository.html",
+        {
+            "pets": context["page_obj"],
+            "selected_client": selected_client,
+            "vacioC": vacioC,
+            "vacioM": vacioM,
+            "vacioV": vacioV,
+            **context,
+        },
+    )
 
 def pets_form(request, id=None):
     """
@@ -489,7 +804,6 @@ def pets_form(request, id=None):
     Returns:
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'pets/form.html' o redirección a la lista de mascotas.
     """
-    clients = Client.objects.all()
     fecha_actual = date.today().isoformat()
 
     if request.method == "POST":
@@ -501,19 +815,26 @@ def pets_form(request, id=None):
             saved, errors = Pet.save_pet(request.POST)
         else:
             pet = get_object_or_404(Pet, pk=pet_id)
-            pet.update_pet(request.POST)
+            saved, errors = pet.update_pet(request.POST)
 
         if saved:
             return redirect(reverse("pets_repo"))
 
+        selected_client = _get_selected(Client, request.POST.get("client"))
         return render(
-            request, "pets/form.html", {"errors": errors, "pet": request.POST, "clients":clients, "fecha_actual":fecha_actual},
+            request,
+            "pets/form.html",
+            {"errors": errors, "pet": request.POST, "selected_client": selected_client, "fecha_actual": fecha_actual},
         )
     pet = None
+    selected_client = None
     if id is not None:
-        pet = get_object_or_404(Pet, pk=id)
+        pet = get_object_or_404(Pet.objects.select_related("client"), pk=id)
+        selected_client = pet.client
 
-    return render(request, "pets/form.html", {"pet": pet, "clients":clients, "fecha_actual":fecha_actual})
+    return render(
+        request, "pets/form.html", {"pet": pet, "selected_client": selected_client, "fecha_actual": fecha_actual},
+    )
 
 def pets_delete(request):
     """
@@ -525,12 +846,146 @@ def pets_delete(request):
     Returns:
         HttpResponse: Redirección a la lista de mascotas.
     """
-    pet_id = request.POST.get("pet_id")
-    pet = get_object_or_404(Pet, pk=int(pet_id))
-    pet.delete()
+    _delete_or_404(Pet, request.POST.get("pet_id"))
 
     return redirect(reverse("pets_repo"))
 
+def pets_appointment(request, id):
+    """
+    Maneja el formulario de alta de turnos de una mascota.
+
+    Con `specialty` en la URL busca el próximo horario libre de cualquier
+    veterinario de esa especialidad y lo propone en el formulario.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+        id (int): El ID de la mascota.
+
+    Returns:
+        HttpResponse: La respuesta HTTP renderizada con la plantilla 'pets/appointment.html' o redirección a la agenda del veterinario.
+    """
+    pet = get_object_or_404(Pet.objects.only("id", "name"), pk=id)
+    errors = {}
+    data = request.POST
+
+    if request.method == "POST":
+        saved, errors = Appointment.save_appointment(pet, request.POST)
+        if saved:
+            day = datetime.fromisoformat(request.POST["start"]).date().isoformat()
+            return redirect(reverse("vets_agenda", kwargs={"id": request.POST["vet"]}) + f"?fecha={day}")
+        selected_vet = _get_selected(Vet, request.POST.get("vet"))
+    else:
+        selected_vet = None
+        specialty = request.GET.get("specialty", "")
+        if specialty:
+            try:
+                duration = int(request.GET.get("duration", Appointment.SLOT_MINUTES * 2))
+            except ValueError:
+                duration = Appointment.SLOT_MINUTES * 2
+            slot = Appointment.next_free_slot(specialty, timezone.now(), timedelta(minutes=duration))
+            if slot is None:
+                errors = {"start": "No hay horarios libres para esa especialidad en los próximos días"}
+            else:
+                selected_vet, start = slot
+                data = {"start": start.strftime("%Y-%m-%dT%H:%M"), "duration": duration}
+
+    return render(
+        request,
+        "pets/appointment.html",
+        {
+            "pet": pet,
+            "errors": errors,
+            "data": data,
+            "selected_vet": selected_vet,
+            "specialties": Specialty.choices(),
+            "specialty": request.GET.get("specialty", ""),
+        },
+    )
+
+def pets_timeline(request, id):
+    """
+    Muestra la línea de tiempo de medicinas administradas a una mascota y registra nuevas administraciones.
+
+    La línea de tiempo se pagina por clave con el parámetro `cursor`.
+
+    Args:
+        request: El objeto de solicitud HTTP.
+        id (int): El ID de la mascota.
+
+    Returns:
+        HttpResponse: La respuesta HTTP renderizada con la plantilla 'pets/timeline.html' o redirección a la línea de tiempo.
+    """
+    pet = get_object_or_404(Pet.objects.only("id", "name"), pk=id)
+    errors = {}
+
+    if request.method == "POST":
+        saved, errors = MedicationAdministration.save_administration(pet, request.POST)
+        if saved:
+            return redirect(reverse("pets_timeline", kwargs={"id": pet.id}))
+
+    administrations, next_cursor = MedicationAdministration.objects.timeline(
+        pet.id, request.GET.get("cursor"),
+    )
+
+    return render(
+        request,
+        "pets/timeline.html",
+        {
+            "pet": pet,
+            "administrations": administrations,
+            "next_cursor": next_cursor,
+            "errors": errors,
+            "data": request.POST,
+            "selected_medicine": _get_selected(Medicine, request.POST.get("medicine")),
+            "selected_vet": _get_selected(Vet, request.POST.get("vet")),
+        },
+    )
+
+def pets_weight_chart(request):
+    """
+    Devuelve en JSON las curvas de peso de varias mascotas.
+
+    Las series se leen de los intervalos precalculados (`WeightSeries`) con una
+    consulta por lote de ids, sin recorrer el historial de pesos. Los ids pueden
+    enviarse por GET o, para miles de mascotas, en el cuerpo de un POST.
+
+    Args:
+        request: El objeto de solicitud HTTP con `pets` (ids separados por coma) o
+            `client`, y opcionalmente `resolution` (day, week, month; por defecto
+            week), `desde` y `hasta` (YYYY-MM-DD).
+
+    Returns:
+        JsonResponse: Diccionario con `resolution` y `series`, que mapea el id de cada
+        mascota a una lista de [fecha, promedio, mínimo, máximo].
+    """
+    params = request.POST if request.method == "POST" else request.GET
+
+    resolution = params.get("resolution", WeightSeries.WEEK)
+    if resolution not in WeightSeries.RESOLUTIONS:
+        return HttpResponseBadRequest("resolution inválida")
+
+    try:
+        if params.get("client", "") != "":
+            pet_ids = list(Pet.objects.filter(client_id=int(params["client"])).values_list("id", flat=True))
+        else:
+            pet_ids = [int(pet_id) for pet_id in params.get("pets", "").split(",") if pet_id.strip()]
+            if len(pet_ids) > WEIGHT_CHART_MAX_PETS:
+                return HttpResponseBadRequest("Demasiadas mascotas")
+            # Solo las mascotas vivas de la clínica activa.
+            pet_ids = list(Pet.objects.filter(pk__in=pet_ids).values_list("pk", flat=True))
+        start = date.fromisoformat(params["desde"]) if params.get("desde") else None
+        end = date.fromisoformat(params["hasta"]) if params.get("hasta") else None
+    except (ValueError, OverflowError):
+        return HttpResponseBadRequest("Parámetros inválidos")
+
+    if len(pet_ids) > WEIGHT_CHART_MAX_PETS:
+        return HttpResponseBadRequest("Demasiadas mascotas")
+
+    series = WeightSeries.chart_data(pet_ids, resolution, start, end)
+
+    return JsonResponse({"resolution": resolution, "series": series})
+
+@reads_from_replica
 def select_medicines_to_delete(request):
     """
     Selecciona medicinas para eliminar de una mascota.
@@ -563,6 +1018,7 @@ def delete_selected_medicines(request):
         pet.medicines.remove(*medicine_ids)
     return redirect('pets_repo')
 
+@reads_from_replica
 def select_vets_for_deletion(request):
     """
     Selecciona veterinarios para eliminar de una mascota.
@@ -608,18 +1064,22 @@ def pets_add_vet(request, id=None):
         HttpResponse: La respuesta HTTP renderizada con la plantilla 'pets/add_vet.html' o redirección a la lista de mascotas.
     """
     pet = get_object_or_404(Pet, pk=id)
-    vets = Vet.objects.all() 
     if request.method == "POST":
-        vet_id = request.POST.get("vet_id")
-        vet = get_object_or_404(Vet, pk=vet_id)
-        pet.vets.add(vet)  
+        vet = _get_selected(Vet, request.POST.get("vet_id"))
+        if vet is None:
+            return render(
+                request, "pets/add_vet.html",
+                {"pet": pet, "errors": {"vet_id": "Seleccione un veterinario de la lista"}},
+            )
+        pet.vets.add(vet)
         return redirect(reverse("pets_repo"))
-    if not vets:
+    if not Vet.objects.exists():
         messages.error(request, "No hay veterinarios disponibles")
         return redirect(reverse("pets_repo"))
 
-    return render(request, "pets/add_vet.html", {"pet": pet, "vets": vets})
+    return render(request, "pets/add_vet.html", {"pet": pet})
 
+@reads_from_replica
 def select_vets_to_delete(request):
     """
     Selecciona veterinarios para eliminar de una mascota.
@@ -0,0 +1,124 @@
+"""
+Precalentamiento del proceso antes de atender solicitudes.
+
+`prefork` carga lo que no depende de la base de datos: el URLconf (y con él
+las vistas), la tabla del navbar, las plantillas compiladas y los metadatos de
+los modelos. `vetsoft/wsgi.py` lo llama al cargar la aplicación; con
+`gunicorn --preload` eso ocurre una sola vez en el proceso maestro y los
+workers heredan el trabajo hecho al hacer fork, compartiendo esas páginas de
+memoria (copy-on-write) en lugar de repetirlo cada uno en su primera solicitud.
+
+`warm` completa el precalentamiento en cada worker, ya con la base: carga los
+dominios de las clínicas y muestra una vez cada página del navbar (los
+listados). `/readyz` solo responde que el worker está listo después de `warm`.
+"""
+import gc
+import logging
+import threading
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest
+from django.template import engines
+from django.template.loader import get_template
+from django.urls import get_resolver, resolve
+
+from . import tenancy
+from .context_processors import get_link_table
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_lock = threading.Lock()
+
+
+def template_names():
+    """
+    Nombres de las plantillas propias del proyecto.
+
+    Returns:
+        list[str]: Nombres relativos (por ejemplo "pets/repository.html") de
+        las plantillas dentro de `BASE_DIR`; no incluye las del admin.
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    names = set()
+    for engine in engines.all():
+        for directory in map(Path, engine.template_dirs):
+            directory = directory.resolve()
+            if not directory.is_dir() or not directory.is_relative_to(base_dir):
+                continue
+            names.update(path.relative_to(directory).as_posix() for path in directory.rglob("*.html"))
+    return sorted(names)
+
+
+def prefork():
+    """
+    Carga el URLconf, las plantillas y los metadatos de los modelos sin usar la base.
+
+    Las plantillas solo quedan compiladas en memoria con el loader cacheado
+    (el predeterminado con DEBUG=False). Al terminar cierra cualquier conexión
+    abierta, para que ningún worker herede un socket o archivo compartido, y
+    congela los objetos creados (`gc.freeze`) para que el recolector de los
+    workers no escriba en esas páginas y las copie.
+
+    Returns:
+        dict: Cantidad de rutas, plantillas y modelos cargados.
+    """
+    urls = len(get_resolver().reverse_dict)
+    get_link_table()
+
+    templates = template_names()
+    for name in templates:
+        get_template(name)
+
+    models = apps.get_models()
+    for model in models:
+        model._meta.get_fields()
+
+    connections.close_all()
+    gc.freeze()
+
+    return {"urls": urls, "templates": len(templates), "models": len(models)}
+
+
+def warm():
+    """
+    Precalienta el worker con la base de datos y lo marca como listo.
+
+    Muestra una vez cada página del navbar (sin middlewares, sin clínica
+    activa), lo que compila sus consultas y plantillas y carga lo que las
+    vistas importan en el primer uso. Se llama en `post_worker_init` de
+    gunicorn antes de aceptar conexiones; si falla (por ejemplo, la base no
+    responde) el worker arranca igual y `/readyz` lo reintenta.
+
+    Returns:
+        bool: True si el worker quedó listo.
+    """
+    with _lock:
+        if _ready.is_set():
+            return True
+        try:
+            tenancy.resolve("")
+            for link in get_link_table()[0]:
+                request = HttpRequest()
+                request.method = "GET"
+                request.path = request.path_info = link["href"]
+                request.resolver_match = match = resolve(link["href"])
+                match.func(request, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception("No se pudo precalentar el worker")
+            return False
+        _ready.set()
+        return True
+
+
+def is_ready():
+    """
+    Indica si el worker ya se precalentó.
+
+    Returns:
+        bool: True después de un `warm` exitoso.
+    """
+    return _ready.is_set()
@@ -0,0 +1,174 @@
+"""
+Métricas de los workers de gunicorn compartidas entre procesos.
+
+`gunicorn.conf.py` reserva al arrancar (`setup`) un arreglo en memoria
+compartida con un lugar por worker; cada worker anota en el suyo cuántas
+solicitudes está atendiendo y cuántas atendió. Como el arreglo se crea en el
+proceso maestro antes del fork, cualquier worker puede leer el estado de todos
+(`snapshot`), que la vista `metrics` publica en formato Prometheus.
+
+El módulo no importa Django: lo importa la configuración de gunicorn antes de
+cargar la aplicación.
+"""
+import os
+import threading
+from multiprocessing.sharedctypes import RawArray
+
+# Campos de cada lugar del arreglo.
+PID, THREADS, BUSY, REQUESTS = range(4)
+FIELDS = 4
+
+_slots = None
+_ports = ()
+_used = set()
+_slot = None
+_lock = threading.Lock()
+
+
+def setup(slots, ports=()):
+    """
+    Reserva el arreglo compartido; se llama en el proceso maestro antes del fork.
+
+    Args:
+        slots (int): Cantidad máxima de workers simultáneos.
+        ports (iterable[int]): Puertos en los que escucha el servidor.
+    """
+    global _slots, _ports
+    _slots = RawArray("q", slots * FIELDS)
+    _ports = tuple(ports)
+    _used.clear()
+
+
+def assign_slot():
+    """
+    Elige un lugar libre para un worker nuevo (en el proceso maestro).
+
+    Returns:
+        int | None: Índice del lugar o None si no hay lugares libres.
+    """
+    if _slots is None:
+        return None
+    for slot in range(len(_slots) // FIELDS):
+        if slot not in _used:
+            _used.add(slot)
+            return slot
+    return None
+
+
+def release_slot(slot):
+    """
+    Libera el lugar de un worker que terminó (en el proceso maestro).
+
+    El total de solicitudes del lugar se conserva para que el contador no
+    retroceda cuando otro worker lo reutiliza.
+
+    Args:
+        slot (int | None): Índice del lugar.
+    """
+    if slot is None:
+        return
+    _used.discard(slot)
+    base = slot * FIELDS
+    _slots[base + PID] = _slots[base + THREADS] = _slots[base + BUSY] = 0
+
+
+def attach(slot, threads):
+    """
+    Registra el worker actual en su lugar (en el worker, después del fork).
+
+    Args:
+        slot (int | None): Índice asignado por `assign_slot`.
+        threads (int): Hilos del worker (solicitudes simultáneas).
+    """
+    global _slot
+    _slot = slot
+    if slot is None:
+        return
+    base = slot * FIELDS
+    _slots[base + PID] = os.getpid()
+    _slots[base + THREADS] = threads
+    _slots[base + BUSY] = 0
+
+
+def _add(field, value):
+    if _slot is None:
+        return
+    with _lock:
+        _slots[_slot * FIELDS + field] += value
+
+
+def request_started():
+    """Anota el comienzo de una solicitud en el worker actual."""
+    _add(BUSY, 1)
+
+
+def request_finished():
+    """Anota el fin de una solicitud en el worker actual."""
+    _add(BUSY, -1)
+    _add(REQUESTS, 1)
+
+
+def listen_queue_depth(ports):
+    """
+    Conexiones esperando ser aceptadas en los sockets del servidor.
+
+    Lee la cola de aceptación de los sockets en escucha de `/proc/net/tcp`
+    (solo Linux), que crece cuando todos los workers están ocupados.
+
+    Args:
+        ports (iterable[int]): Puertos del servidor.
+
+    Returns:
+        int | None: Conexiones en espera, o None si no se puede medir.
+    """
+    ports = set(ports)
+    if not ports:
+        return None
+
+    depth = 0
+    found = False
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as stream:
+                next(stream)
+                for line in stream:
+                    fields = line.split()
+                    local, state, queues = fields[1], fields[3], fields[4]
+                    if state == "0A" and int(local.rsplit(":", 1)[1], 16) in ports:
+                        depth += int(queues.split(":")[1], 16)
+                        found = True
+        except OSError:
+            continue
+    return depth if found else None
+
+
+def snapshot():
+    """
+    Estado de todos los workers.
+
+    Returns:
+        dict: "workers", "workers_busy", "threads", "requests_in_progress",
+        "requests_total" y "listen_queue_depth" (None si no se puede medir).
+        Todo en cero fuera de gunicorn.
+    """
+    data = {
+        "workers": 0,
+        "workers_busy": 0,
+        "threads": 0,
+        "requests_in_progress": 0,
+        "requests_total": 0,
+        "listen_queue_depth": listen_queue_depth(_ports),
+    }
+    if _slots is None:
+        return data
+
+    for base in range(0, len(_slots), FIELDS):
+        data["requests_total"] += _slots[base + REQUESTS]
+        if not _slots[base + PID]:
+            continue
+        busy = max(_slots[base + BUSY], 0)
+        data["workers"] += 1
+        data["workers_busy"] += busy > 0
+        data["threads"] += _slots[base + THREADS]
+        data["requests_in_progress"] += busy
+    return data
@@ -158,16 +158,18 @@ class ClientsRepoTestCase(PlaywrightTestCase):
 
         self.page.goto(f"{self.live_server_url}{reverse('clients_repo')}")
 
-        edit_form = self.page.get_by_role(
+        delete_form = self.page.get_by_role(
             "form", name="Formulario de eliminación de cliente",
         )
-        client_id_input = edit_form.locator("input[name=client_id]")
+        delete_button = self.page.get_by_role("button", name="Eliminar")
 
-        expect(edit_form).to_be_visible()
-        expect(edit_form).to_have_attribute("action", reverse("clients_delete"))
-        expect(client_id_input).not_to_be_visible()
-        expect(client_id_input).to_have_value(str(client.id))
-        expect(edit_form.get_by_role("button", name="Eliminar")).to_be_visible()
+        expect(delete_form).to_be_attached()
+        expect(delete_form).to_have_attribute("action", reverse("clients_delete"))
+        expect(delete_form).to_have_attribute("id", "delete-form")
+        expect(delete_button).to_be_visible()
+        expect(delete_button).to_have_attribute("form", "delete-form")
+        expect(delete_button).to_have_attribute("name", "client_id")
+        expect(delete_button).to_have_attribute("value", str(client.id))
 
     def test_should_can_be_able_to_delete_a_client(self):
         Client.objects.create(
@@ -355,16 +357,18 @@ class ProvidersRepoTestCase(PlaywrightTestCase):
 
         self.page.goto(f"{self.live_server_url}{reverse('providers_repo')}")
 
-        edit_form = self.page.get_by_role(
+        delete_form = self.page.get_by_role(
             "form", name="Formulario de eliminación de proveedor",
         )
-        provider_id_input = edit_form.locator("input[name=provider_id]")
+        delete_button = self.page.get_by_role("button", name="Eliminar")
 
-        expect(edit_form).to_be_visible()
-        expect(edit_form).to_have_attribute("action", reverse("providers_delete"))
-        expect(provider_id_input).not_to_be_visible()
-        expect(provider_id_input).to_have_value(str(provider.id))
-        expect(edit_form.get_by_role("button", name="Eliminar")).to_be_visible()
+        expect(delete_form).to_be_attached()
+        expect(delete_form).to_have_attribute("action", reverse("providers_delete"))
+        expect(delete_form).to_have_attribute("id", "delete-form")
+        expect(delete_button).to_be_visible()
+        expect(delete_button).to_have_attribute("form", "delete-form")
+        expect(delete_button).to_have_attribute("name", "provider_id")
+        expect(delete_button).to_have_attribute("value", str(provider.id))
 
     def test_should_can_be_able_to_delete_a_provider(self):
         Provider.objects.create(
@@ -533,15 +537,18 @@ class VetsRepoTestCase(PlaywrightTestCase):
         )
 
         self.page.goto(f"{self.live_server_url}{reverse('vets_repo')}")
-        edit_form = self.page.get_by_role(
+        delete_form = self.page.get_by_role(
             "form", name="Formulario de eliminación de veterinario",
         )
-        vet_id_input = edit_form.locator("input[name=vet_id]")
-        expect(edit_form).to_be_visible()
-        expect(edit_form).to_have_attribute("action", reverse("vets_delete"))
-        expect(vet_id_input).not_to_be_visible()
-        expect(vet_id_input).to_have_value(str(vet.id))
-        expect(edit_form.get_by_role("button", name="Eliminar")).to_be_visible()
+        delete_button = self.page.get_by_role("button", name="Eliminar")
+
+        expect(delete_form).to_be_attached()
+        expect(delete_form).to_have_attribute("action", reverse("vets_delete"))
+        expect(delete_form).to_have_attribute("id", "delete-form")
+        expect(delete_button).to_be_visible()
+        expect(delete_button).to_have_attribute("form", "delete-form")
+        expect(delete_button).to_have_attribute("name", "vet_id")
+        expect(delete_button).to_have_attribute("value", str(vet.id))
 
     def test_should_can_be_able_to_delete_a_vet(self):
         Vet.objects.create(
@@ -585,7 +592,9 @@ class PetCreateEditTestCase(PlaywrightTestCase):
         self.page.goto(f"{self.live_server_url}{reverse('pets_form')}")
 
         expect(self.page.get_by_role("form")).to_be_visible()
-        self.page.select_option("select[name=client]", str(client.id))
+        self.page.get_by_label("Cliente").fill("Juan")
+        self.page.get_by_role("option", name="Juan Sebastian Veron").click()
+        expect(self.page.locator("input[name=client]")).to_have_value(str(client.id))
         self.page.get_by_label("Nombre").fill("Loki")
         self.page.get_by_label("Raza").fill("Border Collie")
         fecha_nacimiento = date(2024, 5, 5).strftime('%Y-%m-%d')
@@ -672,16 +681,18 @@ class MedicineRepoTestCase(PlaywrightTestCase):
 
         self.page.goto(f"{self.live_server_url}{reverse('medicine_repo')}")
 
-        edit_form = self.page.get_by_role(
+        delete_form = self.page.get_by_role(
             "form", name="Formulario de eliminación de la medicina",
         )
-        medicine_id_input = edit_form.locator("input[name=medicine_id]")
+        delete_button = self.page.get_by_role("button", name="Eliminar")
 
-        expect(edit_form).to_be_visible()
-        expect(edit_form).to_have_attribute("action", reverse("medicine_delete"))
-        expect(medicine_id_input).not_to_be_visible()
-        expect(medicine_id_input).to_have_value(str(medicine.id))
-        expect(edit_form.get_by_role("button", name="Eliminar")).to_be_visible()
+        expect(delete_form).to_be_attached()
+        expect(delete_form).to_have_attribute("action", reverse("medicine_delete"))
+        expect(delete_form).to_have_attribute("id", "delete-form")
+        expect(delete_button).to_be_visible()
+        expect(delete_button).to_have_attribute("form", "delete-form")
+        expect(delete_button).to_have_attribute("name", "medicine_id")
+        expect(delete_button).to_have_attribute("value", str(medicine.id))
 
     def test_should_can_be_able_to_delete_a_medicine(self):
         Medicine.objects.create(
@@ -0,0 +1,139 @@
+"""
+Configuración de gunicorn para producción.
+
+La cantidad de workers y de hilos se calcula a partir de las CPU y la memoria
+disponibles (respetando los límites del contenedor) y puede fijarse con las
+variables GUNICORN_*. Por defecto usa workers `gthread`: una solicitud lenta
+ocupa un hilo y no un worker entero.
+
+Uso:
+    gunicorn --config gunicorn.conf.py vetsoft.wsgi
+"""
+import os
+import socket
+
+from app import worker_metrics
+
+# Memoria estimada de un worker con la aplicación cargada.
+WORKER_MEMORY_MB = int(os.environ.get("GUNICORN_WORKER_MEMORY_MB", "150"))
+
+
+def cpu_count():
+    """
+    CPU que puede usar el proceso.
+
+    Returns:
+        int: Cantidad de CPU (según la afinidad del proceso, si está disponible).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def memory_bytes():
+    """
+    Memoria disponible para el contenedor o, sin límite, la memoria física.
+
+    Returns:
+        int | None: Bytes de memoria o None si no se pueden obtener.
+    """
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as stream:
+                value = stream.read().strip()
+        except OSError:
+            continue
+        # "max" (cgroup v2) o un número enorme (cgroup v1) indican que no hay límite.
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_workers(worker_class, cpus, memory):
+    """
+    Cantidad de workers según las CPU y la memoria.
+
+    Args:
+        worker_class (str): Clase de worker ("gthread" o "sync").
+        cpus (int): CPU disponibles.
+        memory (int | None): Bytes de memoria disponibles.
+
+    Returns:
+        int: `2 * CPU + 1` con workers sync, `CPU + 1` con gthread (los hilos
+        ya dan concurrencia), limitado por la memoria y al menos 1.
+    """
+    workers = cpus * 2 + 1 if worker_class == "sync" else cpus + 1
+    if memory:
+        workers = min(workers, memory // (WORKER_MEMORY_MB * 1024 * 1024))
+    return max(1, workers)
+
+
+bind = os.environ.get("GUNICORN_BIND", ":8000")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("GUNICORN_WORKERS") or default_workers(worker_class, cpu_count(), memory_bytes()))
+threads = int(os.environ.get("GUNICORN_THREADS", "4" if worker_class == "gthread" else "1"))
+
+# Conexiones keep-alive: mantener la conexión evita un nuevo handshake por
+# solicitud; detrás de un balanceador debe superar su tiempo de inactividad.
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+
+# Cada worker se reinicia tras atender entre max_requests y max_requests +
+# jitter solicitudes, lo que acota el crecimiento de memoria sin reiniciar
+# todos los workers a la vez.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+
+# La aplicación se carga y precalienta en el maestro (ver app/warmup.py).
+preload_app = True
+
+# El latido de los workers en memoria y no en el disco del contenedor.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def when_ready(server):
+    """Reserva las métricas compartidas antes de crear los workers."""
+    ports = [
+        listener.sock.getsockname()[1]
+        for listener in server.LISTENERS
+        if listener.sock.family in (socket.AF_INET, socket.AF_INET6)
+    ]
+    # Lugares de sobra para los workers que reemplazan a los que se reinician.
+    worker_metrics.setup(server.cfg.workers * 2 + 4, ports)
+
+
+def pre_fork(server, worker):
+    """Asigna al worker un lugar en las métricas compartidas."""
+    worker.metrics_slot = worker_metrics.assign_slot()
+
+
+def post_fork(server, worker):
+    """Registra el worker recién creado en su lugar de las métricas."""
+    worker_metrics.attach(worker.metrics_slot, server.cfg.threads)
+
+
+def post_worker_init(worker):
+    """Precalienta el worker antes de que acepte conexiones (ver app/warmup.py)."""
+    from app import warmup
+
+    warmup.warm()
+
+
+def child_exit(server, worker):
+    """Libera el lugar del worker que terminó."""
+    worker_metrics.release_slot(getattr(worker, "metrics_slot", None))
+
+
+def pre_request(worker, req):
+    """Cuenta la solicitud como en curso."""
+    worker_metrics.request_started()
+
+
+def post_request(worker, req, environ, resp):
+    """Cuenta la solicitud como terminada."""
+    worker_metrics.request_finished()
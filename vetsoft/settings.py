@@ -41,17 +41,26 @@ INSTALLED_APPS = [
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
+    "whitenoise.runserver_nostatic",
     "django.contrib.staticfiles",
 ]
 
 MIDDLEWARE = [
+    "app.middleware.HealthCheckMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "app.middleware.ProfilingMiddleware",
+    "app.middleware.SlowQueryMiddleware",
+    "app.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "app.middleware.ClinicMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "app.middleware.AuditMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.middleware.ReplicaMiddleware",
 ]
 
 ROOT_URLCONF = "vetsoft.urls"
@@ -79,13 +88,59 @@ WSGI_APPLICATION = "vetsoft.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Cada hilo de un worker reutiliza su conexión durante CONN_MAX_AGE segundos
+# en lugar de abrir una por solicitud; se verifica antes de reutilizarla.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     },
 }
 
+# Réplica de solo lectura para los listados (ver app/replicas.py). Localmente,
+# VETSOFT_REPLICA=1 agrega una copia SQLite de la base principal que se
+# actualiza con `python manage.py sync_replicas`.
+if os.environ.get("VETSOFT_REPLICA"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db_replica.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {
+            "MIRROR": "default",
+        },
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+DATABASE_ROUTERS = ["app.replicas.ReplicaRouter"]
+
+# Segundos que una sesión lee de la base principal después de escribir.
+REPLICA_STICKY_SECONDS = 10
+
+# Segundos que un proceso reutiliza los dominios de las clínicas antes de
+# volver a leerlos de la base (ver app/tenancy.py).
+CLINIC_DOMAINS_TTL = 60
+
+# Perfiles de solicitudes (ver app/profiling.py): se perfilan las solicitudes
+# con la cabecera `X-Profile: <PROFILING_TOKEN>` y una fracción
+# PROFILING_SAMPLE_RATE (0 a 1) del resto. PROFILER es "cprofile" o
+# "pyinstrument" (por muestreo, opcional).
+PROFILER = os.environ.get("PROFILER", "cprofile")
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = BASE_DIR / "profiles"
+
+# Consultas SQL lentas (ver app/slow_queries.py): se registran las que tardan
+# al menos SLOW_QUERY_MS milisegundos (None desactiva el registro; 0 registra
+# todas, útil para encontrar consultas N+1). Las últimas SLOW_QUERY_BUFFER
+# quedan en memoria y todas se agregan a SLOW_QUERY_LOG (None: solo memoria).
+SLOW_QUERY_MS = float(os.environ["SLOW_QUERY_MS"]) if os.environ.get("SLOW_QUERY_MS") else 100
+SLOW_QUERY_BUFFER = 500
+SLOW_QUERY_LOG = BASE_DIR / "logs" / "slow_queries.jsonl"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -123,6 +178,41 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Bootstrap y Bootstrap Icons se instalan con `npm install` (ver package.json) y se
+# publican desde node_modules; solo se agregan los directorios que existen.
+STATICFILES_DIRS = [
+    (prefix, path)
+    for prefix, path in (
+        ("vendor/bootstrap", BASE_DIR / "node_modules" / "bootstrap" / "dist"),
+        ("vendor/bootstrap-icons", BASE_DIR / "node_modules" / "bootstrap-icons" / "font"),
+    )
+    if path.is_dir()
+]
+
+# `collectstatic` genera nombres con hash de contenido y variantes .gz/.br de cada
+# archivo; WhiteNoise las sirve desde la app WSGI con cabeceras de cache inmutables.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# Los archivos con hash se cachean 10 años (immutable); el resto durante un año.
+WHITENOISE_MAX_AGE = 31536000
+
+# Directorio de las particiones mensuales comprimidas de `archive_administrations`.
+ARCHIVE_DIR = BASE_DIR / "archive"
+
+# Recordatorios (`schedule_reminders`): el correo usa el backend de Django y los
+# SMS el de `app.sms`. Ambos escriben en consola salvo que se configure otro.
+EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+DEFAULT_FROM_EMAIL = "recordatorios@vetsoft.local"
+SMS_BACKEND = "app.sms.ConsoleBackend"
+SMS_FILE_PATH = BASE_DIR / "sms"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -0,0 +1,80 @@
+"""
+Django settings for running the vetsoft test suite.
+
+Extends the default settings with in-memory primary and replica databases, a cheap password
+hasher, in-memory email and cache backends, and disabled migrations so the
+test database is created directly from the models.
+
+Usage:
+    python manage.py test app --settings=vetsoft.settings_test
+    python manage.py test app --settings=vetsoft.settings_test --parallel
+"""
+from .settings import *  # noqa: F403
+
+
+class DisableMigrations:
+    """
+    Mapeo que desactiva las migraciones de todas las aplicaciones.
+
+    Django consulta `MIGRATION_MODULES` por cada app; devolver `None` hace que
+    las tablas se creen directamente desde los modelos (como `--run-syncdb`).
+    """
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        "TEST": {
+            "NAME": ":memory:",
+        },
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        "TEST": {
+            "NAME": ":memory:",
+        },
+    },
+}
+
+# Los tests leen de la base principal; los de réplicas la activan con
+# `override_settings(DATABASE_REPLICAS=["replica"])`.
+DATABASE_REPLICAS = []
+
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+SMS_BACKEND = "app.sms.LocmemBackend"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+
+MIGRATION_MODULES = DisableMigrations()
+
+# Las consultas lentas de los tests quedan solo en memoria.
+SLOW_QUERY_LOG = None
+
+# Los tests no ejecutan `collectstatic`, por lo que no existe el manifest de hashes.
+STORAGES = {
+    **STORAGES,  # noqa: F405
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Sin `collectstatic` tampoco existe STATIC_ROOT: WhiteNoise sirve los archivos
+# desde los finders (app/static y node_modules), como con DEBUG=True.
+STATIC_ROOT = None
+WHITENOISE_USE_FINDERS = True
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
 
 application = get_wsgi_application()
+
+# Con `gunicorn --preload` corre una vez en el proceso maestro y los workers
+# heredan el URLconf, las plantillas y los modelos ya cargados (ver app/warmup.py).
+from app import warmup  # noqa: E402
+
+warmup.prefork()